@@ -11,6 +11,7 @@ from alembic import context
 from sqlalchemy import engine_from_config, pool
 
 from app.db.base import Base
+from app.db import table_versions as table_versions_models  # noqa: F401
 from app.modules.auth import models as auth_models  # noqa: F401
 from app.modules.module_registry import models as module_registry_models  # noqa: F401
 from app.events import models as event_models  # noqa: F401
@@ -64,6 +65,8 @@ def run_migrations_offline() -> None:
 def run_migrations_online() -> None:
     """Запускает миграции в online режиме.
     Используется для применения схемы напрямую к базе данных.
+    Engine отдельный от приложения, без пула и без DB_STATEMENT_TIMEOUT_MS: лимит запросов API
+    оборвал бы долгие миграции вроде переноса domain_events в секции (0019).
     """
 
     connectable = engine_from_config(
@@ -0,0 +1,25 @@
+"""Add auth permission version stamp for claims-carrying tokens."""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0015_auth_permission_version"
+down_revision = "0014_rbac_fix"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "auth_permission_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default=sa.text("1")),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Единственная строка: версия растёт при любом изменении ролей и доступов.
+    op.execute("INSERT INTO auth_permission_version (id, version) VALUES (1, 1)")
+
+
+def downgrade() -> None:
+    op.drop_table("auth_permission_version")
@@ -0,0 +1,24 @@
+"""Add per-table change versions for conditional GET."""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0016_table_versions"
+down_revision = "0015_auth_permission_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Строки создаются при первом изменении таблицы; отсутствие строки означает версию 0.
+    op.create_table(
+        "table_versions",
+        sa.Column("table_name", sa.String(length=128), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default=sa.text("1")),
+        sa.PrimaryKeyConstraint("table_name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("table_versions")
@@ -0,0 +1,47 @@
+"""Add outbox columns to domain_events and per-handler delivery checkpoints."""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0017_event_outbox"
+down_revision = "0016_table_versions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("domain_events", sa.Column("dispatched_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column(
+        "domain_events",
+        sa.Column("dispatch_attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+    op.add_column("domain_events", sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True))
+    # Существующие события уже обработаны синхронным publish: dispatcher не должен их повторять.
+    op.execute("UPDATE domain_events SET dispatched_at = occurred_at")
+    op.create_index(
+        "ix_domain_events_pending",
+        "domain_events",
+        ["occurred_at"],
+        postgresql_where=sa.text("dispatched_at IS NULL"),
+        sqlite_where=sa.text("dispatched_at IS NULL"),
+    )
+
+    op.create_table(
+        "domain_event_deliveries",
+        sa.Column("event_id", sa.String(length=36), nullable=False),
+        sa.Column("handler", sa.String(length=128), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("delivered_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["event_id"], ["domain_events.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("event_id", "handler"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("domain_event_deliveries")
+    op.drop_index("ix_domain_events_pending", table_name="domain_events")
+    op.drop_column("domain_events", "next_attempt_at")
+    op.drop_column("domain_events", "dispatch_attempts")
+    op.drop_column("domain_events", "dispatched_at")
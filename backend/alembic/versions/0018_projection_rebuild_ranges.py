@@ -0,0 +1,30 @@
+"""Add checkpoints for projection rebuilds."""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0018_projection_rebuild_ranges"
+down_revision = "0017_event_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "projection_rebuild_ranges",
+        sa.Column("projection", sa.String(length=64), nullable=False),
+        sa.Column("range_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("range_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("target", sa.String(length=128), nullable=False),
+        sa.Column("cutoff", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_occurred_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_event_id", sa.String(length=36), nullable=True),
+        sa.Column("events_applied", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("projection", "range_start"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("projection_rebuild_ranges")
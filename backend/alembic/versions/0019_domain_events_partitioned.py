@@ -0,0 +1,115 @@
+"""Partition domain_events by month of occurred_at and slim down its indexes."""
+
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0019_domain_events_partitioned"
+down_revision = "0018_projection_rebuild_ranges"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+_COLUMNS = "id, type, entity, entity_id, payload, occurred_at, dispatched_at, dispatch_attempts, next_attempt_at"
+_COLUMN_DDL = """
+    id VARCHAR(36) NOT NULL,
+    type VARCHAR(128) NOT NULL,
+    entity VARCHAR(64) NOT NULL,
+    entity_id VARCHAR(64) NOT NULL,
+    payload JSON NOT NULL,
+    occurred_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    dispatched_at TIMESTAMP WITH TIME ZONE,
+    dispatch_attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE
+"""
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    op.create_index("ix_domain_events_occurred_at", "domain_events", ["occurred_at"])
+    op.create_index("ix_domain_events_entity_ref", "domain_events", ["entity", "entity_id"])
+    op.create_index(
+        "ix_domain_events_pending",
+        "domain_events",
+        ["occurred_at"],
+        postgresql_where=sa.text("dispatched_at IS NULL"),
+        sqlite_where=sa.text("dispatched_at IS NULL"),
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Отдельные индексы type/entity/entity_id заменяет один составной (entity, entity_id): его использует история сущности.
+    op.drop_index("ix_domain_events_type", table_name="domain_events")
+    op.drop_index("ix_domain_events_entity", table_name="domain_events")
+    op.drop_index("ix_domain_events_entity_id", table_name="domain_events")
+    if bind.dialect.name != "postgresql":
+        # SQLite локальных запусков не секционируется: архивация в нём удаляет строки месяца.
+        op.create_index("ix_domain_events_entity_ref", "domain_events", ["entity", "entity_id"])
+        return
+
+    op.drop_index("ix_domain_events_occurred_at", table_name="domain_events")
+    op.drop_index("ix_domain_events_pending", table_name="domain_events")
+    op.drop_constraint("domain_event_deliveries_event_id_fkey", "domain_event_deliveries", type_="foreignkey")
+    op.execute("ALTER TABLE domain_events RENAME TO domain_events_unpartitioned")
+    op.execute("ALTER TABLE domain_events_unpartitioned RENAME CONSTRAINT domain_events_pkey TO domain_events_unpartitioned_pkey")
+    op.execute(
+        f"CREATE TABLE domain_events ({_COLUMN_DDL}, PRIMARY KEY (id, occurred_at)) PARTITION BY RANGE (occurred_at)"
+    )
+    # Секция по умолчанию принимает события вне созданных месяцев, чтобы publish не падал при отставшем обслуживании.
+    op.execute("CREATE TABLE domain_events_default PARTITION OF domain_events DEFAULT")
+
+    now = datetime.now(timezone.utc)
+    first = bind.execute(sa.text("SELECT min(occurred_at) FROM domain_events_unpartitioned")).scalar() or now
+    month = date(first.year, first.month, 1)
+    last = _add_months(date(now.year, now.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE domain_events_p{month:%Y_%m} PARTITION OF domain_events "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+        month = upper
+    _create_indexes()
+
+    op.execute(f"INSERT INTO domain_events ({_COLUMNS}) SELECT {_COLUMNS} FROM domain_events_unpartitioned")
+    op.execute("DROP TABLE domain_events_unpartitioned")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        op.drop_index("ix_domain_events_entity_ref", table_name="domain_events")
+    else:
+        op.execute("ALTER TABLE domain_events RENAME TO domain_events_partitioned")
+        op.execute("ALTER TABLE domain_events_partitioned RENAME CONSTRAINT domain_events_pkey TO domain_events_partitioned_pkey")
+        op.execute(f"CREATE TABLE domain_events ({_COLUMN_DDL}, PRIMARY KEY (id))")
+        op.execute(f"INSERT INTO domain_events ({_COLUMNS}) SELECT {_COLUMNS} FROM domain_events_partitioned")
+        # Вместе с таблицей удаляются секции и её индексы; имена индексов освобождаются для новой таблицы.
+        op.execute("DROP TABLE domain_events_partitioned CASCADE")
+        op.create_index("ix_domain_events_occurred_at", "domain_events", ["occurred_at"])
+        op.create_index(
+            "ix_domain_events_pending",
+            "domain_events",
+            ["occurred_at"],
+            postgresql_where=sa.text("dispatched_at IS NULL"),
+        )
+        op.execute("DELETE FROM domain_event_deliveries WHERE event_id NOT IN (SELECT id FROM domain_events)")
+        op.create_foreign_key(
+            "domain_event_deliveries_event_id_fkey",
+            "domain_event_deliveries",
+            "domain_events",
+            ["event_id"],
+            ["id"],
+            ondelete="CASCADE",
+        )
+    op.create_index("ix_domain_events_type", "domain_events", ["type"])
+    op.create_index("ix_domain_events_entity", "domain_events", ["entity"])
+    op.create_index("ix_domain_events_entity_id", "domain_events", ["entity_id"])
@@ -0,0 +1,23 @@
+"""Sync the users id sequence after the seeded system administrator."""
+
+from alembic import op
+
+
+revision = "0020_users_id_sequence"
+down_revision = "0019_domain_events_partitioned"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # 0013 вставляет администратора с явным id = 1, и первый INSERT сотрудника получал тот же id из sequence.
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('users', 'id'), COALESCE((SELECT MAX(id) FROM users), 1), true)"
+    )
+
+
+def downgrade() -> None:
+    # Sequence не откатывается: выданные id остаются занятыми.
+    pass
@@ -0,0 +1,160 @@
+"""Контроль допуска запросов по классам маршрутов.
+Файл нужен, чтобы при медленной БД тяжёлые операции (Excel, горизонт автозадач, bcrypt) не занимали весь threadpool и дешёвые чтения продолжали проходить.
+Минимальность: классификация по методу и пути, лимит одновременных запросов на класс с ожиданием в очереди и быстрый 503 с Retry-After.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+# Служебные маршруты не ограничиваются: probe и scrape должны отвечать и под перегрузкой.
+EXEMPT_PATHS = frozenset({"/health", "/ready", "/metrics"})
+EXEMPT_PREFIXES = ("/diagnostics/",)
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Правила проверяются по порядку; запрос без совпадения — read для безопасных методов, иначе write.
+# bulk — операции, которые держат соединение и поток секунды: Excel-выгрузка/импорт и генерация
+# горизонта автозадач (ensure_horizon вызывается при чтении и изменении правил контрагента).
+ROUTE_CLASS_RULES: tuple[tuple[str, re.Pattern[str]], ...] = (
+    ("auth", re.compile(r"^/auth/(login|register)$")),
+    ("bulk", re.compile(r"^/tasks/admin/")),
+    ("bulk", re.compile(r"^/counterparties/\d+/auto-tasks(/|$)")),
+)
+
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "admission_in_flight",
+    "Запросы, допущенные к обработке, по классам маршрутов.",
+    ("route_class",),
+)
+ADMISSION_QUEUE_WAIT = registry.histogram(
+    "admission_queue_wait_seconds",
+    "Ожидание свободного места в классе маршрутов перед обработкой.",
+    ("route_class",),
+    buckets=(0.001, 0.005, 0.025, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+ADMISSION_REJECTED = registry.counter(
+    "admission_rejected_total",
+    "Запросы, отклонённые с 503: класс маршрутов занят дольше допустимого ожидания.",
+    ("route_class",),
+)
+
+
+@dataclass(frozen=True)
+class ClassLimit:
+    """Лимит класса: limit <= 0 — без ограничения; queue_timeout_ms = 0 — отказ сразу, без ожидания."""
+
+    limit: int
+    queue_timeout_ms: int
+
+
+def class_limits() -> dict[str, ClassLimit]:
+    return {
+        "read": ClassLimit(settings.admission_read_limit, settings.admission_read_queue_ms),
+        "write": ClassLimit(settings.admission_write_limit, settings.admission_write_queue_ms),
+        "bulk": ClassLimit(settings.admission_bulk_limit, settings.admission_bulk_queue_ms),
+        "auth": ClassLimit(settings.admission_auth_limit, settings.admission_auth_queue_ms),
+    }
+
+
+def route_class(method: str, path: str) -> str | None:
+    """Класс маршрута; None — запрос не ограничивается."""
+
+    if path in EXEMPT_PATHS or path.startswith(EXEMPT_PREFIXES):
+        return None
+    for name, pattern in ROUTE_CLASS_RULES:
+        if pattern.match(path):
+            return name
+    return "read" if method in SAFE_METHODS else "write"
+
+
+class _Gate:
+    """Семафор класса с ограниченным ожиданием; живёт в event loop процесса."""
+
+    def __init__(self, limit: ClassLimit) -> None:
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit.limit)
+
+    async def acquire(self) -> bool:
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return True
+        if self.limit.queue_timeout_ms <= 0:
+            return False
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.limit.queue_timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware: допускает запрос, если в его классе есть место, иначе быстро отвечает 503.
+    Лимиты действуют на процесс-воркер: при SERVER_WORKERS > 1 суммарный лимит кратно больше.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._gates: dict[str, _Gate] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _gate(self, name: str) -> _Gate | None:
+        # Семафор привязывается к event loop; инструменты, которые запускают приложение
+        # в нескольких asyncio.run, получают свежие семафоры для каждого loop.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._gates = {key: _Gate(limit) for key, limit in class_limits().items() if limit.limit > 0}
+            self._loop = loop
+        return self._gates.get(name)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.admission_enabled:
+            await self.app(scope, receive, send)
+            return
+        name = route_class(scope["method"], scope["path"])
+        gate = self._gate(name) if name is not None else None
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        admitted = await gate.acquire()
+        ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - started, route_class=name)
+        if not admitted:
+            ADMISSION_REJECTED.inc(route_class=name)
+            await self._reject(name, send)
+            return
+
+        ADMISSION_IN_FLIGHT.inc(route_class=name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ADMISSION_IN_FLIGHT.dec(route_class=name)
+            gate.release()
+
+    @staticmethod
+    async def _reject(name: str, send: Send) -> None:
+        body = orjson.dumps({"detail": "Service overloaded", "route_class": name})
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"retry-after", str(settings.admission_retry_after_seconds).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,131 @@
+"""Сжатие HTTP-ответов.
+Файл нужен, чтобы большие JSON-списки (контрагенты, оргструктура, задачи) уходили клиенту в gzip или brotli.
+Минимальность: сжимается только цельное тело ответа от порога размера, потоковые ответы проходят как есть.
+"""
+
+from __future__ import annotations
+
+import gzip
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # Без brotli (урезанная сборка) остаётся gzip.
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+# Крупные тела сжимаются в threadpool, чтобы не останавливать event loop на десятки миллисекунд.
+OFFLOAD_BYTES = 256 * 1024
+
+RESPONSE_BYTES = registry.counter(
+    "http_response_compression_bytes_total",
+    "Размер сжатых ответов до и после сжатия.",
+    ("encoding", "kind"),
+)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Выбирает br или gzip по Accept-Encoding с учётом q; при равном весе предпочитается br."""
+
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    default = weights.get("*", 0.0)
+    candidates = [("br", weights.get("br", default)), ("gzip", weights.get("gzip", default))]
+    if brotli is None:
+        candidates = candidates[1:]
+    encoding, weight = max(candidates, key=lambda item: item[1])
+    return encoding if weight > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.response_brotli_quality)
+    return gzip.compress(body, compresslevel=settings.response_gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """ASGI middleware: gzip/brotli для ответов не меньше RESPONSE_COMPRESSION_MIN_BYTES.
+    Первое сообщение тела придерживается вместе с заголовками: если ответ цельный, он сжимается,
+    если потоковый (more_body) или уже закодирован — отправляется без изменений.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or settings.response_compression_min_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            passthrough = True
+            headers = MutableHeaders(scope=start_message)
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start_message)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) < settings.response_compression_min_bytes:
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= OFFLOAD_BYTES:
+                compressed = await anyio.to_thread.run_sync(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            RESPONSE_BYTES.inc(len(body), encoding=encoding, kind="original")
+            RESPONSE_BYTES.inc(len(compressed), encoding=encoding, kind="compressed")
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
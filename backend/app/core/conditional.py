@@ -0,0 +1,93 @@
+"""Conditional GET по версиям таблиц.
+Файл нужен, чтобы редко меняющиеся справочники (модули, пользователи, папки, роли) не пересобирались на каждый опрос фронтенда.
+Минимальность: ETag из версий таблиц и области доступа пользователя, ответ 304 на совпавший If-None-Match.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Awaitable, Callable
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.context import UserContext
+from app.core.metrics import registry
+from app.core.security import get_current_user
+from app.db.table_versions import read_versions, track_tables
+from app.modules.auth.service import get_async_db
+
+# Таблицы, определяющие, что пользователю доступно: их изменение меняет ETag ответов с областью пользователя.
+ACCESS_SCOPE_TABLES: tuple[str, ...] = (
+    "auth_roles",
+    "auth_user_roles",
+    "auth_role_modules",
+    "auth_role_module_permissions",
+)
+# Ответ остаётся в кэше браузера, но перед каждым использованием перепроверяется через If-None-Match.
+CACHE_CONTROL = "private, no-cache"
+
+CONDITIONAL_GET_REQUESTS = registry.counter(
+    "http_conditional_get_total",
+    "Запросы к conditional GET: not_modified — ответ 304 без чтения данных, modified — полный ответ.",
+    ("result",),
+)
+
+
+def build_etag(request: Request, versions: dict[str, int], user_id: int | None) -> str:
+    """Слабый ETag: тело одно и то же по смыслу, но байты зависят от сжатия."""
+
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    parts = [request.url.path, query, "" if user_id is None else str(user_id)]
+    parts.extend(f"{name}={version}" for name, version in sorted(versions.items()))
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Слабое сравнение по RFC 9110: префикс W/ не учитывается, * совпадает с любым тегом."""
+
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def conditional_get(*tables: str, per_user: bool = False) -> Callable[..., Awaitable[None]]:
+    """Зависимость endpoint'а: ставит ETag или отвечает 304 до выполнения обработчика.
+    tables — таблицы, из которых собирается ответ; per_user добавляет в ETag пользователя
+    и таблицы доступа, чтобы отозванное право не продлевалось закэшированным ответом.
+    """
+
+    dependencies = set(tables)
+    if per_user:
+        dependencies.update(ACCESS_SCOPE_TABLES)
+    track_tables(dependencies)
+
+    async def dependency(
+        request: Request,
+        response: Response,
+        current_user: UserContext = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db),
+    ) -> None:
+        # Версии читаются до данных: если запись успеет между ними, ETag окажется старше тела
+        # и следующий запрос просто получит ответ заново, а не 304 на устаревшие данные.
+        versions = await read_versions(db, dependencies)
+        # Соединение возвращается в пул сразу: sync-обработчик работает со своей сессией.
+        await db.rollback()
+        etag = build_etag(request, versions, current_user.id if per_user else None)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            CONDITIONAL_GET_REQUESTS.inc(result="not_modified")
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+            )
+        CONDITIONAL_GET_REQUESTS.inc(result="modified")
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+
+    return dependency
@@ -10,16 +10,190 @@ from dataclasses import dataclass
 @dataclass(frozen=True)
 class Settings:
     """Контейнер настроек.
-    Содержит только обязательные параметры для bootstrap.
+    Содержит обязательные параметры для bootstrap и необязательные параметры пула БД.
     """
 
     database_url: str
     environment: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0
+    diagnostics_token: str = ""
+    database_replica_urls: tuple[str, ...] = ()
+    db_replica_max_lag_seconds: int = 5
+    db_replica_lag_check_seconds: int = 2
+    db_read_your_writes_seconds: int = 5
+    schema_check_ttl_seconds: int = 30
+    query_stats_enabled: bool = True
+    query_stats_server_timing: bool = False
+    query_n_plus_one_threshold: int = 5
+    auth_user_cache_ttl_seconds: int = 30
+    auth_user_cache_max_size: int = 4096
+    auth_token_claims_enabled: bool = False
+    auth_claims_version_ttl_seconds: int = 5
+    password_hash_workers: int = 2
+    bcrypt_rounds: int = 12
+    response_compression_min_bytes: int = 1024
+    response_gzip_level: int = 6
+    response_brotli_quality: int = 4
+    threadpool_size: int = 15
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 1
+    server_preload: bool = True
+    server_max_requests: int = 10000
+    server_max_requests_jitter: int = 1000
+    server_max_worker_memory_mb: int = 1024
+    server_graceful_timeout_seconds: int = 30
+    server_keepalive_seconds: int = 5
+    server_timeout_seconds: int = 60
+    admission_enabled: bool = True
+    admission_read_limit: int = 64
+    admission_read_queue_ms: int = 1000
+    admission_write_limit: int = 15
+    admission_write_queue_ms: int = 2000
+    admission_bulk_limit: int = 2
+    admission_bulk_queue_ms: int = 0
+    admission_auth_limit: int = 8
+    admission_auth_queue_ms: int = 2000
+    admission_retry_after_seconds: int = 2
+    log_level: str = "INFO"
+    log_json: bool = True
+    log_queue_size: int = 10000
+    log_sample_rates: tuple[str, ...] = ("event_core=0.1",)
+    enabled_modules: tuple[str, ...] = ()
+    disabled_modules: tuple[str, ...] = ()
+    warmup_enabled: bool = True
+    db_warmup_connections: int = 2
+    event_outbox_enabled: bool = False
+    event_outbox_batch_size: int = 100
+    event_outbox_poll_ms: int = 1000
+    event_outbox_max_attempts: int = 10
+    event_outbox_retry_seconds: int = 5
+    event_partition_months_ahead: int = 3
+    event_retention_months: int = 0
+    event_archive_dir: str = "archive/domain_events"
 
 
+def _int_env(name: str, default: int) -> int:
+    """Читает целочисленный env-параметр.
+    Пустое значение означает значение по умолчанию, мусор — ошибку конфигурации.
+    """
+
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError as exc:
+        raise RuntimeError(f"{name} должен быть целым числом, получено: {raw!r}") from exc
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    """Читает булев env-параметр в формате true/false, 1/0, yes/no."""
+
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _list_env(name: str) -> tuple[str, ...]:
+    """Читает список через запятую; пустые элементы отбрасываются."""
+
+    return tuple(item.strip() for item in os.getenv(name, "").split(",") if item.strip())
+
+
+def _cpu_count() -> int:
+    """Число CPU, доступных процессу: в контейнере с cpuset это меньше числа CPU хоста."""
+
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+_db_pool_size = _int_env("DB_POOL_SIZE", 5)
+_db_max_overflow = _int_env("DB_MAX_OVERFLOW", 10)
+_server_max_requests = _int_env("SERVER_MAX_REQUESTS", 10000)
+_password_hash_workers = _int_env("PASSWORD_HASH_WORKERS", 2)
+
 settings = Settings(
     database_url=os.getenv("DATABASE_URL"),
     environment=os.getenv("ENVIRONMENT", "local"),
+    db_pool_size=_db_pool_size,
+    db_max_overflow=_db_max_overflow,
+    db_pool_timeout_seconds=_int_env("DB_POOL_TIMEOUT_SECONDS", 30),
+    db_pool_recycle_seconds=_int_env("DB_POOL_RECYCLE_SECONDS", 1800),
+    db_pool_pre_ping=_bool_env("DB_POOL_PRE_PING", True),
+    db_statement_timeout_ms=_int_env("DB_STATEMENT_TIMEOUT_MS", 0),
+    diagnostics_token=os.getenv("DIAGNOSTICS_TOKEN", ""),
+    database_replica_urls=_list_env("DATABASE_REPLICA_URLS"),
+    db_replica_max_lag_seconds=_int_env("DB_REPLICA_MAX_LAG_SECONDS", 5),
+    db_replica_lag_check_seconds=_int_env("DB_REPLICA_LAG_CHECK_SECONDS", 2),
+    db_read_your_writes_seconds=_int_env("DB_READ_YOUR_WRITES_SECONDS", 5),
+    schema_check_ttl_seconds=_int_env("SCHEMA_CHECK_TTL_SECONDS", 30),
+    query_stats_enabled=_bool_env("QUERY_STATS_ENABLED", True),
+    # Server-Timing раскрывает любому клиенту число и время SQL, поэтому в production по умолчанию выключен.
+    query_stats_server_timing=_bool_env("QUERY_STATS_SERVER_TIMING", os.getenv("ENVIRONMENT", "local") != "production"),
+    query_n_plus_one_threshold=_int_env("QUERY_N_PLUS_ONE_THRESHOLD", 5),
+    auth_user_cache_ttl_seconds=_int_env("AUTH_USER_CACHE_TTL_SECONDS", 30),
+    auth_user_cache_max_size=_int_env("AUTH_USER_CACHE_MAX_SIZE", 4096),
+    auth_token_claims_enabled=_bool_env("AUTH_TOKEN_CLAIMS_ENABLED", False),
+    auth_claims_version_ttl_seconds=_int_env("AUTH_CLAIMS_VERSION_TTL_SECONDS", 5),
+    password_hash_workers=_password_hash_workers,
+    bcrypt_rounds=_int_env("BCRYPT_ROUNDS", 12),
+    response_compression_min_bytes=_int_env("RESPONSE_COMPRESSION_MIN_BYTES", 1024),
+    response_gzip_level=_int_env("RESPONSE_GZIP_LEVEL", 6),
+    response_brotli_quality=_int_env("RESPONSE_BROTLI_QUALITY", 4),
+    # Потоков threadpool столько же, сколько соединений может выдать sync-пул: лишние потоки только ждали бы соединение.
+    threadpool_size=_int_env("THREADPOOL_SIZE", _db_pool_size + _db_max_overflow),
+    server_host=os.getenv("SERVER_HOST", "0.0.0.0"),
+    server_port=_int_env("SERVER_PORT", 8000),
+    # Воркеры async: один процесс на CPU загружает ядра, bcrypt работает в отдельном пуле процессов.
+    server_workers=_int_env("SERVER_WORKERS", _cpu_count()),
+    server_preload=_bool_env("SERVER_PRELOAD", True),
+    server_max_requests=_server_max_requests,
+    server_max_requests_jitter=_int_env("SERVER_MAX_REQUESTS_JITTER", _server_max_requests // 10),
+    server_max_worker_memory_mb=_int_env("SERVER_MAX_WORKER_MEMORY_MB", 1024),
+    server_graceful_timeout_seconds=_int_env("SERVER_GRACEFUL_TIMEOUT_SECONDS", 30),
+    server_keepalive_seconds=_int_env("SERVER_KEEPALIVE_SECONDS", 5),
+    server_timeout_seconds=_int_env("SERVER_TIMEOUT_SECONDS", 60),
+    admission_enabled=_bool_env("ADMISSION_ENABLED", True),
+    admission_read_limit=_int_env("ADMISSION_READ_LIMIT", 64),
+    admission_read_queue_ms=_int_env("ADMISSION_READ_QUEUE_MS", 1000),
+    # Записи почти все sync: больше одновременных, чем потоков threadpool, только ждали бы поток без таймаута.
+    admission_write_limit=_int_env("ADMISSION_WRITE_LIMIT", _db_pool_size + _db_max_overflow),
+    admission_write_queue_ms=_int_env("ADMISSION_WRITE_QUEUE_MS", 2000),
+    # Тяжёлых операций одновременно немного и без очереди: второй экспорт подождёт на клиенте, а не в threadpool.
+    admission_bulk_limit=_int_env("ADMISSION_BULK_LIMIT", 2),
+    admission_bulk_queue_ms=_int_env("ADMISSION_BULK_QUEUE_MS", 0),
+    # Очередь bcrypt: по несколько проверок на процесс пула хэширования.
+    admission_auth_limit=_int_env("ADMISSION_AUTH_LIMIT", _password_hash_workers * 4),
+    admission_auth_queue_ms=_int_env("ADMISSION_AUTH_QUEUE_MS", 2000),
+    admission_retry_after_seconds=_int_env("ADMISSION_RETRY_AFTER_SECONDS", 2),
+    log_level=os.getenv("LOG_LEVEL", "INFO"),
+    log_json=_bool_env("LOG_JSON", True),
+    log_queue_size=_int_env("LOG_QUEUE_SIZE", 10000),
+    # event_core пишет строку на каждое событие и каждый обработчик: по умолчанию выводится каждая десятая.
+    log_sample_rates=_list_env("LOG_SAMPLE_RATES") or ("event_core=0.1",),
+    # Пустой ENABLED_MODULES — все модули из реестра; DISABLED_MODULES исключает модули из этого набора.
+    enabled_modules=_list_env("ENABLED_MODULES"),
+    disabled_modules=_list_env("DISABLED_MODULES"),
+    warmup_enabled=_bool_env("WARMUP_ENABLED", True),
+    db_warmup_connections=_int_env("DB_WARMUP_CONNECTIONS", 2),
+    # В режиме outbox publish только записывает событие, обработчики выполняет python -m app.events.dispatcher.
+    event_outbox_enabled=_bool_env("EVENT_OUTBOX_ENABLED", False),
+    event_outbox_batch_size=_int_env("EVENT_OUTBOX_BATCH_SIZE", 100),
+    event_outbox_poll_ms=_int_env("EVENT_OUTBOX_POLL_MS", 1000),
+    event_outbox_max_attempts=_int_env("EVENT_OUTBOX_MAX_ATTEMPTS", 10),
+    event_outbox_retry_seconds=_int_env("EVENT_OUTBOX_RETRY_SECONDS", 5),
+    # Секции domain_events создаёт и архивирует python -m app.events.partitions maintain; 0 месяцев — без архивации.
+    event_partition_months_ahead=_int_env("EVENT_PARTITION_MONTHS_AHEAD", 3),
+    event_retention_months=_int_env("EVENT_RETENTION_MONTHS", 0),
+    event_archive_dir=os.getenv("EVENT_ARCHIVE_DIR", "archive/domain_events"),
 )
 
 
@@ -1,16 +1,329 @@
 """Минимальный модуль работы с базой данных.
-Он существует для создания подключения без моделей и миграций.
-Минимальность ограничена только настройкой engine.
+Он существует для создания единственных engine процесса (sync и async) и их пулов соединений.
+Минимальность ограничена настройкой engine и счётчиками пула без моделей и миграций.
 """
 
-from sqlalchemy import Engine, create_engine
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import URL, Engine, create_engine, event, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
 
+_engine: Engine | None = None
+_async_engine: AsyncEngine | None = None
+_replica_engines: list[Engine] | None = None
+_async_replica_engines: list[AsyncEngine] | None = None
+_engine_lock = threading.Lock()
+
+# Async-драйверы для диалектов, которые поддерживает платформа.
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+class _PoolTelemetry:
+    """Накопительные счётчики пула соединений.
+    Живут на уровне процесса, поэтому переживают dispose/recreate пула.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, seconds: float, timed_out: bool) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def increment(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+_telemetry = _PoolTelemetry()
+_async_telemetry = _PoolTelemetry()
+
+
+class _WaitTimingMixin:
+    """Измеряет время ожидания свободного соединения в пуле.
+    Ожидание — главный сигнал того, что пул меньше реальной нагрузки.
+    """
+
+    telemetry: _PoolTelemetry
+
+    def _do_get(self) -> Any:
+        # Свободное соединение или запас overflow выдаются без ожидания; время connect ожиданием не считается.
+        if self.checkedin() > 0 or not self._overflow_exhausted():
+            return super()._do_get()
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.telemetry.record_wait(time.perf_counter() - started, timed_out)
+
+    def _overflow_exhausted(self) -> bool:
+        return self._max_overflow > -1 and self.overflow() >= self._max_overflow
+
+
+class _InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    """QueuePool sync-engine с замером ожиданий."""
+
+    telemetry = _telemetry
+
+
+class _InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    """Пул async-engine с замером ожиданий."""
+
+    telemetry = _async_telemetry
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Снимок состояния пула для диагностики."""
+
+    pool_size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    max_overflow: int
+    checkouts_total: int
+    connects_total: int
+    invalidations_total: int
+    waits_total: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    timeouts_total: int
+
+
+def _pool_options() -> dict[str, Any]:
+    """Параметры пула из Settings, общие для sync и async engine."""
+
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _build_engine(database_url: str | None = None, poolclass: type[QueuePool] = _InstrumentedQueuePool) -> Engine:
+    """Создаёт engine с параметрами пула из Settings.
+    Для SQLite параметры пула не применяются, потому что у него собственная стратегия.
+    """
+
+    url = make_url(database_url or settings.database_url)
+    if url.get_backend_name() == "sqlite":
+        return create_engine(url, pool_pre_ping=settings.db_pool_pre_ping)
+
+    connect_args: dict[str, Any] = {}
+    # statement_timeout задаётся на уровне соединения, чтобы зависший запрос не держал пул бесконечно.
+    if settings.db_statement_timeout_ms > 0 and url.get_backend_name() == "postgresql":
+        connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+
+    return create_engine(
+        url,
+        poolclass=poolclass,
+        connect_args=connect_args,
+        **_pool_options(),
+    )
+
+
+def _async_url(url: URL) -> URL:
+    """Подставляет async-драйвер вместо sync (psycopg2 → asyncpg)."""
+
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"Диалект {url.get_backend_name()} не поддерживает async-стек")
+    return url.set(drivername=driver)
+
+
+def _build_async_engine(
+    database_url: str | None = None,
+    poolclass: type[AsyncAdaptedQueuePool] = _InstrumentedAsyncQueuePool,
+) -> AsyncEngine:
+    """Создаёт async engine с теми же параметрами пула, что и sync engine."""
+
+    url = _async_url(make_url(database_url or settings.database_url))
+    if url.get_backend_name() == "sqlite":
+        return create_async_engine(url, pool_pre_ping=settings.db_pool_pre_ping)
+
+    connect_args: dict[str, Any] = {}
+    if settings.db_statement_timeout_ms > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+
+    return create_async_engine(
+        url,
+        poolclass=poolclass,
+        connect_args=connect_args,
+        **_pool_options(),
+    )
+
+
+def _attach_pool_listeners(engine: Engine, telemetry: _PoolTelemetry) -> None:
+    """Подписывает счётчики на события пула."""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        telemetry.increment("connects")
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        telemetry.increment("checkouts")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception) -> None:
+        telemetry.increment("invalidations")
+
 
 def get_engine() -> Engine:
-    """Создаёт SQLAlchemy engine.
-    Это базовое подключение для проверки доступности БД.
+    """Возвращает единственный SQLAlchemy engine процесса.
+    Engine создаётся лениво при первом обращении и переиспользуется всеми сессиями
+    и /ready, чтобы не открывать новый пул на каждый вызов. Alembic строит свой engine без statement_timeout.
+    """
+
+    global _engine
+    if _engine is not None:
+        return _engine
+    with _engine_lock:
+        if _engine is None:
+            engine = _build_engine()
+            _attach_pool_listeners(engine, _telemetry)
+            _engine = engine
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """Возвращает единственный async engine процесса.
+    Используется горячими read-endpoint'ами, которые работают в event loop без threadpool.
+    """
+
+    global _async_engine
+    if _async_engine is not None:
+        return _async_engine
+    with _engine_lock:
+        if _async_engine is None:
+            engine = _build_async_engine()
+            _attach_pool_listeners(engine.sync_engine, _async_telemetry)
+            _async_engine = engine
+    return _async_engine
+
+
+def get_replica_engines() -> list[Engine]:
+    """Engine реплик из DATABASE_REPLICA_URLS в порядке объявления; пустой список без реплик.
+    Пулы реплик не входят в счётчики /diagnostics/pool: те описывают нагрузку на primary.
+    """
+
+    global _replica_engines
+    if _replica_engines is not None:
+        return _replica_engines
+    with _engine_lock:
+        if _replica_engines is None:
+            _replica_engines = [_build_engine(url, QueuePool) for url in settings.database_replica_urls]
+    return _replica_engines
+
+
+def get_async_replica_engines() -> list[AsyncEngine]:
+    """Async engine реплик; индексы совпадают с get_replica_engines."""
+
+    global _async_replica_engines
+    if _async_replica_engines is not None:
+        return _async_replica_engines
+    with _engine_lock:
+        if _async_replica_engines is None:
+            _async_replica_engines = [
+                _build_async_engine(url, AsyncAdaptedQueuePool) for url in settings.database_replica_urls
+            ]
+    return _async_replica_engines
+
+
+def dispose_engine() -> None:
+    """Закрывает соединения sync-пула.
+    Нужен при остановке процесса и после fork, чтобы не делить сокеты между процессами.
+    """
+
+    if _engine is not None:
+        _engine.dispose()
+    for engine in _replica_engines or ():
+        engine.dispose()
+
+
+async def dispose_async_engine() -> None:
+    """Закрывает соединения async-пула."""
+
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    for engine in _async_replica_engines or ():
+        await engine.dispose()
+
+
+def reset_pools_after_fork() -> None:
+    """Даёт процессу-потомку пустые пулы.
+    Соединения, унаследованные от родителя, не закрываются: сокеты остаются за родителем.
     """
 
-    return create_engine(settings.database_url, pool_pre_ping=True)
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+    for engine in _replica_engines or ():
+        engine.dispose(close=False)
+    for engine in _async_replica_engines or ():
+        engine.sync_engine.dispose(close=False)
+
+
+def _pool_snapshot(engine: Engine, telemetry: _PoolTelemetry) -> PoolStats:
+    """Собирает снимок пула конкретного engine."""
+
+    pool = engine.pool
+    is_queue_pool = isinstance(pool, QueuePool)
+    return PoolStats(
+        pool_size=pool.size() if is_queue_pool else 0,
+        checked_out=pool.checkedout() if is_queue_pool else 0,
+        checked_in=pool.checkedin() if is_queue_pool else 0,
+        overflow=max(pool.overflow(), 0) if is_queue_pool else 0,
+        max_overflow=settings.db_max_overflow if is_queue_pool else 0,
+        checkouts_total=telemetry.checkouts,
+        connects_total=telemetry.connects,
+        invalidations_total=telemetry.invalidations,
+        waits_total=telemetry.waits,
+        wait_seconds_total=telemetry.wait_seconds_total,
+        wait_seconds_max=telemetry.wait_seconds_max,
+        timeouts_total=telemetry.timeouts,
+    )
+
+
+def get_pool_stats() -> PoolStats:
+    """Возвращает снимок sync-пула: занятые соединения, overflow и ожидания."""
+
+    return _pool_snapshot(get_engine(), _telemetry)
+
+
+def get_async_pool_stats() -> PoolStats | None:
+    """Возвращает снимок async-пула или None, если async engine ещё не создавался."""
+
+    if _async_engine is None:
+        return None
+    return _pool_snapshot(_async_engine.sync_engine, _async_telemetry)
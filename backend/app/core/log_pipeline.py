@@ -0,0 +1,208 @@
+"""Неблокирующий конвейер логов.
+Файл нужен, чтобы запись логов (event core, старт, query stats) не выполнялась в потоке запроса и не тормозила его на I/O.
+Минимальность: QueueHandler с ограниченной очередью, один поток-слушатель, JSON с request id, сэмплирование по логгерам и счётчик отброшенных записей.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import queue
+import random
+import re
+import sys
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Входящий id принимается, только если он похож на id: иначе клиент мог бы писать в лог произвольный текст.
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+# Атрибуты LogRecord, которые не считаются пользовательскими полями extra=.
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "log_records_dropped_total",
+    "Записи лога, не попавшие в вывод: sampled — отсеяны сэмплированием, queue_full — очередь переполнена.",
+    ("logger", "reason"),
+)
+
+_request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+_queue: queue.Queue | None = None
+_listener: QueueListener | None = None
+_lock = threading.Lock()
+
+
+def current_request_id() -> str | None:
+    return _request_id.get()
+
+
+def _sample_rates() -> dict[str, float]:
+    """LOG_SAMPLE_RATES вида event_core=0.1,query_stats=0.5 → доля сохраняемых записей по логгерам."""
+
+    rates: dict[str, float] = {}
+    for item in settings.log_sample_rates:
+        name, _, raw = item.partition("=")
+        try:
+            rates[name.strip()] = min(max(float(raw), 0.0), 1.0)
+        except ValueError as exc:
+            raise RuntimeError(f"LOG_SAMPLE_RATES: неверная доля для {name!r}: {raw!r}") from exc
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает долю записей ниже WARNING для шумных логгеров; предупреждения и ошибки не сэмплируются."""
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name)
+        if rate is None or rate >= 1.0 or random.random() < rate:
+            return True
+        LOG_RECORDS_DROPPED.inc(logger=record.name, reason="sampled")
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler, который в потоке запроса только собирает сообщение и кладёт его в очередь.
+    Форматирование в JSON и вывод выполняет поток QueueListener; при полной очереди запись отбрасывается.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Аргументы подставляются сразу: к моменту вывода изменяемые объекты могли бы поменяться.
+        prepared = copy.copy(record)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = logging.Formatter().formatException(record.exc_info)
+            prepared.exc_info = None
+        prepared.request_id = _request_id.get()
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc(logger=record.name, reason="queue_full")
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на запись: время UTC, уровень, логгер, сообщение, request id и поля extra=."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            payload["request_id"] = request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return orjson.dumps(payload, default=str).decode("utf-8")
+
+
+class TextFormatter(logging.Formatter):
+    """Текстовый формат для локальной разработки."""
+
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = "-"
+        return super().format(record)
+
+
+def configure_logging() -> None:
+    """Ставит очередь логов на корневой логгер. Повторный вызов ничего не меняет.
+    Записи копятся в очереди до start_log_listener: поток-слушатель нельзя запускать до fork воркеров.
+    """
+
+    global _queue
+    with _lock:
+        if _queue is not None:
+            return
+        _queue = queue.Queue(maxsize=max(settings.log_queue_size, 1))
+        handler = NonBlockingQueueHandler(_queue)
+        handler.addFilter(SamplingFilter(_sample_rates()))
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(settings.log_level.upper())
+
+
+def start_log_listener() -> None:
+    """Запускает поток вывода в текущем процессе; вызывается на старте воркера, после fork."""
+
+    global _listener
+    configure_logging()
+    with _lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(JsonFormatter() if settings.log_json else TextFormatter())
+        _listener = QueueListener(_queue, output, respect_handler_level=True)
+        _listener.start()
+
+
+def stop_log_listener() -> None:
+    """Выводит накопленные записи и останавливает поток; вызывается при остановке процесса."""
+
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def _queue_depth() -> list[tuple[tuple[str, ...], float]]:
+    return [] if _queue is None else [((), float(_queue.qsize()))]
+
+
+registry.callback_gauge("log_queue_records", "Записи лога в очереди на вывод.", _queue_depth)
+
+
+class RequestIdMiddleware:
+    """ASGI middleware: id запроса для логов и ответа.
+    Берётся из X-Request-ID клиента или прокси, если он корректен, иначе генерируется.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = MutableHeaders(scope=scope).get(REQUEST_ID_HEADER)
+        request_id = incoming if incoming and _REQUEST_ID_RE.match(incoming) else uuid.uuid4().hex
+        token = _request_id.set(request_id)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_id.reset(token)
@@ -0,0 +1,399 @@
+"""Встроенные метрики процесса в формате Prometheus.
+Файл нужен, чтобы видеть нагрузку по маршрутам, пулу БД и обработчикам событий без внешних библиотек.
+Минимальность: счётчики, gauge и гистограммы в памяти процесса плюс текстовый экспорт.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Callable, Iterable
+
+import anyio.to_thread
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.db import get_async_pool_stats, get_pool_stats
+
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Общая часть метрик: имя, описание и набор меток."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Монотонный счётчик."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Значение, которое может расти и уменьшаться."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class CallbackGauge(_Metric):
+    """Gauge, значения которого собираются в момент scrape.
+    Нужен для состояния, которое уже хранится в другом месте (пул БД, threadpool).
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Iterable[tuple[LabelValues, float]]],
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._collect()
+        ]
+
+
+class CallbackCounter(CallbackGauge):
+    """Счётчик, значения которого собираются в момент scrape.
+    Нужен для накопительных значений, которые уже считаются в другом месте: по ним работает rate().
+    """
+
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    """Гистограмма с кумулятивными bucket'ами в терминах Prometheus."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+                self._counts[key] = counts
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        lines: list[str] = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+            self._metrics[metric.name] = metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        metric = Gauge(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.register(metric)
+        return metric
+
+    def callback_gauge(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Iterable[tuple[LabelValues, float]]],
+        labelnames: tuple[str, ...] = (),
+    ) -> CallbackGauge:
+        metric = CallbackGauge(name, documentation, collect, labelnames)
+        self.register(metric)
+        return metric
+
+    def callback_counter(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Iterable[tuple[LabelValues, float]]],
+        labelnames: tuple[str, ...] = (),
+    ) -> CallbackCounter:
+        metric = CallbackCounter(name, documentation, collect, labelnames)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        """Возвращает все метрики в текстовом формате Prometheus 0.0.4."""
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.extend(metric.header())
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS_TOTAL = registry.counter(
+    "http_requests_total",
+    "Число HTTP-запросов по маршруту, методу и статусу.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "Длительность обработки HTTP-запроса.",
+    ("method", "route"),
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress",
+    "Число HTTP-запросов в обработке.",
+    ("method",),
+)
+EVENT_HANDLER_DURATION = registry.histogram(
+    "event_handler_duration_seconds",
+    "Длительность выполнения обработчика доменного события.",
+    ("event_type", "handler"),
+)
+EVENT_HANDLER_FAILURES = registry.counter(
+    "event_handler_failures_total",
+    "Число исключений в обработчиках доменных событий.",
+    ("event_type", "handler"),
+)
+
+
+def _collect_db_pool() -> list[tuple[LabelValues, float]]:
+    """Снимает gauge пулов sync и async engine в момент scrape."""
+
+    samples: list[tuple[LabelValues, float]] = []
+    pools = [("sync", get_pool_stats()), ("async", get_async_pool_stats())]
+    for engine_name, stats in pools:
+        if stats is None:
+            continue
+        samples.extend(
+            [
+                ((engine_name, "size"), stats.pool_size),
+                ((engine_name, "checked_out"), stats.checked_out),
+                ((engine_name, "checked_in"), stats.checked_in),
+                ((engine_name, "overflow"), stats.overflow),
+                ((engine_name, "max_overflow"), stats.max_overflow),
+            ]
+        )
+    return samples
+
+
+def _collect_pool_field(field: str) -> Callable[[], list[tuple[LabelValues, float]]]:
+    """Одно поле PoolStats по пулам sync и async engine."""
+
+    def collect() -> list[tuple[LabelValues, float]]:
+        pools = [("sync", get_pool_stats()), ("async", get_async_pool_stats())]
+        return [((engine_name,), getattr(stats, field)) for engine_name, stats in pools if stats is not None]
+
+    return collect
+
+
+def _collect_threadpool() -> list[tuple[LabelValues, float]]:
+    """Заполненность threadpool AnyIO, в котором выполняются sync-endpoint'ы.
+    Лимитер доступен только из event loop, поэтому вне его метрика пропускается.
+    """
+
+    try:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+    except RuntimeError:
+        return []
+    return [
+        (("total",), float(limiter.total_tokens)),
+        (("borrowed",), float(limiter.borrowed_tokens)),
+        (("waiting",), float(limiter.statistics().tasks_waiting)),
+    ]
+
+
+registry.callback_gauge(
+    "db_pool_connections",
+    "Состояние пула соединений БД.",
+    _collect_db_pool,
+    ("engine", "state"),
+)
+registry.callback_counter(
+    "db_pool_waits_total",
+    "Число ожиданий свободного соединения пула БД.",
+    _collect_pool_field("waits_total"),
+    ("engine",),
+)
+registry.callback_counter(
+    "db_pool_wait_seconds_total",
+    "Суммарное время ожидания свободного соединения пула БД.",
+    _collect_pool_field("wait_seconds_total"),
+    ("engine",),
+)
+registry.callback_counter(
+    "db_pool_timeouts_total",
+    "Число ожиданий соединения пула БД, завершившихся таймаутом.",
+    _collect_pool_field("timeouts_total"),
+    ("engine",),
+)
+registry.callback_gauge(
+    "db_pool_wait_seconds_max",
+    "Самое долгое ожидание свободного соединения пула БД с начала работы процесса.",
+    _collect_pool_field("wait_seconds_max"),
+    ("engine",),
+)
+registry.callback_gauge(
+    "threadpool_tokens",
+    "Потоки AnyIO threadpool: лимит, занятые и ожидающие задачи.",
+    _collect_threadpool,
+    ("state",),
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware, считающий запросы и latency по шаблону маршрута.
+    Шаблон (например /tasks/{task_id}) берётся после роутинга, чтобы не раздувать кардинальность.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method=method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec(method=method)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=method, route=route_path)
+            HTTP_REQUESTS_TOTAL.inc(method=method, route=route_path, status=str(status_code))
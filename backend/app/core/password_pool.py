@@ -0,0 +1,134 @@
+"""Пул процессов для хэширования паролей.
+Файл нужен, чтобы bcrypt не занимал потоки threadpool и event loop во время всплеска логинов.
+Минимальность: ProcessPoolExecutor с ограничением числа процессов и метрики очереди.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+import anyio.to_thread
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+T = TypeVar("T")
+
+PASSWORD_HASH_DURATION = registry.histogram(
+    "password_hash_duration_seconds",
+    "Время операции с паролем от постановки в очередь до результата.",
+    ("op",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+class PasswordPool:
+    """Ограниченный пул процессов под bcrypt.
+    Число процессов и есть предел одновременных операций: остальные ждут в очереди executor'а.
+    workers=0 выполняет работу в вызывающем потоке или threadpool, как до появления пула.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, а не fork: процесс приложения держит потоки и соединения с БД, копировать их нельзя.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _finish(self, op: str, started: float) -> None:
+        with self._lock:
+            self._pending -= 1
+        PASSWORD_HASH_DURATION.observe(time.perf_counter() - started, op=op)
+
+    def _discard_broken(self, executor: ProcessPoolExecutor) -> None:
+        # Упавший процесс ломает executor целиком; следующий вызов поднимет новый.
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def _submit(self, op: str, fn: Callable[..., T], *args: Any) -> Future:
+        executor = self._get_executor()
+        started = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._finish(op, started)
+            self._discard_broken(executor)
+            raise
+
+        def on_done(done: Future) -> None:
+            self._finish(op, started)
+            if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+                self._discard_broken(executor)
+
+        future.add_done_callback(on_done)
+        return future
+
+    def run(self, op: str, fn: Callable[..., T], *args: Any) -> T:
+        """Выполняет fn(*args) в пуле и ждёт результат в текущем потоке."""
+
+        if self.workers <= 0:
+            started = time.perf_counter()
+            with self._lock:
+                self._pending += 1
+            try:
+                return fn(*args)
+            finally:
+                self._finish(op, started)
+        return self._submit(op, fn, *args).result()
+
+    async def run_async(self, op: str, fn: Callable[..., T], *args: Any) -> T:
+        """Async-вариант run: ожидание не занимает ни event loop, ни поток threadpool."""
+
+        if self.workers <= 0:
+            # Без пула работа уходит в threadpool, иначе bcrypt остановил бы event loop.
+            return await anyio.to_thread.run_sync(self.run, op, fn, *args)
+        return await asyncio.wrap_future(self._submit(op, fn, *args))
+
+    def queue_state(self) -> tuple[int, int]:
+        """Возвращает (выполняются, ждут в очереди)."""
+
+        with self._lock:
+            pending = self._pending
+        if self.workers <= 0:
+            return pending, 0
+        return min(pending, self.workers), max(pending - self.workers, 0)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordPool(workers=settings.password_hash_workers)
+
+
+def _collect_queue() -> list[tuple[tuple[str, ...], float]]:
+    running, queued = password_pool.queue_state()
+    return [(("running",), float(running)), (("queued",), float(queued))]
+
+
+registry.callback_gauge(
+    "password_hash_jobs",
+    "Операции с паролями в пуле процессов: выполняются и ждут в очереди.",
+    _collect_queue,
+    ("state",),
+)
@@ -0,0 +1,167 @@
+"""Учёт SQL-запросов в рамках HTTP-запроса.
+Файл нужен, чтобы видеть число и время statement'ов на каждый запрос и ловить N+1.
+Минимальность: счётчики в contextvar, заголовок Server-Timing и строка лога без хранения истории.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter as ShapeCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import Engine, event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger("query_stats")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Списки параметров IN (...) разной длины сводятся к одной форме, иначе цикл по id не склеится.
+_PARAM_LIST_RE = re.compile(r"\(\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+|:\w+))*\s*\)")
+
+DB_STATEMENTS_PER_REQUEST = registry.histogram(
+    "http_request_db_statements",
+    "Число SQL statement'ов на один HTTP-запрос.",
+    ("method", "route"),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+N_PLUS_ONE_SUSPECTED = registry.counter(
+    "db_n_plus_one_suspected_total",
+    "Запросы, в которых одинаковый statement повторился не меньше порога.",
+    ("method", "route"),
+)
+
+
+def statement_shape(statement: str) -> str:
+    """Нормализует SQL до формы: параметры уже вынесены драйвером, остаются пробелы и длина IN-списков."""
+
+    return _PARAM_LIST_RE.sub("(?)", _WHITESPACE_RE.sub(" ", statement).strip())
+
+
+@dataclass
+class QueryStats:
+    """Накопленные статистики statement'ов одного запроса."""
+
+    statements: int = 0
+    duration_seconds: float = 0.0
+    rows: int = 0
+    shapes: ShapeCounter = field(default_factory=ShapeCounter)
+    # Внешний блок track_queries: вложенный учёт (например, middleware внутри инструмента) виден и снаружи.
+    parent: QueryStats | None = field(default=None, repr=False, compare=False)
+
+    def record(self, statement: str, duration: float, rows: int) -> None:
+        shape = statement_shape(statement)
+        stats: QueryStats | None = self
+        while stats is not None:
+            stats.statements += 1
+            stats.duration_seconds += duration
+            stats.rows += max(rows, 0)
+            stats.shapes[shape] += 1
+            stats = stats.parent
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        """Формы statement'ов, выполненные не меньше threshold раз, — кандидаты в N+1."""
+
+        if threshold <= 1:
+            return []
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Считает statement'ы, выполненные внутри блока в текущем контексте.
+    Контекст копируется в threadpool и greenlet async-драйвера, поэтому учитываются оба стека.
+    """
+
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+# Слушатели вешаются на класс Engine, поэтому покрывают и sync engine, и sync_engine async-стека.
+# Вне track_queries (старт, фоновые задачи) они ничего не делают.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    if _current_stats.get() is not None:
+        connection.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current_stats.get()
+    started_stack = connection.info.get("query_stats_started")
+    if stats is None or not started_stack:
+        return
+    duration = time.perf_counter() - started_stack.pop()
+    # rowcount для SELECT отдают не все драйверы (SQLite — нет), поэтому -1 считается как 0.
+    rows = cursor.rowcount if cursor.description is not None else 0
+    stats.record(statement, duration, rows)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware: учёт SQL на запрос, заголовок Server-Timing и подсветка N+1."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.query_stats_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    # Заголовки отправляются до тела, поэтому в Server-Timing попадает всё, что выполнено до ответа.
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.duration_seconds * 1000:.1f};desc="{stats.statements} statements"',
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper if settings.query_stats_server_timing else send)
+            finally:
+                self._report(scope, stats)
+
+    def _report(self, scope: Scope, stats: QueryStats) -> None:
+        method = scope["method"]
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        DB_STATEMENTS_PER_REQUEST.observe(stats.statements, method=method, route=route)
+        logger.debug(
+            "QUERY_STATS | %s %s statements=%s rows=%s db_ms=%.1f",
+            method,
+            route,
+            stats.statements,
+            stats.rows,
+            stats.duration_seconds * 1000,
+        )
+
+        repeated = stats.repeated_shapes(settings.query_n_plus_one_threshold)
+        if not repeated:
+            return
+        N_PLUS_ONE_SUSPECTED.inc(method=method, route=route)
+        for shape, count in repeated:
+            logger.warning(
+                "QUERY_STATS | возможный N+1 в %s %s: statement повторён %s раз: %s",
+                method,
+                route,
+                count,
+                shape[:300],
+            )
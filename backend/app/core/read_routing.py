@@ -0,0 +1,262 @@
+"""Маршрутизация чтений на реплики БД.
+Файл нужен, чтобы тяжёлые чтения (выгрузки, деревья, календарь, списки пользователей) не конкурировали с записью на primary.
+Минимальность: выбор реплики в get_bind сессии только для помеченных GET-маршрутов, проверка отставания с кэшем и read-your-writes по времени последней записи.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import itertools
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from fastapi import Request
+from sqlalchemy import CompoundSelect, Engine, Select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.db import get_async_replica_engines, get_replica_engines
+from app.core.metrics import registry
+
+logger = logging.getLogger("read_routing")
+
+SAFE_METHODS = frozenset({"GET", "HEAD"})
+LAST_WRITE_COOKIE = "db_last_write"
+# Ключ session.info: сессия писала или выполняла произвольный SQL и до конца работает с primary.
+_PINNED_KEY = "read_routing_primary"
+_RECENT_WRITERS_MAX = 10_000
+
+# Отставание standby: 0, если всё полученное WAL уже применено (на простаивающем primary
+# время последней транзакции стареет, и без этой проверки реплика выглядела бы отстающей).
+_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+READ_ROUTING = registry.counter(
+    "db_read_routing_total",
+    "Решения о маршрутизации чтений помеченных запросов: replica или primary с причиной.",
+    ("target", "reason"),
+)
+REPLICA_LAG = registry.gauge(
+    "db_replica_lag_seconds",
+    "Последнее измеренное отставание реплики; -1 — реплика недоступна.",
+    ("replica",),
+)
+
+
+@dataclass
+class _ReadRoute:
+    """Решение на один HTTP-запрос: все сессии запроса читают с одной реплики."""
+
+    resolved: bool = False
+    replica: int | None = None
+
+
+@dataclass
+class _ReplicaState:
+    lag_seconds: float | None = None
+    checked_at: float = float("-inf")
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+_current_route: ContextVar[_ReadRoute | None] = ContextVar("read_route", default=None)
+_replica_states = [_ReplicaState() for _ in settings.database_replica_urls]
+_round_robin = itertools.count()
+# Запоминание записей по subject токена покрывает клиентов без cookie, но только в пределах процесса.
+_recent_writers: dict[str, float] = {}
+_recent_writers_lock = threading.Lock()
+
+
+def _probe_lag(engine: Engine) -> float | None:
+    """Отставание реплики в секундах; None, если реплика недоступна."""
+
+    try:
+        with engine.connect() as connection:
+            if connection.dialect.name != "postgresql":
+                return 0.0
+            return float(connection.scalar(_LAG_SQL) or 0.0)
+    except SQLAlchemyError as exc:
+        logger.warning("READ_ROUTING | реплика недоступна: %s", exc.__class__.__name__)
+        return None
+
+
+def _replica_lag(index: int, engine: Engine) -> float | None:
+    """Отставание из кэша; проверку выполняет один поток, остальные берут прежнее значение."""
+
+    state = _replica_states[index]
+    if time.monotonic() - state.checked_at < settings.db_replica_lag_check_seconds:
+        return state.lag_seconds
+    if not state.lock.acquire(blocking=False):
+        return state.lag_seconds
+    try:
+        state.lag_seconds = _probe_lag(engine)
+        state.checked_at = time.monotonic()
+    finally:
+        state.lock.release()
+    REPLICA_LAG.set(-1 if state.lag_seconds is None else state.lag_seconds, replica=str(index))
+    return state.lag_seconds
+
+
+def _choose_replica(engines: list[Engine]) -> int | None:
+    """Реплика по кругу среди доступных с отставанием не выше порога; None — читать с primary."""
+
+    fresh = []
+    for index, engine in enumerate(engines):
+        lag = _replica_lag(index, engine)
+        if lag is not None and lag <= settings.db_replica_max_lag_seconds:
+            fresh.append(index)
+    if not fresh:
+        return None
+    return fresh[next(_round_robin) % len(fresh)]
+
+
+class RoutingSession(Session):
+    """Сессия, которая в помеченных запросах отправляет SELECT на реплику.
+    Flush, bulk-запись и произвольный SQL идут на primary и закрепляют сессию за ним,
+    чтобы следующие чтения видели собственную запись.
+    """
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        route = _current_route.get()
+        if route is None or self.info.get(_PINNED_KEY):
+            return primary
+        if self._flushing or not isinstance(clause, (Select, CompoundSelect)):
+            self.info[_PINNED_KEY] = True
+            return primary
+
+        is_async = primary.dialect.is_async
+        engines = [engine.sync_engine for engine in get_async_replica_engines()] if is_async else get_replica_engines()
+        if not route.resolved:
+            route.replica = _choose_replica(engines)
+            route.resolved = True
+            if route.replica is None:
+                READ_ROUTING.inc(target="primary", reason="no_fresh_replica")
+            else:
+                READ_ROUTING.inc(target="replica", reason="fresh")
+        return primary if route.replica is None else engines[route.replica]
+
+
+def _token_subject(authorization: str | None) -> str | None:
+    """subject из Bearer-токена без проверки подписи.
+    Подделанный subject может лишь отправить чтения на primary, поэтому проверка здесь не нужна.
+    """
+
+    if not authorization or authorization[:7].lower() != "bearer ":
+        return None
+    parts = authorization[7:].split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+    except (ValueError, binascii.Error):
+        return None
+    subject = payload.get("sub") if isinstance(payload, dict) else None
+    return None if subject is None else str(subject)
+
+
+def _remember_writer(subject: str) -> None:
+    deadline = time.monotonic() + settings.db_read_your_writes_seconds
+    with _recent_writers_lock:
+        if len(_recent_writers) >= _RECENT_WRITERS_MAX:
+            now = time.monotonic()
+            for key in [key for key, until in _recent_writers.items() if until <= now]:
+                del _recent_writers[key]
+            if len(_recent_writers) >= _RECENT_WRITERS_MAX:
+                del _recent_writers[next(iter(_recent_writers))]
+        _recent_writers.pop(subject, None)
+        _recent_writers[subject] = deadline
+
+
+def _wrote_recently(request: Request) -> bool:
+    raw = request.cookies.get(LAST_WRITE_COOKIE)
+    if raw is not None and raw.isdigit():
+        if int(raw) / 1000 + settings.db_read_your_writes_seconds > time.time():
+            return True
+    subject = _token_subject(request.headers.get("authorization"))
+    if subject is None:
+        return False
+    with _recent_writers_lock:
+        until = _recent_writers.get(subject)
+    return until is not None and until > time.monotonic()
+
+
+async def replica_reads(request: Request) -> None:
+    """Зависимость маршрута: разрешает читать с реплики.
+    Ставится только на GET-маршруты без записи и первой в dependencies, чтобы под неё попали
+    и сессии других зависимостей (пользователь, версии conditional GET). Клиент, который недавно
+    писал, читает с primary: иначе он мог бы не увидеть собственное изменение.
+    """
+
+    if not settings.database_replica_urls or request.method not in SAFE_METHODS:
+        return
+    if _wrote_recently(request):
+        READ_ROUTING.inc(target="primary", reason="recent_write")
+        return
+    _current_route.set(_ReadRoute())
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware: границы решения о реплике и отметка клиента после успешной записи.
+    Отметка — cookie со временем записи (видна всем воркерам) и subject токена в памяти процесса
+    (для клиентов, которые не отправляют cookie).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.database_replica_urls:
+            await self.app(scope, receive, send)
+            return
+
+        # Решение живёт ровно один запрос, даже если сервер обрабатывает запросы в общем контексте.
+        token = _current_route.set(None)
+        try:
+            if scope["method"] in SAFE_METHODS:
+                await self.app(scope, receive, send)
+            else:
+                await self.app(scope, receive, self._mark_writer(scope, send))
+        finally:
+            _current_route.reset(token)
+
+    @staticmethod
+    def _mark_writer(scope: Scope, send: Send) -> Send:
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{LAST_WRITE_COOKIE}={int(time.time() * 1000)}; Max-Age={settings.db_read_your_writes_seconds}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+                subject = _token_subject(MutableHeaders(scope=scope).get("authorization"))
+                if subject is not None:
+                    _remember_writer(subject)
+            await send(message)
+
+        return send_wrapper
+
+
+def replica_status() -> list[dict]:
+    """Последние замеры реплик для диагностики; URL не выводятся, в них пароли."""
+
+    now = time.monotonic()
+    return [
+        {
+            "replica": index,
+            "lag_seconds": state.lag_seconds,
+            "checked_seconds_ago": None if state.checked_at == float("-inf") else round(now - state.checked_at, 1),
+        }
+        for index, state in enumerate(_replica_states)
+    ]
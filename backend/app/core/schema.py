@@ -0,0 +1,144 @@
+"""Проверка готовности схемы БД.
+Файл нужен, чтобы одним запросом сверить ревизию Alembic и наличие обязательных таблиц.
+Минимальность: только чтение каталога и alembic_version, схема здесь не меняется.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+from alembic.script import ScriptDirectory
+from alembic.script.revision import RevisionError
+from sqlalchemy import Engine, bindparam, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+
+ALEMBIC_SCRIPTS_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+# Каталог таблиц зависит от диалекта, остальная часть запроса общая.
+_CATALOG_SQL = {
+    "postgresql": (
+        "SELECT table_name AS name FROM information_schema.tables "
+        "WHERE table_schema = ANY(current_schemas(false))"
+    ),
+    "sqlite": "SELECT name FROM sqlite_master WHERE type = 'table'",
+}
+
+
+@dataclass(frozen=True)
+class SchemaVerdict:
+    """Результат проверки схемы.
+    Хранит причину, чтобы /ready и стартовые логи показывали одинаковую диагностику.
+    """
+
+    ok: bool
+    reason: str | None
+    expected_heads: tuple[str, ...] = ()
+    current_revisions: tuple[str, ...] = ()
+    missing_tables: tuple[str, ...] = ()
+    checked_at: float = field(default_factory=time.monotonic)
+
+
+_cached_verdict: SchemaVerdict | None = None
+_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _script_directory() -> ScriptDirectory:
+    return ScriptDirectory(str(ALEMBIC_SCRIPTS_DIR))
+
+
+@lru_cache(maxsize=1)
+def get_expected_heads() -> tuple[str, ...]:
+    """Возвращает head-ревизии из файлов миграций.
+    Читается один раз на процесс: набор миграций не меняется без редеплоя.
+    """
+
+    return tuple(sorted(_script_directory().get_heads()))
+
+
+def _heads_behind(current_revisions: tuple[str, ...], expected_heads: tuple[str, ...]) -> tuple[str, ...]:
+    """Head-ревизии кода, до которых БД ещё не доведена.
+    БД впереди кода — норма раската: миграции нового релиза применяются раньше, чем уходят старые pod'ы.
+    Ревизия, которой нет в локальных файлах, считается миграцией более нового релиза.
+    """
+
+    revision_map = _script_directory().revision_map
+    reached: set[str] = set()
+    for revision in current_revisions:
+        try:
+            reached.update(item.revision for item in revision_map.iterate_revisions(revision, "base"))
+        except RevisionError:
+            return ()
+    return tuple(head for head in expected_heads if head not in reached)
+
+
+def _build_check_query(dialect_name: str, required_tables: list[str]):
+    """Собирает единый запрос: найденные обязательные таблицы + текущие ревизии Alembic."""
+
+    catalog_sql = _CATALOG_SQL.get(dialect_name)
+    if catalog_sql is None:
+        raise RuntimeError(f"Проверка схемы не поддерживает диалект {dialect_name}")
+    return text(
+        f"SELECT 'table' AS kind, catalog.name AS value FROM ({catalog_sql}) AS catalog "
+        "WHERE catalog.name IN :required_tables "
+        "UNION ALL "
+        "SELECT 'revision' AS kind, version_num AS value FROM alembic_version"
+    ).bindparams(bindparam("required_tables", value=list(required_tables), expanding=True))
+
+
+def check_schema(engine: Engine, required_tables: list[str]) -> SchemaVerdict:
+    """Выполняет проверку схемы одним round-trip и кэширует вердикт."""
+
+    global _cached_verdict
+    expected_heads = get_expected_heads()
+    query = _build_check_query(engine.dialect.name, required_tables)
+    try:
+        with engine.connect() as connection:
+            rows = connection.execute(query).all()
+    except SQLAlchemyError as exc:
+        # Отсутствие alembic_version тоже попадает сюда: миграции не применялись вовсе.
+        verdict = SchemaVerdict(
+            ok=False,
+            reason=f"Не удалось проверить схему (alembic upgrade head не выполнен?): {getattr(exc, 'orig', exc)}",
+            expected_heads=expected_heads,
+        )
+    else:
+        found_tables = {value for kind, value in rows if kind == "table"}
+        current_revisions = tuple(sorted(value for kind, value in rows if kind == "revision"))
+        missing_tables = tuple(name for name in required_tables if name not in found_tables)
+        reason = None
+        if missing_tables:
+            reason = f"Не найдены таблицы: {', '.join(missing_tables)}"
+        elif not current_revisions or _heads_behind(current_revisions, expected_heads):
+            reason = (
+                f"Ревизия БД {', '.join(current_revisions) or '—'} "
+                f"отстаёт от head миграций {', '.join(expected_heads)}"
+            )
+        verdict = SchemaVerdict(
+            ok=reason is None,
+            reason=reason,
+            expected_heads=expected_heads,
+            current_revisions=current_revisions,
+            missing_tables=missing_tables,
+        )
+
+    with _cache_lock:
+        _cached_verdict = verdict
+    return verdict
+
+
+def get_schema_verdict(engine: Engine, required_tables: list[str]) -> SchemaVerdict:
+    """Возвращает кэшированный вердикт и обновляет его не чаще SCHEMA_CHECK_TTL_SECONDS.
+    Так /ready можно опрашивать каждую секунду без запросов к каталогу на каждый probe.
+    """
+
+    verdict = _cached_verdict
+    if verdict is not None and time.monotonic() - verdict.checked_at < settings.schema_check_ttl_seconds:
+        return verdict
+    return check_schema(engine, required_tables)
@@ -5,23 +5,31 @@
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
-
+from app.core.config import settings
 from app.core.context import UserContext
+from app.core.db import get_async_engine
+from app.core.user_cache import CachedUser, user_context_cache
+from app.modules.auth.claims import bind_claims, claims_are_fresh_async, parse_claims
 from app.modules.auth.security import decode_access_token
-from app.modules.auth.service import get_db, get_user_by_id
+from app.modules.auth.service import AsyncSessionLocal, get_user_by_id_async
 
 security = HTTPBearer()
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
 ) -> UserContext:
     """Возвращает текущего пользователя по access token.
     Реализует только техническую проверку токена и загрузку пользователя.
+    Зависимость async, чтобы проверка токена не занимала поток threadpool на каждом запросе.
+    Проверенный токен кэшируется: повторный запрос не проверяет подпись и не берёт соединение из пула.
+    Сессия открывается только на промахе кэша и закрывается до возврата: соединение не держится весь обработчик.
     """
 
+    cached = user_context_cache.get(credentials.credentials)
+    if cached is not None:
+        bind_claims(cached.claims)
+        return cached.context
     try:
         payload = decode_access_token(credentials.credentials)
     except ValueError:
@@ -35,10 +43,19 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
         )
-    user = get_user_by_id(db, int(user_id))
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
-    return UserContext(id=user.id, username=user.username)
+    claims = parse_claims(payload) if settings.auth_token_claims_enabled else None
+    bind_claims(claims)
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        # Штамп версии актуален — пользователь не менялся с выпуска токена, читать его из БД не нужно.
+        if claims is not None and await claims_are_fresh_async(db, claims):
+            user_context = UserContext(id=claims.user_id, username=claims.username)
+        else:
+            user = await get_user_by_id_async(db, int(user_id))
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found",
+                )
+            user_context = UserContext(id=user.id, username=user.username)
+    user_context_cache.put(credentials.credentials, CachedUser(user_context, claims), payload.get("exp"))
+    return user_context
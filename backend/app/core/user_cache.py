@@ -0,0 +1,134 @@
+"""Кэш проверенных access token → UserContext.
+Файл нужен, чтобы get_current_user не ходил в БД за пользователем на каждом запросе.
+Минимальность: LRU с TTL в памяти процесса и сброс по изменению пользователя в ORM.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.context import UserContext
+from app.core.metrics import registry
+from app.modules.auth.claims import AccessClaims
+from app.modules.auth.models import User
+
+AUTH_USER_CACHE_LOOKUPS = registry.counter(
+    "auth_user_cache_lookups_total",
+    "Обращения к кэшу пользователей get_current_user по результату (hit/miss).",
+    ("result",),
+)
+AUTH_USER_CACHE_INVALIDATIONS = registry.counter(
+    "auth_user_cache_invalidations_total",
+    "Сбросы записей кэша пользователей из-за изменения или удаления пользователя.",
+)
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Запись кэша: контекст пользователя и claims доступа из того же токена."""
+
+    context: UserContext
+    claims: AccessClaims | None = None
+
+
+class UserContextCache:
+    """Ограниченный LRU-кэш token → UserContext со сроком жизни записи.
+    Запись живёт не дольше TTL и не дольше exp самого токена.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[CachedUser, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, token: str) -> CachedUser | None:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(token)
+                AUTH_USER_CACHE_LOOKUPS.inc(result="hit")
+                return entry[0]
+            if entry is not None:
+                del self._entries[token]
+        AUTH_USER_CACHE_LOOKUPS.inc(result="miss")
+        return None
+
+    def put(self, token: str, user: CachedUser, token_expires_at: int | None) -> None:
+        if not self.enabled:
+            return None
+        expires_at = time.monotonic() + self.ttl_seconds
+        if token_expires_at is not None:
+            # exp задан в unix-времени, а кэш живёт на monotonic: переводим остаток срока токена.
+            expires_at = min(expires_at, time.monotonic() + (token_expires_at - time.time()))
+        with self._lock:
+            self._entries[token] = (user, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Удаляет все токены пользователя. Изменения пользователей редки, поэтому полный проход допустим."""
+
+        with self._lock:
+            stale = [token for token, (user, _) in self._entries.items() if user.context.id == user_id]
+            for token in stale:
+                del self._entries[token]
+        if stale:
+            AUTH_USER_CACHE_INVALIDATIONS.inc(len(stale))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+user_context_cache = UserContextCache(
+    ttl_seconds=settings.auth_user_cache_ttl_seconds,
+    max_size=settings.auth_user_cache_max_size,
+)
+
+registry.callback_gauge(
+    "auth_user_cache_entries",
+    "Число записей в кэше пользователей get_current_user.",
+    lambda: [((), float(len(user_context_cache)))],
+)
+
+_PENDING_KEY = "auth_user_cache_pending"
+
+
+# Слушатели вешаются на класс Session и покрывают sync- и async-сессии (у AsyncSession внутри sync Session).
+# Изменённые пользователи копятся при flush, а сбрасываются после commit: до commit другие
+# транзакции всё ещё видят старую строку, и кэш с ней остаётся согласованным.
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    changed = {obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        user_context_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,143 @@
+"""Прогрев воркера после старта и замер фаз старта.
+Файл нужен, чтобы первые запросы после деплоя не платили за открытие соединений, компиляцию SQL и сборку схем.
+Минимальность: фоновая задача из трёх фаз, флаг готовности для /ready и длительности фаз для диагностики.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import AsyncExitStack, ExitStack, contextmanager
+
+import anyio.to_thread
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.db import get_async_engine, get_engine
+from app.core.metrics import registry
+from app.modules.auth.service import AsyncSessionLocal
+from app.modules.registry import warmup_hooks
+
+logger = logging.getLogger("startup")
+
+STARTUP_PHASE_SECONDS = registry.gauge(
+    "startup_phase_seconds",
+    "Длительность фаз старта и прогрева воркера.",
+    ("phase",),
+)
+
+_phases: dict[str, float] = {}
+_warmup_task: asyncio.Task | None = None
+_warmup_finished = False
+
+
+@contextmanager
+def startup_phase(name: str) -> Iterator[None]:
+    """Замеряет фазу старта: длительность попадает в лог, метрику и /diagnostics/startup."""
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        _phases[name] = elapsed
+        STARTUP_PHASE_SECONDS.set(elapsed, phase=name)
+        logger.info("STARTUP | фаза %s: %.3f с", name, elapsed)
+
+
+def startup_phases() -> dict[str, float]:
+    return {name: round(seconds, 4) for name, seconds in _phases.items()}
+
+
+def warmup_finished() -> bool:
+    return _warmup_finished
+
+
+def _open_sync_connections(count: int) -> None:
+    with ExitStack() as stack:
+        for _ in range(count):
+            stack.enter_context(get_engine().connect())
+
+
+async def _warm_pools() -> None:
+    """Открывает соединения sync- и async-пула одновременно: после закрытия они остаются в пуле."""
+
+    count = min(settings.db_warmup_connections, settings.db_pool_size)
+    if count <= 0:
+        return
+    await anyio.to_thread.run_sync(_open_sync_connections, count)
+    engine = get_async_engine()
+    async with AsyncExitStack() as stack:
+        for _ in range(count):
+            await stack.enter_async_context(engine.connect())
+
+
+async def _warm_statements() -> None:
+    """Выполняет горячие запросы включённых модулей: скомпилированный SQL остаётся в кэше engine."""
+
+    for name, hook in warmup_hooks():
+        async with AsyncSessionLocal(bind=get_async_engine()) as db:
+            await hook(db)
+        logger.debug("STARTUP | прогрев запросов модуля %s", name)
+
+
+def _warm_validators(app: FastAPI) -> None:
+    """Достраивает pydantic-схемы с отложенной сборкой и собирает OpenAPI (JSON-схемы всех моделей)."""
+
+    pending = [BaseModel]
+    while pending:
+        model = pending.pop()
+        pending.extend(model.__subclasses__())
+        if model.__module__.startswith("app.") and not model.__pydantic_complete__:
+            model.model_rebuild()
+    app.openapi()
+
+
+async def _warm_up(app: FastAPI) -> None:
+    global _warmup_finished
+    try:
+        with startup_phase("warmup_pool"):
+            await _warm_pools()
+        with startup_phase("warmup_statements"):
+            await _warm_statements()
+        with startup_phase("warmup_validators"):
+            await anyio.to_thread.run_sync(_warm_validators, app)
+    except Exception as exc:
+        # Прогрев — оптимизация: при ошибке воркер обслуживает запросы холодным, а доступность БД проверяет /ready.
+        logger.warning("STARTUP | прогрев прерван: %s", exc)
+    finally:
+        _warmup_finished = True
+
+
+def start_warmup(app: FastAPI) -> None:
+    """Запускает прогрев фоновой задачей в event loop воркера; до его окончания /ready отвечает 503.
+    Вызывается из startup-обработчика, который Starlette выполняет в потоке event loop.
+    """
+
+    global _warmup_task, _warmup_finished
+    if not settings.warmup_enabled:
+        _warmup_finished = True
+        return
+    _warmup_finished = False
+    _warmup_task = asyncio.get_running_loop().create_task(_warm_up(app))
+
+
+async def wait_for_warmup() -> None:
+    if _warmup_task is not None:
+        await _warmup_task
+
+
+async def cancel_warmup() -> None:
+    """Останавливает незавершённый прогрев при остановке процесса."""
+
+    global _warmup_task
+    task, _warmup_task = _warmup_task, None
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,120 @@
+"""Версии изменений таблиц.
+Файл нужен, чтобы conditional GET мог понять «данные не менялись» по одной строке на таблицу, не читая сами таблицы.
+Минимальность: счётчик на таблицу, который растёт в той же транзакции, что и изменение, и только для отслеживаемых таблиц.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from sqlalchemy import BigInteger, Connection, String, event, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from app.db.base import Base
+
+
+class TableVersion(Base):
+    """Монотонная версия содержимого таблицы.
+    Строка появляется при первом изменении таблицы; отсутствие строки читается как версия 0.
+    """
+
+    __tablename__ = "table_versions"
+
+    table_name: Mapped[str] = mapped_column(String(128), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=1)
+
+
+# Версии ведутся только для таблиц, от которых зависят conditional GET: строка версии
+# блокируется до commit пишущей транзакции, и на горячих таблицах это сериализовало бы запись.
+_tracked_tables: set[str] = set()
+
+
+def track_tables(tables: Iterable[str]) -> None:
+    """Включает ведение версий для таблиц. Вызывается при объявлении conditional GET."""
+
+    _tracked_tables.update(tables)
+
+
+def tracked_tables() -> frozenset[str]:
+    return frozenset(_tracked_tables)
+
+
+async def read_versions(db: AsyncSession, tables: Iterable[str]) -> dict[str, int]:
+    """Текущие версии таблиц одним запросом; таблица без строки имеет версию 0."""
+
+    names = sorted(set(tables))
+    rows = (await db.execute(select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(names)))).all()
+    versions = dict.fromkeys(names, 0)
+    versions.update({name: version for name, version in rows})
+    return versions
+
+
+def _upsert(dialect_name: str, table_name: str):
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = dialect_insert(TableVersion).values(table_name=table_name, version=1)
+    return statement.on_conflict_do_update(
+        index_elements=[TableVersion.table_name],
+        set_={"version": TableVersion.version + 1},
+    )
+
+
+def bump_versions(connection: Connection, table_names: Iterable[str]) -> None:
+    """Сдвигает версии таблиц в транзакции connection.
+    Нужен записи в обход ORM-сессии (bulk-загрузка, сырой SQL), которую слушатели ниже не видят.
+    """
+
+    # Сортировка фиксирует порядок блокировок строк версий между конкурентными транзакциями.
+    for name in sorted(set(table_names)):
+        connection.execute(_upsert(connection.dialect.name, name))
+
+
+_BUMPED_KEY = "table_versions_bumped"
+
+
+def _bump(session: Session, table_names: Iterable[str]) -> None:
+    bumped = session.info.setdefault(_BUMPED_KEY, set())
+    pending = {name for name in table_names if name in _tracked_tables and name not in bumped}
+    if not pending:
+        return
+    bump_versions(session.connection(), pending)
+    bumped.update(pending)
+
+
+# Слушатели на классе Session покрывают sync- и async-сессии. Версия растёт один раз на таблицу
+# за транзакцию: при flush ORM-объектов и при bulk insert/update/delete через session.execute.
+# Изменения в обход ORM (сырой SQL, миграции) версию не двигают и должны сдвигать её сами.
+@event.listens_for(Session, "after_flush")
+def _bump_on_flush(session: Session, flush_context) -> None:
+    if not _tracked_tables:
+        return
+    changed: set[str] = set()
+    for obj in (*session.new, *session.deleted):
+        changed.update(table.name for table in inspect(obj).mapper.tables)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            changed.update(table.name for table in inspect(obj).mapper.tables)
+    _bump(session, changed)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_bulk(orm_execute_state) -> None:
+    if not _tracked_tables or not (
+        orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+    ):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    name = getattr(table, "name", None)
+    if name is not None and name != TableVersion.__tablename__:
+        _bump(orm_execute_state.session, (name,))
+
+
+@event.listens_for(Session, "after_commit")
+def _reset_after_commit(session: Session) -> None:
+    session.info.pop(_BUMPED_KEY, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_after_rollback(session: Session) -> None:
+    session.info.pop(_BUMPED_KEY, None)
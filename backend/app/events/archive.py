@@ -0,0 +1,223 @@
+"""Холодный архив domain_events: месяц событий в сжатом JSON Lines на локальном диске.
+Файл нужен, чтобы месяцы, ушедшие из БД по сроку хранения, оставались доступными для чтения по запросу.
+Минимальность: один файл domain_events-YYYY-MM.jsonl.gz на месяц, запись через временный файл и потоковое чтение с фильтрами.
+"""
+
+from __future__ import annotations
+
+import gzip
+import heapq
+import os
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import replace
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import orjson
+from sqlalchemy import Connection, select
+
+from app.core.config import settings
+from app.events.domain import DomainEvent
+from app.events.models import DomainEventRecord
+
+ARCHIVE_COLUMNS = (
+    "id",
+    "type",
+    "entity",
+    "entity_id",
+    "payload",
+    "occurred_at",
+    "dispatched_at",
+    "dispatch_attempts",
+    "next_attempt_at",
+)
+_FILE_PREFIX = "domain_events-"
+_FILE_SUFFIX = ".jsonl.gz"
+# SQLite возвращает время без зоны; в БД оно хранится в UTC.
+_DUMP_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_APPEND_NEWLINE
+
+
+def archive_dir(directory: str | os.PathLike | None = None) -> Path:
+    return Path(directory or settings.event_archive_dir)
+
+
+def archive_path(month: date, directory: str | os.PathLike | None = None) -> Path:
+    return archive_dir(directory) / f"{_FILE_PREFIX}{month:%Y-%m}{_FILE_SUFFIX}"
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _record_key(record: Mapping[str, Any]) -> tuple[datetime, str]:
+    occurred_at = record["occurred_at"]
+    if isinstance(occurred_at, str):
+        occurred_at = datetime.fromisoformat(occurred_at)
+    return _as_utc(occurred_at), record["id"]
+
+
+def _read_records(path: Path) -> Iterator[dict[str, Any]]:
+    with gzip.open(path, "rb") as lines:
+        for line in lines:
+            yield orjson.loads(line)
+
+
+def write_month(month: date, rows: Iterable[Mapping[str, Any]], directory: str | os.PathLike | None = None) -> int:
+    """Записывает события месяца в архив; возвращает число новых строк.
+    Если месяц уже в архиве (его строки пришли в БД после выгрузки), файл дополняется с сохранением порядка
+    (occurred_at, id). Файл появляется под итоговым именем только после fsync: прерванная выгрузка не оставляет неполный месяц.
+    """
+
+    path = archive_path(month, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    fresh = (({column: row[column] for column in ARCHIVE_COLUMNS}, True) for row in rows)
+    if path.exists():
+        stored = ((record, False) for record in _read_records(path))
+        records = heapq.merge(stored, fresh, key=lambda item: _record_key(item[0]))
+    else:
+        records = fresh
+    count = 0
+    previous = None
+    with open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as compressed:
+            for record, is_new in records:
+                key = _record_key(record)
+                if key == previous:
+                    continue
+                previous = key
+                compressed.write(orjson.dumps(record, option=_DUMP_OPTIONS))
+                count += is_new
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+def archived_months(directory: str | os.PathLike | None = None) -> list[date]:
+    base = archive_dir(directory)
+    if not base.is_dir():
+        return []
+    months = []
+    for path in base.glob(f"{_FILE_PREFIX}*{_FILE_SUFFIX}"):
+        stamp = path.name[len(_FILE_PREFIX):-len(_FILE_SUFFIX)]
+        try:
+            months.append(datetime.strptime(stamp, "%Y-%m").date())
+        except ValueError:
+            continue
+    return sorted(months)
+
+
+def _matches(record: Mapping[str, Any], event_type: str | None, entity: str | None, entity_id: str | None) -> bool:
+    return (
+        (event_type is None or record["type"] == event_type)
+        and (entity is None or record["entity"] == entity)
+        and (entity_id is None or record["entity_id"] == entity_id)
+    )
+
+
+def read_month(
+    month: date,
+    *,
+    event_type: str | None = None,
+    entity: str | None = None,
+    entity_id: str | None = None,
+    directory: str | os.PathLike | None = None,
+) -> Iterator[DomainEvent]:
+    """События архивного месяца в порядке occurred_at; файл читается построчно.
+    FileNotFoundError — месяц не архивирован.
+    """
+
+    with gzip.open(archive_path(month, directory), "rb") as lines:
+        for line in lines:
+            record = orjson.loads(line)
+            if not _matches(record, event_type, entity, entity_id):
+                continue
+            yield DomainEvent(
+                id=record["id"],
+                type=record["type"],
+                entity=record["entity"],
+                entity_id=record["entity_id"],
+                payload=record["payload"],
+                occurred_at=datetime.fromisoformat(record["occurred_at"]),
+            )
+
+
+def merge_events(*streams: Iterable[DomainEvent]) -> Iterator[DomainEvent]:
+    """Сливает потоки событий, упорядоченные по (occurred_at, id), в один; повтор события пропускается.
+    Нужен для месяцев, которые есть и в архиве, и в БД. Время возвращается в UTC с зоной.
+    """
+
+    previous = None
+    for event in heapq.merge(*streams, key=lambda event: (_as_utc(event.occurred_at), event.id)):
+        key = (_as_utc(event.occurred_at), event.id)
+        if key == previous:
+            continue
+        previous = key
+        if event.occurred_at.tzinfo is None:
+            # SQLite возвращает время без зоны: события из БД и архива сравнимы только в UTC.
+            event = replace(event, occurred_at=key[0])
+        yield event
+
+
+def query_events(
+    connection: Connection,
+    start: datetime,
+    end: datetime,
+    *,
+    event_type: str | None = None,
+    entity: str | None = None,
+    entity_id: str | None = None,
+    directory: str | os.PathLike | None = None,
+) -> Iterator[DomainEvent]:
+    """События периода [start, end) по occurred_at из архива и БД, слитые в порядке (occurred_at, id).
+    Месяц может быть и в архиве, и в БД: строки, пришедшие после выгрузки, ждут следующего обслуживания.
+    """
+
+    yield from merge_events(
+        _archived_events(start, end, event_type, entity, entity_id, directory),
+        _stored_events(connection, start, end, event_type, entity, entity_id),
+    )
+
+
+def _archived_events(
+    start: datetime,
+    end: datetime,
+    event_type: str | None,
+    entity: str | None,
+    entity_id: str | None,
+    directory: str | os.PathLike | None,
+) -> Iterator[DomainEvent]:
+    start_utc, end_utc = _as_utc(start), _as_utc(end)
+    for month in archived_months(directory):
+        if month < date(start_utc.year, start_utc.month, 1) or month >= end_utc.date():
+            continue
+        for event in read_month(month, event_type=event_type, entity=entity, entity_id=entity_id, directory=directory):
+            if start_utc <= event.occurred_at < end_utc:
+                yield event
+
+
+def _stored_events(
+    connection: Connection,
+    start: datetime,
+    end: datetime,
+    event_type: str | None,
+    entity: str | None,
+    entity_id: str | None,
+) -> Iterator[DomainEvent]:
+    record = DomainEventRecord
+    stmt = select(record.id, record.type, record.entity, record.entity_id, record.payload, record.occurred_at).where(
+        record.occurred_at >= start, record.occurred_at < end
+    )
+    if event_type is not None:
+        stmt = stmt.where(record.type == event_type)
+    if entity is not None:
+        stmt = stmt.where(record.entity == entity)
+    if entity_id is not None:
+        stmt = stmt.where(record.entity_id == entity_id)
+    result = connection.execution_options(stream_results=True, yield_per=1000).execute(
+        stmt.order_by(record.occurred_at, record.id)
+    )
+    for row in result:
+        yield DomainEvent(**row._mapping)
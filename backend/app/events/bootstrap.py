@@ -3,14 +3,23 @@
 
 from __future__ import annotations
 
-from app.events.default_handlers import update_calendar_day_summary
+from app.events.default_handlers import update_calendar_day_summary, update_calendar_day_summary_batch
 from app.events.handlers import EventHandlerRegistry
+from app.events.projections import CALENDAR_DAY_SUMMARY
 from app.events.publisher import EventPublisher
 
 
+def build_event_registry() -> EventHandlerRegistry:
+    """Создаёт реестр стандартных обработчиков read-агрегатов; общий для publisher и dispatcher."""
+
+    registry = EventHandlerRegistry()
+    # Типы событий берутся из проекции, чтобы пересборка применяла ровно те события, что и publish.
+    for event_type in CALENDAR_DAY_SUMMARY.event_types:
+        registry.subscribe(event_type, update_calendar_day_summary, batch=update_calendar_day_summary_batch)
+    return registry
+
+
 def build_event_publisher() -> EventPublisher:
     """Создаёт publisher со стандартными read-агрегатами."""
 
-    registry = EventHandlerRegistry()
-    registry.subscribe("task.created", update_calendar_day_summary)
-    return EventPublisher(registry=registry)
+    return EventPublisher(registry=build_event_registry())
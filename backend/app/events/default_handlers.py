@@ -3,8 +3,10 @@
 
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime
 
+from sqlalchemy import Connection, Table, func
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app.events.domain import DomainEvent
@@ -24,20 +26,57 @@ def _extract_event_day(event: DomainEvent) -> date:
     return event.occurred_at.date()
 
 
+def calendar_day_counts(events: list[DomainEvent]) -> dict[date, tuple[int, datetime]]:
+    """Счётчики событий по дням: {день: (число событий, последнее время события)}."""
+
+    rows: dict[date, tuple[int, datetime]] = {}
+    for event in events:
+        day = _extract_event_day(event)
+        count, last_event_at = rows.get(day, (0, event.occurred_at))
+        rows[day] = (count + 1, max(last_event_at, event.occurred_at))
+    return rows
+
+
+def calendar_day_upsert(dialect_name: str, rows: dict[date, tuple[int, datetime]], table: Table | None = None):
+    """Один INSERT ... ON CONFLICT DO UPDATE, прибавляющий счётчики к агрегатам дней.
+    rows — {день: (число событий, последнее время события)}. Инкремент выполняет БД под блокировкой строки,
+    поэтому параллельные транзакции не теряют обновления и не падают на конфликте первичного ключа.
+    table — таблица с колонками calendar_day_summary (теневая при пересборке), по умолчанию сам агрегат.
+    """
+
+    table = CalendarDaySummary.__table__ if table is None else table
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    # Порядок дней фиксирует порядок блокировок строк между конкурентными транзакциями.
+    statement = dialect_insert(table).values(
+        [
+            {"day": day, "events_count": count, "last_event_at": last_event_at}
+            for day, (count, last_event_at) in sorted(rows.items())
+        ]
+    )
+    latest = func.max if dialect_name == "sqlite" else func.greatest
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.day],
+        set_={
+            "events_count": table.c.events_count + statement.excluded.events_count,
+            "last_event_at": latest(table.c.last_event_at, statement.excluded.last_event_at),
+        },
+    )
+
+
 def update_calendar_day_summary(db: Session, event: DomainEvent) -> None:
     """Обновляет read-агрегат calendar_day_summary по факту события."""
 
-    day = _extract_event_day(event)
-    summary = db.get(CalendarDaySummary, day)
-    if summary is None:
-        db.add(
-            CalendarDaySummary(
-                day=day,
-                events_count=1,
-                last_event_at=event.occurred_at,
-            )
-        )
-        return
-
-    summary.events_count += 1
-    summary.last_event_at = max(summary.last_event_at, event.occurred_at)
+    db.execute(calendar_day_upsert(db.get_bind().dialect.name, {_extract_event_day(event): (1, event.occurred_at)}))
+
+
+def update_calendar_day_summary_batch(db: Session, events: list[DomainEvent]) -> None:
+    """Batch-вариант update_calendar_day_summary: счётчики сгруппированы по дням и применяются одним запросом."""
+
+    db.execute(calendar_day_upsert(db.get_bind().dialect.name, calendar_day_counts(events)))
+
+
+def apply_calendar_day_summary(connection: Connection, table: Table, events: list[DomainEvent]) -> None:
+    """Применяет события к таблице агрегата дня; используется пересборкой проекции."""
+
+    if events:
+        connection.execute(calendar_day_upsert(connection.dialect.name, calendar_day_counts(events), table))
@@ -0,0 +1,259 @@
+"""Dispatcher outbox доменных событий.
+Файл нужен, чтобы в режиме EVENT_OUTBOX_ENABLED обработчики read-агрегатов выполнялись вне запроса, а каждое событие всё равно доставлялось.
+Минимальность: пачка недоставленных событий под FOR UPDATE SKIP LOCKED, обработчик в savepoint с checkpoint'ом и повтор с задержкой.
+
+Запуск из каталога backend; несколько процессов разбирают очередь параллельно, не пересекаясь:
+    python -m app.events.dispatcher [--once] [--batch-size 100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.db import get_engine
+from app.events.bootstrap import build_event_registry
+from app.events.domain import DomainEvent
+from app.events.handlers import EventHandlerRegistry, group_by_type
+from app.events.models import DomainEventRecord, EventDelivery, dispatch_clock
+
+logger = logging.getLogger("event_core")
+
+# Потолок задержки повтора: событие с долго падающим обработчиком проверяется не реже раза в час.
+MAX_RETRY_DELAY_SECONDS = 3600
+_ERROR_TEXT_LIMIT = 2000
+
+
+@dataclass
+class BatchResult:
+    """Итог пачки: dispatched — все обработчики выполнены, retry — отложено, dead — попытки исчерпаны."""
+
+    dispatched: int = 0
+    retried: int = 0
+    dead: int = 0
+
+    @property
+    def claimed(self) -> int:
+        return self.dispatched + self.retried + self.dead
+
+
+def _to_domain_event(record: DomainEventRecord) -> DomainEvent:
+    return DomainEvent(
+        id=record.id,
+        type=record.type,
+        entity=record.entity,
+        entity_id=record.entity_id,
+        payload=record.payload,
+        occurred_at=record.occurred_at,
+    )
+
+
+class OutboxDispatcher:
+    """Выполняет обработчики событий, записанных publish в режиме outbox.
+    Пачка обрабатывается в одной транзакции: изменения read-агрегатов, checkpoint'ы и отметка доставки
+    фиксируются вместе, поэтому обработчик не выполняется дважды для одного события.
+    """
+
+    def __init__(
+        self,
+        registry: EventHandlerRegistry | None = None,
+        session_factory: sessionmaker[Session] | None = None,
+        batch_size: int | None = None,
+    ) -> None:
+        self._registry = registry or build_event_registry()
+        self._session_factory = session_factory or sessionmaker(bind=get_engine(), autoflush=False)
+        self.batch_size = max(batch_size or settings.event_outbox_batch_size, 1)
+
+    def _claim(self, db: Session, now: datetime) -> list[DomainEventRecord]:
+        """Забирает пачку: строки, занятые другим dispatcher'ом, пропускаются, а не ожидаются."""
+
+        stmt = (
+            select(DomainEventRecord)
+            .where(
+                DomainEventRecord.dispatched_at.is_(None),
+                or_(DomainEventRecord.next_attempt_at.is_(None), DomainEventRecord.next_attempt_at <= now),
+            )
+            .order_by(DomainEventRecord.occurred_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return list(db.scalars(stmt))
+
+    def dispatch_batch(self) -> BatchResult:
+        """Обрабатывает одну пачку недоставленных событий."""
+
+        result = BatchResult()
+        now = datetime.now(timezone.utc)
+        with self._session_factory() as db:
+            records = self._claim(db, now)
+            if not records:
+                return result
+            checkpoints = {
+                (delivery.event_id, delivery.handler): delivery
+                for delivery in db.scalars(
+                    select(EventDelivery).where(EventDelivery.event_id.in_([record.id for record in records]))
+                )
+            }
+            failed = self._run_handlers(db, records, checkpoints, now)
+            dispatched_at = dispatch_clock(db.get_bind().dialect.name)
+            for record in records:
+                record.dispatch_attempts += 1
+                if record.id not in failed:
+                    record.dispatched_at = dispatched_at
+                    record.next_attempt_at = None
+                    result.dispatched += 1
+                elif record.dispatch_attempts >= settings.event_outbox_max_attempts:
+                    # Событие больше не выбирается; упавшие обработчики видны в domain_event_deliveries.
+                    record.dispatched_at = dispatched_at
+                    result.dead += 1
+                    logger.error(
+                        "EVENT_CORE | outbox: попытки исчерпаны event_id=%s type=%s attempts=%s",
+                        record.id,
+                        record.type,
+                        record.dispatch_attempts,
+                    )
+                else:
+                    delay = settings.event_outbox_retry_seconds * 2 ** (record.dispatch_attempts - 1)
+                    record.next_attempt_at = now + timedelta(seconds=min(delay, MAX_RETRY_DELAY_SECONDS))
+                    result.retried += 1
+            db.commit()
+        return result
+
+    @staticmethod
+    def _checkpoint(
+        db: Session,
+        checkpoints: dict[tuple[str, str], EventDelivery],
+        event_id: str,
+        handler_name: str,
+    ) -> EventDelivery:
+        delivery = checkpoints.get((event_id, handler_name))
+        if delivery is None:
+            delivery = EventDelivery(event_id=event_id, handler=handler_name, attempts=0)
+            db.add(delivery)
+            checkpoints[(event_id, handler_name)] = delivery
+        return delivery
+
+    def _run_handlers(
+        self,
+        db: Session,
+        records: list[DomainEventRecord],
+        checkpoints: dict[tuple[str, str], EventDelivery],
+        now: datetime,
+    ) -> set[str]:
+        """Выполняет обработчики без checkpoint'а доставки; возвращает id событий, на которых обработчик упал.
+        Обработчик с batch-вариантом вызывается один раз на тип события в пачке; если batch падает,
+        события повторяются поштучно, чтобы отложить только те, на которых обработчик действительно падает.
+        """
+
+        failed: set[str] = set()
+        for event_type, events in group_by_type([_to_domain_event(record) for record in records]).items():
+            for handler in self._registry.handlers_for(event_type):
+                pending = []
+                for event in events:
+                    delivery = self._checkpoint(db, checkpoints, event.id, handler.__name__)
+                    if delivery.delivered_at is None:
+                        delivery.attempts += 1
+                        pending.append((event, delivery))
+                if not pending:
+                    continue
+
+                if len(pending) > 1 and self._registry.batch_handler(handler) is not None:
+                    try:
+                        # Savepoint откатывает только изменения упавшего обработчика; остальная пачка сохраняется.
+                        with db.begin_nested():
+                            self._registry.run_batch_handler(db, [event for event, _ in pending], handler)
+                    except Exception as exc:
+                        logger.warning(
+                            "EVENT_CORE | outbox: batch обработчика упал, поштучный повтор handler=%s events=%s: %s",
+                            handler.__name__,
+                            len(pending),
+                            exc,
+                        )
+                    else:
+                        for _, delivery in pending:
+                            delivery.delivered_at = now
+                            delivery.last_error = None
+                        continue
+
+                for event, delivery in pending:
+                    try:
+                        with db.begin_nested():
+                            self._registry.run_handler(db, event, handler)
+                    except Exception as exc:
+                        delivery.last_error = f"{exc.__class__.__name__}: {exc}"[:_ERROR_TEXT_LIMIT]
+                        failed.add(event.id)
+                        logger.warning(
+                            "EVENT_CORE | outbox: обработчик упал event_id=%s handler=%s attempt=%s: %s",
+                            event.id,
+                            handler.__name__,
+                            delivery.attempts,
+                            exc,
+                        )
+                        continue
+                    delivery.delivered_at = now
+                    delivery.last_error = None
+        return failed
+
+    def run(self, stop: threading.Event) -> None:
+        """Разбирает очередь до сигнала остановки; без работы ждёт EVENT_OUTBOX_POLL_MS."""
+
+        poll_seconds = max(settings.event_outbox_poll_ms, 1) / 1000
+        while not stop.is_set():
+            try:
+                result = self.dispatch_batch()
+            except SQLAlchemyError as exc:
+                # Потеря соединения или рестарт БД не должны останавливать процесс: пачка повторится.
+                logger.warning("EVENT_CORE | outbox: ошибка БД, повтор через %.1f с: %s", poll_seconds, exc)
+                stop.wait(poll_seconds)
+                continue
+            if result.claimed:
+                logger.info(
+                    "EVENT_CORE | outbox: dispatched=%s retry=%s dead=%s",
+                    result.dispatched,
+                    result.retried,
+                    result.dead,
+                )
+            # Полная пачка означает, что очередь не пуста: следующая берётся без паузы.
+            if result.claimed < self.batch_size:
+                stop.wait(poll_seconds)
+
+
+def main(argv: list[str] | None = None) -> int:
+    from app.core.log_pipeline import configure_logging, start_log_listener, stop_log_listener
+
+    parser = argparse.ArgumentParser(description="Dispatcher outbox доменных событий")
+    parser.add_argument("--once", action="store_true", help="обработать одну пачку и выйти")
+    parser.add_argument("--batch-size", type=int, default=None, help="размер пачки (по умолчанию EVENT_OUTBOX_BATCH_SIZE)")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    start_log_listener()
+    dispatcher = OutboxDispatcher(batch_size=args.batch_size)
+    try:
+        if args.once:
+            result = dispatcher.dispatch_batch()
+            print(f"dispatched={result.dispatched} retry={result.retried} dead={result.dead}")
+            return 0
+        stop = threading.Event()
+        # Сигнал дожидается конца текущей пачки: транзакция не обрывается посередине.
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        logger.info("EVENT_CORE | outbox dispatcher запущен, пачка %s", dispatcher.batch_size)
+        dispatcher.run(stop)
+        return 0
+    finally:
+        stop_log_listener()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
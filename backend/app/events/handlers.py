@@ -5,15 +5,27 @@
 from __future__ import annotations
 
 import logging
+import time
 from collections import defaultdict
 from typing import Callable
 
 from sqlalchemy.orm import Session
 
+from app.core.metrics import EVENT_HANDLER_DURATION, EVENT_HANDLER_FAILURES
 from app.events.domain import DomainEvent
 
 logger = logging.getLogger("event_core")
 EventHandler = Callable[[Session, DomainEvent], None]
+EventBatchHandler = Callable[[Session, list[DomainEvent]], None]
+
+
+def group_by_type(events: list[DomainEvent]) -> dict[str, list[DomainEvent]]:
+    """События по type с сохранением порядка внутри типа."""
+
+    grouped: dict[str, list[DomainEvent]] = defaultdict(list)
+    for event in events:
+        grouped[event.type].append(event)
+    return grouped
 
 
 class EventHandlerRegistry:
@@ -21,21 +33,75 @@ class EventHandlerRegistry:
 
     def __init__(self) -> None:
         self._handlers: dict[str, list[EventHandler]] = defaultdict(list)
+        self._batch_handlers: dict[EventHandler, EventBatchHandler] = {}
 
-    def subscribe(self, event_type: str, handler: EventHandler) -> None:
-        """Подписывает обработчик на конкретный type события."""
+    def subscribe(self, event_type: str, handler: EventHandler, batch: EventBatchHandler | None = None) -> None:
+        """Подписывает обработчик на конкретный type события.
+        batch — вариант обработчика для списка событий одного типа с тем же результатом, что и поштучный вызов;
+        используется при публикации и доставке пачкой.
+        """
 
         self._handlers[event_type].append(handler)
+        if batch is not None:
+            self._batch_handlers[handler] = batch
+
+    def handlers_for(self, event_type: str) -> list[EventHandler]:
+        """Обработчики, подписанные на type события."""
+
+        return list(self._handlers.get(event_type, []))
+
+    def batch_handler(self, handler: EventHandler) -> EventBatchHandler | None:
+        return self._batch_handlers.get(handler)
 
     def dispatch(self, db: Session, event: DomainEvent) -> None:
         """Синхронно выполняет обработчики события."""
 
-        handlers = self._handlers.get(event.type, [])
-        for handler in handlers:
-            logger.info(
-                "EVENT_CORE | handling event_id=%s type=%s handler=%s",
-                event.id,
-                event.type,
-                handler.__name__,
-            )
-            handler(db, event)
+        for handler in self._handlers.get(event.type, []):
+            self.run_handler(db, event, handler)
+
+    def dispatch_many(self, db: Session, events: list[DomainEvent]) -> None:
+        """Синхронно выполняет обработчики списка событий: batch-вариант вызывается один раз на тип события."""
+
+        for event_type, typed_events in group_by_type(events).items():
+            for handler in self._handlers.get(event_type, []):
+                if handler in self._batch_handlers:
+                    self.run_batch_handler(db, typed_events, handler)
+                    continue
+                for event in typed_events:
+                    self.run_handler(db, event, handler)
+
+    @staticmethod
+    def run_handler(db: Session, event: DomainEvent, handler: EventHandler) -> None:
+        """Выполняет один обработчик с логом и метриками."""
+
+        logger.info(
+            "EVENT_CORE | handling event_id=%s type=%s handler=%s",
+            event.id,
+            event.type,
+            handler.__name__,
+        )
+        _observe(lambda: handler(db, event), event.type, handler.__name__)
+
+    def run_batch_handler(self, db: Session, events: list[DomainEvent], handler: EventHandler) -> None:
+        """Выполняет batch-вариант обработчика для событий одного типа; метрики пишутся под именем обработчика."""
+
+        logger.info(
+            "EVENT_CORE | handling batch events=%s type=%s handler=%s",
+            len(events),
+            events[0].type,
+            handler.__name__,
+        )
+        batch = self._batch_handlers[handler]
+        _observe(lambda: batch(db, events), events[0].type, handler.__name__)
+
+
+def _observe(call: Callable[[], None], event_type: str, handler_name: str) -> None:
+    # Длительность пишется и при исключении, чтобы медленные падения тоже были видны в /metrics.
+    started = time.perf_counter()
+    try:
+        call()
+    except Exception:
+        EVENT_HANDLER_FAILURES.inc(event_type=event_type, handler=handler_name)
+        raise
+    finally:
+        EVENT_HANDLER_DURATION.observe(time.perf_counter() - started, event_type=event_type, handler=handler_name)
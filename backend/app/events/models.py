@@ -7,23 +7,71 @@ from __future__ import annotations
 from datetime import date, datetime
 from typing import Any
 
-from sqlalchemy import Date, DateTime, Integer, JSON, String
+from sqlalchemy import ColumnElement, Date, DateTime, Index, Integer, JSON, String, Text, case, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
 
 
 class DomainEventRecord(Base):
-    """Хранилище фактов доменных событий."""
+    """Хранилище фактов доменных событий.
+
+    Таблица служит и outbox: dispatched_at пуст, пока обработчики события не выполнены.
+    В PostgreSQL таблица секционирована по месяцам occurred_at (app.events.partitions), поэтому occurred_at
+    входит в первичный ключ: обновление по ключу затрагивает одну секцию.
+    """
 
     __tablename__ = "domain_events"
+    __table_args__ = (
+        # Частичный индекс покрывает только недоставленные события: выборка dispatcher'а не растёт вместе с историей.
+        Index(
+            "ix_domain_events_pending",
+            "occurred_at",
+            postgresql_where=text("dispatched_at IS NULL"),
+            sqlite_where=text("dispatched_at IS NULL"),
+        ),
+        Index("ix_domain_events_entity_ref", "entity", "entity_id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
-    type: Mapped[str] = mapped_column(String(128), nullable=False, index=True)
-    entity: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
-    entity_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    type: Mapped[str] = mapped_column(String(128), nullable=False)
+    entity: Mapped[str] = mapped_column(String(64), nullable=False)
+    entity_id: Mapped[str] = mapped_column(String(64), nullable=False)
     payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
-    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, index=True)
+    dispatched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    dispatch_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+def dispatch_clock(dialect_name: str) -> ColumnElement[datetime]:
+    """Время доставки события по часам БД: значение dispatched_at и cutoff пересборки проекций.
+    В PostgreSQL время читается после выдачи xid транзакции: отметка раньше cutoff означает, что xid выдан до снимка,
+    которого дожидается app.events.rebuild. SQLite сериализует запись, там хватает времени statement'а.
+    """
+
+    if dialect_name == "postgresql":
+        return case((func.pg_current_xact_id().is_not(None), func.clock_timestamp(type_=DateTime(timezone=True))))
+    # Формат хранения DateTime в SQLite (микросекунды), чтобы сравнение строк совпадало с порядком времени.
+    return func.strftime("%Y-%m-%d %H:%M:%f000", "now", type_=DateTime(timezone=True))
+
+
+class EventDelivery(Base):
+    """Checkpoint обработчика события в режиме outbox.
+
+    delivered_at заполнен — обработчик выполнен и при повторной выборке события не вызывается;
+    пуст — последняя попытка упала, причина в last_error.
+    Внешнего ключа на domain_events нет: секционированная таблица уникальна только по (id, occurred_at),
+    checkpoint'ы архивируемого месяца удаляет app.events.partitions.
+    """
+
+    __tablename__ = "domain_event_deliveries"
+
+    event_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    handler: Mapped[str] = mapped_column(String(128), primary_key=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    delivered_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
 
 class CalendarDaySummary(Base):
@@ -37,3 +85,23 @@ class CalendarDaySummary(Base):
     day: Mapped[date] = mapped_column(Date, primary_key=True)
     events_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     last_event_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class ProjectionRebuildRange(Base):
+    """Checkpoint пересборки проекции по диапазону occurred_at.
+
+    last_occurred_at/last_event_id — ключ последнего применённого события: продолжение начинается строго после него.
+    cutoff — граница dispatched_at: события, доставленные позже, догоняются при переключении таблиц.
+    """
+
+    __tablename__ = "projection_rebuild_ranges"
+
+    projection: Mapped[str] = mapped_column(String(64), primary_key=True)
+    range_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    range_end: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    target: Mapped[str] = mapped_column(String(128), nullable=False)
+    cutoff: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_occurred_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_event_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    events_applied: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,307 @@
+"""Обслуживание секций domain_events: секции месяцев наперёд, срок хранения и выгрузка старых месяцев в архив.
+Файл нужен, чтобы таблица событий не росла бесконечно, а вставка не попадала в секцию по умолчанию.
+Минимальность: месячные секции PostgreSQL по occurred_at; месяц старше срока отсоединяется, выгружается в JSONL.gz и удаляется.
+
+Запуск из каталога backend по расписанию (например, раз в сутки из cron):
+    python -m app.events.partitions maintain [--months-ahead 3] [--retention-months 12] [--dry-run]
+    python -m app.events.partitions list
+    python -m app.events.partitions read 2025-01 [--type task.created] [--entity task] [--entity-id ID]
+В SQLite таблица не секционируется: maintain только выгружает и удаляет строки месяцев старше срока.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from collections.abc import Iterable
+from datetime import date, datetime, time, timezone
+
+import orjson
+from sqlalchemy import Connection, Engine, delete, func, select, text
+
+from app.core.config import settings
+from app.core.db import get_engine
+from app.events import archive
+from app.events.models import DomainEventRecord, EventDelivery
+
+PARENT_TABLE = "domain_events"
+PARTITION_PREFIX = f"{PARENT_TABLE}_p"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y_%m}"
+
+
+def _partition_month(name: str) -> date | None:
+    try:
+        return datetime.strptime(name[len(PARTITION_PREFIX):], "%Y_%m").date()
+    except ValueError:
+        return None
+
+
+def _bounds(month: date) -> tuple[datetime, datetime]:
+    return (
+        datetime.combine(month, time(), tzinfo=timezone.utc),
+        datetime.combine(add_months(month, 1), time(), tzinfo=timezone.utc),
+    )
+
+
+def is_partitioned(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(
+        connection.scalar(
+            text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:parent))"),
+            {"parent": PARENT_TABLE},
+        )
+    )
+
+
+def list_partitions(connection: Connection) -> tuple[list[date], list[date]]:
+    """Месячные секции: (подключённые, отсоединённые). Отсоединённая осталась от прерванной архивации."""
+
+    attached = {
+        name
+        for name in connection.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:parent)"
+            ),
+            {"parent": PARENT_TABLE},
+        )
+    }
+    existing = connection.scalars(
+        text("SELECT tablename FROM pg_tables WHERE schemaname = current_schema() AND tablename LIKE :pattern"),
+        {"pattern": f"{PARTITION_PREFIX}%"},
+    )
+    months: dict[bool, list[date]] = {True: [], False: []}
+    for name in existing:
+        month = _partition_month(name)
+        if month is not None:
+            months[name in attached].append(month)
+    return sorted(months[True]), sorted(months[False])
+
+
+def default_months(connection: Connection) -> list[date]:
+    """Месяцы, строки которых лежат в секции по умолчанию: их секции не были созданы до вставки."""
+
+    if connection.scalar(text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}) is None:
+        return []
+    quote = connection.dialect.identifier_preparer.quote
+    return list(
+        connection.scalars(
+            text(
+                f"SELECT DISTINCT CAST(date_trunc('month', occurred_at AT TIME ZONE 'UTC') AS date) "
+                f"FROM {quote(DEFAULT_PARTITION)} ORDER BY 1"
+            )
+        )
+    )
+
+
+def _attach_month(connection: Connection, month: date) -> None:
+    """Создаёт секцию месяца; строки месяца из секции по умолчанию переносятся в неё.
+    CREATE ... PARTITION OF не проходит, пока в секции по умолчанию есть строки месяца, поэтому секция
+    собирается отдельной таблицей и подключается после переноса.
+    """
+
+    quote = connection.dialect.identifier_preparer.quote
+    name, parent, default = quote(partition_name(month)), quote(PARENT_TABLE), quote(DEFAULT_PARTITION)
+    lower, upper = (value.isoformat() for value in _bounds(month))
+    bounds = f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    if month not in default_months(connection):
+        connection.execute(text(f"CREATE TABLE {name} PARTITION OF {parent} {bounds}"))
+        return
+    in_month = f"occurred_at >= '{lower}' AND occurred_at < '{upper}'"
+    # Вставка в секцию по умолчанию ждёт до commit: строка месяца, пришедшая после переноса, сорвала бы ATTACH.
+    connection.execute(text(f"LOCK TABLE {default} IN SHARE ROW EXCLUSIVE MODE"))
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    connection.execute(text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_month}"))
+    connection.execute(text(f"DELETE FROM {default} WHERE {in_month}"))
+    connection.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {name} {bounds}"))
+
+
+def create_partitions(engine: Engine, months: Iterable[date], dry_run: bool = False) -> list[date]:
+    """Создаёт недостающие секции указанных месяцев, каждую в своей транзакции; возвращает созданные месяцы.
+    Месяц отсоединённой секции пропускается: её сначала доводит до архива maintain.
+    """
+
+    with engine.connect() as connection:
+        if not is_partitioned(connection):
+            return []
+        attached, detached = list_partitions(connection)
+    missing = sorted({month_start(month) for month in months} - set(attached) - set(detached))
+    if dry_run:
+        return missing
+    for month in missing:
+        with engine.begin() as connection:
+            _attach_month(connection, month)
+    return missing
+
+
+def ensure_partitions(engine: Engine, months_ahead: int, today: date, dry_run: bool = False) -> list[date]:
+    """Создаёт секции с текущего месяца на months_ahead вперёд и секции месяцев, застрявших в секции по умолчанию.
+    Возвращает созданные месяцы; старые из них maintain затем архивирует по сроку хранения, как и остальные.
+    """
+
+    current = month_start(today)
+    months = [add_months(current, offset) for offset in range(months_ahead + 1)]
+    with engine.connect() as connection:
+        if is_partitioned(connection):
+            months += default_months(connection)
+    return create_partitions(engine, months, dry_run)
+
+
+def expired_months(engine: Engine, retention_months: int, today: date) -> list[date]:
+    """Месяцы старше срока хранения, которые ещё в БД (и отсоединённые секции прерванной архивации)."""
+
+    if retention_months <= 0:
+        return []
+    boundary = add_months(month_start(today), -retention_months)
+    with engine.connect() as connection:
+        if is_partitioned(connection):
+            attached, detached = list_partitions(connection)
+            # Месяцы из секции по умолчанию попадают сюда после переноса ensure_partitions (в --dry-run — до него).
+            stranded = {month for month in default_months(connection) if month < boundary}
+            return sorted({month for month in attached if month < boundary} | set(detached) | stranded)
+        first = connection.scalar(
+            select(func.min(DomainEventRecord.occurred_at)).where(
+                DomainEventRecord.occurred_at < datetime.combine(boundary, time(), tzinfo=timezone.utc)
+            )
+        )
+    if first is None:
+        return []
+    months = []
+    month = month_start(first)
+    while month < boundary:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def _archive_partition(engine: Engine, month: date) -> int:
+    name = partition_name(month)
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as connection:
+        attached, _ = list_partitions(connection)
+        if month in attached:
+            # Checkpoint'ы outbox не связаны внешним ключом: удаляются вместе с отсоединением месяца.
+            connection.execute(
+                text(f"DELETE FROM domain_event_deliveries d USING {quote(name)} e WHERE d.event_id = e.id")
+            )
+            connection.execute(text(f"ALTER TABLE {quote(PARENT_TABLE)} DETACH PARTITION {quote(name)}"))
+    # Отсоединённая секция уже не видна в domain_events; при сбое выгрузки следующий запуск повторит её.
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=5000).execute(
+            text(f"SELECT {', '.join(archive.ARCHIVE_COLUMNS)} FROM {quote(name)} ORDER BY occurred_at, id")
+        )
+        count = archive.write_month(month, (row._mapping for row in result))
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE {quote(name)}"))
+    return count
+
+
+def _archive_rows(engine: Engine, month: date) -> int:
+    lower, upper = _bounds(month)
+    in_month = (DomainEventRecord.occurred_at >= lower, DomainEventRecord.occurred_at < upper)
+    columns = [DomainEventRecord.__table__.c[column] for column in archive.ARCHIVE_COLUMNS]
+    with engine.begin() as connection:
+        # DML первым: в SQLite он берёт блокировку записи, и строки месяца не меняются между выгрузкой и удалением.
+        connection.execute(
+            delete(EventDelivery).where(EventDelivery.event_id.in_(select(DomainEventRecord.id).where(*in_month)))
+        )
+        rows = connection.execute(
+            select(*columns).where(*in_month).order_by(DomainEventRecord.occurred_at, DomainEventRecord.id)
+        )
+        count = archive.write_month(month, (row._mapping for row in rows))
+        connection.execute(delete(DomainEventRecord).where(*in_month))
+    return count
+
+
+def archive_month(engine: Engine, month: date) -> int:
+    """Переносит месяц событий из БД в архив; возвращает число выгруженных событий."""
+
+    with engine.connect() as connection:
+        partitioned = is_partitioned(connection)
+    return _archive_partition(engine, month) if partitioned else _archive_rows(engine, month)
+
+
+def _parse_month(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Секции, срок хранения и архив domain_events")
+    commands = parser.add_subparsers(dest="command", required=True)
+    maintain = commands.add_parser("maintain", help="создать секции наперёд и архивировать месяцы старше срока")
+    maintain.add_argument("--months-ahead", type=int, default=None, help="по умолчанию EVENT_PARTITION_MONTHS_AHEAD")
+    maintain.add_argument("--retention-months", type=int, default=None, help="по умолчанию EVENT_RETENTION_MONTHS; 0 — без архивации")
+    maintain.add_argument("--dry-run", action="store_true", help="только показать, что будет сделано")
+    commands.add_parser("list", help="секции в БД и архивные месяцы")
+    read = commands.add_parser("read", help="вывести события архивного месяца в JSON Lines")
+    read.add_argument("month", type=_parse_month, help="месяц YYYY-MM")
+    read.add_argument("--type", dest="event_type")
+    read.add_argument("--entity")
+    read.add_argument("--entity-id")
+    args = parser.parse_args(argv)
+
+    if args.command == "read":
+        try:
+            for event in archive.read_month(
+                args.month, event_type=args.event_type, entity=args.entity, entity_id=args.entity_id
+            ):
+                sys.stdout.buffer.write(orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE))
+        except FileNotFoundError:
+            print(f"Месяц {args.month:%Y-%m} не архивирован в {archive.archive_dir()}", file=sys.stderr)
+            return 2
+        return 0
+
+    engine = get_engine()
+    if args.command == "list":
+        with engine.connect() as connection:
+            partitioned = is_partitioned(connection)
+            attached, detached = list_partitions(connection) if partitioned else ([], [])
+            stranded = default_months(connection) if partitioned else []
+        print(f"Секционирование: {'да' if partitioned else 'нет'}")
+        print("Секции: " + (", ".join(f"{month:%Y-%m}" for month in attached) or "-"))
+        if detached:
+            print("Отсоединены, ждут выгрузки: " + ", ".join(f"{month:%Y-%m}" for month in detached))
+        if stranded:
+            print("В секции по умолчанию, ждут maintain: " + ", ".join(f"{month:%Y-%m}" for month in stranded))
+        print("Архив: " + (", ".join(f"{month:%Y-%m}" for month in archive.archived_months()) or "-"))
+        return 0
+
+    today = datetime.now(timezone.utc).date()
+    months_ahead = settings.event_partition_months_ahead if args.months_ahead is None else args.months_ahead
+    retention = settings.event_retention_months if args.retention_months is None else args.retention_months
+    with engine.connect() as connection:
+        stranded = default_months(connection) if is_partitioned(connection) else []
+    created = ensure_partitions(engine, months_ahead, today, dry_run=args.dry_run)
+    print(("Будут созданы" if args.dry_run else "Созданы") + " секции: " + (", ".join(f"{m:%Y-%m}" for m in created) or "-"))
+    if stranded:
+        print(
+            ("Будут перенесены" if args.dry_run else "Перенесены")
+            + " из секции по умолчанию: "
+            + ", ".join(f"{m:%Y-%m}" for m in stranded)
+        )
+    expired = expired_months(engine, retention, today)
+    if args.dry_run:
+        print("Будут архивированы: " + (", ".join(f"{m:%Y-%m}" for m in expired) or "-"))
+        return 0
+    for month in expired:
+        count = archive_month(engine, month)
+        print(f"{month:%Y-%m}: {count} событий → {archive.archive_path(month)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Реестр проекций (read-агрегатов), которые можно пересобрать из domain_events.
+Файл нужен, чтобы пересборка знала таблицу проекции, её типы событий и функцию применения без привязки к сессии publish.
+Минимальность: одна запись на проекцию; функция применения пишет в переданную таблицу, поэтому работает и с теневой копией.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import Connection, Table
+
+from app.events.default_handlers import apply_calendar_day_summary
+from app.events.domain import DomainEvent
+from app.events.models import CalendarDaySummary
+
+ProjectionApply = Callable[[Connection, Table, list[DomainEvent]], None]
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Проекция: apply обязан давать тот же результат, что и обработчики publish для тех же событий.
+    Пересборка применяет события пачками в произвольном порядке пачек, поэтому apply должен быть коммутативным
+    (как инкремент счётчика) — иначе диапазоны нельзя пересобирать параллельно.
+    """
+
+    name: str
+    table: Table
+    event_types: tuple[str, ...]
+    apply: ProjectionApply
+
+
+CALENDAR_DAY_SUMMARY = Projection(
+    name="calendar_day_summary",
+    table=CalendarDaySummary.__table__,
+    event_types=("task.created",),
+    apply=apply_calendar_day_summary,
+)
+
+PROJECTIONS: dict[str, Projection] = {projection.name: projection for projection in (CALENDAR_DAY_SUMMARY,)}
@@ -1,28 +1,34 @@
 """Публикация доменных событий в event core.
-Записывает факты в БД и синхронно запускает обработчики read-агрегатов.
+Записывает факты в БД и синхронно запускает обработчики read-агрегатов;
+в режиме outbox обработчики выполняет dispatcher (app.events.dispatcher).
 """
 
 from __future__ import annotations
 
 import logging
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.events.domain import DomainEvent
-from app.events.handlers import EventHandlerRegistry
-from app.events.models import DomainEventRecord
+from app.events.handlers import EventHandlerRegistry, group_by_type
+from app.events.models import DomainEventRecord, dispatch_clock
 
 logger = logging.getLogger("event_core")
 
 
 class EventPublisher:
-    """Простой синхронный publisher для event spine."""
+    """Publisher для event spine: синхронный или outbox."""
 
-    def __init__(self, registry: EventHandlerRegistry) -> None:
+    def __init__(self, registry: EventHandlerRegistry, outbox: bool | None = None) -> None:
         self._registry = registry
+        self._outbox = settings.event_outbox_enabled if outbox is None else outbox
 
     def publish(self, db: Session, event: DomainEvent) -> None:
-        """Публикует событие: сохраняет факт и выполняет handlers."""
+        """Публикует событие: сохраняет факт и выполняет handlers.
+        В режиме outbox только сохраняет факт в транзакции вызывающего кода; обработчики выполнит dispatcher.
+        """
 
         logger.info(
             "EVENT_CORE | publish event_id=%s type=%s entity=%s entity_id=%s",
@@ -40,6 +46,43 @@ class EventPublisher:
                 entity_id=event.entity_id,
                 payload=event.payload,
                 occurred_at=event.occurred_at,
+                # Синхронный режим выполняет обработчики в этой же транзакции: dispatcher событие не берёт.
+                dispatched_at=None if self._outbox else dispatch_clock(db.get_bind().dialect.name),
             )
         )
-        self._registry.dispatch(db, event)
+        if not self._outbox:
+            self._registry.dispatch(db, event)
+
+    def publish_many(self, db: Session, events: list[DomainEvent]) -> None:
+        """Публикует список событий одним INSERT; обработчики с batch-вариантом вызываются раз на тип события.
+        Нужен массовым операциям (повторения, горизонт автозадач, импорт), где события создаются сотнями.
+        """
+
+        if not events:
+            return
+        logger.info(
+            "EVENT_CORE | publish_many events=%s types=%s",
+            len(events),
+            ",".join(sorted(group_by_type(events))),
+        )
+
+        statement = insert(DomainEventRecord)
+        if not self._outbox:
+            statement = statement.values(dispatched_at=dispatch_clock(db.get_bind().dialect.name))
+        db.execute(
+            statement,
+            [
+                {
+                    "id": event.id,
+                    "type": event.type,
+                    "entity": event.entity,
+                    "entity_id": event.entity_id,
+                    "payload": event.payload,
+                    "occurred_at": event.occurred_at,
+                    "dispatch_attempts": 0,
+                }
+                for event in events
+            ],
+        )
+        if not self._outbox:
+            self._registry.dispatch_many(db, events)
@@ -0,0 +1,434 @@
+"""Пересборка проекций (read-агрегатов) из domain_events.
+Файл нужен, чтобы после ошибки в обработчике агрегат можно было восстановить из фактов без остановки сервиса.
+Минимальность: диапазоны occurred_at по дням с checkpoint'ом, потоковое чтение событий пачками, теневая таблица с атомарной заменой.
+
+Запуск из каталога backend:
+    python -m app.events.rebuild calendar_day_summary [--workers 4] [--batch-size 1000] [--range-days 1]
+    python -m app.events.rebuild calendar_day_summary --resume     # продолжить прерванную пересборку
+    python -m app.events.rebuild calendar_day_summary --in-place   # без теневой таблицы, в окно обслуживания
+В PostgreSQL диапазоны начинаются, когда завершены транзакции, получившие xid до cutoff (--writers-timeout).
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import (
+    Connection,
+    Engine,
+    MetaData,
+    PrimaryKeyConstraint,
+    Select,
+    Table,
+    UniqueConstraint,
+    delete,
+    func,
+    insert,
+    select,
+    text,
+    tuple_,
+    update,
+)
+
+from app.core.db import get_engine
+from app.events import archive
+from app.events.domain import DomainEvent
+from app.events.models import DomainEventRecord, ProjectionRebuildRange, dispatch_clock
+from app.events.partitions import add_months, month_start
+from app.events.projections import PROJECTIONS, Projection
+
+SHADOW_SUFFIX = "__rebuild"
+_EVENT_COLUMNS = (
+    DomainEventRecord.id,
+    DomainEventRecord.type,
+    DomainEventRecord.entity,
+    DomainEventRecord.entity_id,
+    DomainEventRecord.payload,
+    DomainEventRecord.occurred_at,
+)
+_EVENT_KEY = tuple_(DomainEventRecord.occurred_at, DomainEventRecord.id)
+_ranges = ProjectionRebuildRange.__table__
+
+
+def _shadow_name(name: str, live: str) -> str:
+    return name.replace(live, f"{live}{SHADOW_SUFFIX}") if live in name else f"{name}{SHADOW_SUFFIX}"
+
+
+def _live_name(name: str, live: str) -> str:
+    shadow = f"{live}{SHADOW_SUFFIX}"
+    return name.replace(shadow, live) if shadow in name else name.removesuffix(SHADOW_SUFFIX)
+
+
+def shadow_table(projection: Projection) -> Table:
+    """Копия таблицы проекции с суффиксом; имена индексов в схеме общие, поэтому у копии они тоже с суффиксом."""
+
+    live = projection.table.name
+    shadow = projection.table.to_metadata(MetaData(), name=f"{live}{SHADOW_SUFFIX}")
+    named = [*shadow.indexes, *(c for c in shadow.constraints if isinstance(c, (PrimaryKeyConstraint, UniqueConstraint)))]
+    for item in named:
+        if isinstance(item.name, str):
+            item.name = _shadow_name(item.name, live)
+    return shadow
+
+
+def _target_table(projection: Projection, target: str) -> Table:
+    return projection.table if target == projection.table.name else shadow_table(projection)
+
+
+def _events_query(projection: Projection, *conditions) -> Select:
+    return select(*_EVENT_COLUMNS).where(DomainEventRecord.type.in_(projection.event_types), *conditions)
+
+
+def _paged_batches(
+    connection: Connection,
+    query: Select,
+    batch_size: int,
+    after: tuple[datetime, str] | None,
+) -> Iterator[list[DomainEvent]]:
+    """Пачки событий по ключу (occurred_at, id): каждый запрос закрывает курсор до записи пачки."""
+
+    while True:
+        page = query if after is None else query.where(_EVENT_KEY > tuple_(*after))
+        rows = connection.execute(
+            page.order_by(DomainEventRecord.occurred_at, DomainEventRecord.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield [DomainEvent(**row._mapping) for row in rows]
+        after = (rows[-1].occurred_at, rows[-1].id)
+
+
+def _event_batches(
+    connection: Connection,
+    query: Select,
+    batch_size: int,
+    after: tuple[datetime, str] | None,
+) -> Iterator[list[DomainEvent]]:
+    """Пачки событий диапазона по occurred_at; в памяти не больше одной пачки."""
+
+    if connection.dialect.name != "postgresql":
+        # Открытый курсор SQLite держит блокировку чтения и не даёт зафиксировать пачку с другого соединения.
+        yield from _paged_batches(connection, query, batch_size, after)
+        return
+    if after is not None:
+        query = query.where(_EVENT_KEY > tuple_(*after))
+    # Серверный курсор: PostgreSQL отдаёт строки порциями yield_per, весь диапазон в память не читается.
+    result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(
+        query.order_by(DomainEventRecord.occurred_at, DomainEventRecord.id)
+    )
+    for rows in result.partitions():
+        yield [DomainEvent(**row._mapping) for row in rows]
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite возвращает время без зоны; в БД оно хранится в UTC.
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _archived_events(
+    projection: Projection,
+    range_start: datetime,
+    range_end: datetime,
+    after: tuple[datetime, str] | None,
+) -> Iterator[DomainEvent]:
+    """События диапазона из архивного файла месяца; файл упорядочен по (occurred_at, id), как и выборка из БД."""
+
+    lower, upper = _utc(range_start), _utc(range_end)
+    key = (_utc(after[0]), after[1]) if after is not None else None
+    for event in archive.read_month(month_start(lower.astimezone(timezone.utc))):
+        if event.type not in projection.event_types or not lower <= event.occurred_at < upper:
+            continue
+        if key is not None and (event.occurred_at, event.id) <= key:
+            continue
+        yield event
+
+
+def _batched(events: Iterable[DomainEvent], batch_size: int) -> Iterator[list[DomainEvent]]:
+    batch: list[DomainEvent] = []
+    for event in events:
+        batch.append(event)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _month_bound(month: date) -> datetime:
+    return datetime.combine(month, datetime.min.time(), tzinfo=timezone.utc)
+
+
+def plan_rebuild(engine: Engine, projection: Projection, range_days: int, in_place: bool) -> int:
+    """Готовит цель пересборки и диапазоны по дням; возвращает число диапазонов.
+    Прежние checkpoint'ы проекции удаляются: новая пересборка начинается с нуля.
+    """
+
+    with engine.begin() as connection:
+        # Первый оператор — DML: в SQLite он открывает транзакцию, и DDL ниже выполняется в ней же.
+        connection.execute(delete(_ranges).where(_ranges.c.projection == projection.name))
+        if in_place:
+            target = projection.table
+            connection.execute(delete(target))
+        else:
+            target = shadow_table(projection)
+            target.drop(connection, checkfirst=True)
+            target.create(connection)
+        # Часы БД, а не процесса: dispatched_at ставится ими же, расхождение часов хостов не сдвигает границу.
+        cutoff = connection.scalar(select(dispatch_clock(connection.dialect.name)))
+        first, last = connection.execute(
+            select(func.min(DomainEventRecord.occurred_at), func.max(DomainEventRecord.occurred_at)).where(
+                DomainEventRecord.type.in_(projection.event_types),
+                DomainEventRecord.dispatched_at < cutoff,
+            )
+        ).one()
+        bounds: list[tuple[datetime, datetime]] = []
+        # Архивный месяц (app.events.partitions) — один диапазон: файл читается вместе со строками месяца, оставшимися в БД.
+        archived = archive.archived_months()
+        for month in archived:
+            bounds.append((_month_bound(month), _month_bound(add_months(month, 1))))
+        if first is not None:
+            first, last = _utc(first).astimezone(timezone.utc), _utc(last).astimezone(timezone.utc)
+            start = datetime.combine(first.date(), datetime.min.time(), tzinfo=timezone.utc)
+            step = timedelta(days=max(range_days, 1))
+            while start <= last:
+                month = month_start(start.date())
+                month_end = _month_bound(add_months(month, 1))
+                if month in archived:
+                    start = month_end
+                    continue
+                # Диапазон не переходит границу месяца: месяц может уйти в архив и читаться из файла.
+                end = min(start + step, month_end)
+                bounds.append((start, end))
+                start = end
+        if bounds:
+            connection.execute(
+                insert(_ranges),
+                [
+                    {
+                        "projection": projection.name,
+                        "range_start": lower,
+                        "range_end": upper,
+                        "target": target.name,
+                        "cutoff": cutoff,
+                    }
+                    for lower, upper in bounds
+                ],
+            )
+    return len(bounds)
+
+
+def wait_for_writers(engine: Engine, timeout_seconds: float, poll_seconds: float = 0.5) -> bool:
+    """Ждёт завершения транзакций, получивших xid до вызова; False — не дождались за timeout_seconds.
+    dispatched_at ставится до commit: транзакция с отметкой раньше cutoff может зафиксироваться уже после чтения
+    своего диапазона, и её событие не попало бы ни в диапазон, ни в догон после cutoff. Вызывается после plan_rebuild:
+    снимок берётся позже cutoff, поэтому в нём есть все такие транзакции. SQLite сериализует запись, ждать нечего.
+    """
+
+    if engine.dialect.name != "postgresql":
+        return True
+    with engine.connect() as connection:
+        xmax = connection.scalar(text("SELECT pg_snapshot_xmax(pg_current_snapshot())::text"))
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            passed = connection.scalar(
+                text("SELECT pg_snapshot_xmin(pg_current_snapshot()) >= CAST(:xmax AS xid8)"), {"xmax": xmax}
+            )
+            # Каждая проверка — отдельная транзакция: иначе соединение само держит старый снимок.
+            connection.rollback()
+            if passed:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll_seconds)
+
+
+def rebuild_range(projection_name: str, range_start: datetime, batch_size: int) -> int:
+    """Применяет события одного диапазона к цели пересборки; возвращает число применённых событий.
+    Каждая пачка фиксируется вместе с checkpoint'ом, поэтому прерванный диапазон продолжается без повторов.
+    Вызывается и в процессах-воркерах: аргументы простые, engine создаётся в процессе.
+    """
+
+    projection = PROJECTIONS[projection_name]
+    engine = get_engine()
+    key = (_ranges.c.projection == projection_name, _ranges.c.range_start == range_start)
+    applied = 0
+    with engine.connect() as writer, engine.connect() as reader:
+        checkpoint = writer.execute(select(_ranges).where(*key)).one()
+        writer.commit()
+        if checkpoint.finished_at is not None:
+            return 0
+        target = _target_table(projection, checkpoint.target)
+        after = None
+        if checkpoint.last_event_id is not None:
+            after = (checkpoint.last_occurred_at, checkpoint.last_event_id)
+        query = _events_query(
+            projection,
+            DomainEventRecord.occurred_at >= checkpoint.range_start,
+            DomainEventRecord.occurred_at < checkpoint.range_end,
+            DomainEventRecord.dispatched_at < checkpoint.cutoff,
+        )
+        batches = _event_batches(reader, query, batch_size, after)
+        if archive.archive_path(month_start(_utc(checkpoint.range_start).astimezone(timezone.utc))).exists():
+            # В БД могут остаться строки архивного месяца (пришли после выгрузки): оба источника сливаются по ключу.
+            stored = (event for events in batches for event in events)
+            archived = _archived_events(projection, checkpoint.range_start, checkpoint.range_end, after)
+            batches = _batched(archive.merge_events(archived, stored), batch_size)
+        for events in batches:
+            projection.apply(writer, target, events)
+            writer.execute(
+                update(_ranges)
+                .where(*key)
+                .values(
+                    last_occurred_at=events[-1].occurred_at,
+                    last_event_id=events[-1].id,
+                    events_applied=_ranges.c.events_applied + len(events),
+                )
+            )
+            writer.commit()
+            applied += len(events)
+        writer.execute(update(_ranges).where(*key).values(finished_at=datetime.now(timezone.utc)))
+        writer.commit()
+    return applied
+
+
+def _restore_index_names(connection: Connection, projection: Projection, shadow: Table) -> None:
+    live = projection.table.name
+    quote = connection.dialect.identifier_preparer.quote
+    if connection.dialect.name == "postgresql":
+        names = connection.scalars(
+            text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"),
+            {"table": live},
+        )
+        for name in list(names):
+            if _live_name(name, live) != name:
+                connection.execute(text(f"ALTER INDEX {quote(name)} RENAME TO {quote(_live_name(name, live))}"))
+        return
+    # В SQLite нет ALTER INDEX RENAME: индексы пересоздаются под исходными именами.
+    for index in shadow.indexes:
+        connection.execute(text(f"DROP INDEX {quote(index.name)}"))
+    for index in projection.table.indexes:
+        index.create(connection)
+
+
+def swap_shadow(engine: Engine, projection: Projection, batch_size: int) -> int:
+    """Догоняет события, доставленные после cutoff, и заменяет таблицу проекции теневой в одной транзакции.
+    Возвращает число догнанных событий. Читатели видят либо старую, либо полностью пересобранную таблицу.
+    """
+
+    shadow = shadow_table(projection)
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as connection:
+        cutoff = connection.scalar(select(func.min(_ranges.c.cutoff)).where(_ranges.c.projection == projection.name))
+        # DML до DDL: в SQLite он открывает транзакцию, в которой выполнятся DROP и RENAME.
+        connection.execute(delete(_ranges).where(_ranges.c.projection == projection.name))
+        if connection.dialect.name == "postgresql":
+            # Запись в проекцию ждёт конца замены; ожидавший publish после неё падает и повторяется целиком.
+            connection.execute(text(f"LOCK TABLE {quote(projection.table.name)} IN EXCLUSIVE MODE"))
+        tail = 0
+        if cutoff is not None:
+            for events in _paged_batches(
+                connection, _events_query(projection, DomainEventRecord.dispatched_at >= cutoff), batch_size, None
+            ):
+                projection.apply(connection, shadow, events)
+                tail += len(events)
+        projection.table.drop(connection)
+        connection.execute(text(f"ALTER TABLE {quote(shadow.name)} RENAME TO {quote(projection.table.name)}"))
+        _restore_index_names(connection, projection, shadow)
+    return tail
+
+
+def _pending_ranges(engine: Engine, projection: Projection) -> list[datetime]:
+    with engine.connect() as connection:
+        return list(
+            connection.scalars(
+                select(_ranges.c.range_start)
+                .where(_ranges.c.projection == projection.name, _ranges.c.finished_at.is_(None))
+                .order_by(_ranges.c.range_start)
+            )
+        )
+
+
+def _checkpoint_target(engine: Engine, projection: Projection) -> str | None:
+    """Цель незавершённой пересборки проекции или None, если checkpoint'ов нет."""
+
+    with engine.connect() as connection:
+        return connection.scalar(select(_ranges.c.target).where(_ranges.c.projection == projection.name).limit(1))
+
+
+def _run_ranges(projection: Projection, ranges: list[datetime], batch_size: int, workers: int) -> int:
+    if workers <= 1 or len(ranges) <= 1:
+        return sum(rebuild_range(projection.name, range_start, batch_size) for range_start in ranges)
+    # spawn: воркер создаёт свой engine, а не наследует соединения пула родителя через fork.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(rebuild_range, projection.name, range_start, batch_size) for range_start in ranges]
+        return sum(future.result() for future in futures)
+
+
+def main(argv: list[str] | None = None) -> int:
+    from app.core.log_pipeline import configure_logging, start_log_listener, stop_log_listener
+
+    parser = argparse.ArgumentParser(description="Пересборка проекции из domain_events")
+    parser.add_argument("projection", choices=sorted(PROJECTIONS), help="проекция (read-агрегат)")
+    parser.add_argument("--workers", type=int, default=1, help="процессы, параллельно пересобирающие диапазоны")
+    parser.add_argument("--batch-size", type=int, default=1000, help="событий в пачке (граница памяти воркера)")
+    parser.add_argument("--range-days", type=int, default=1, help="ширина диапазона occurred_at в днях")
+    parser.add_argument("--resume", action="store_true", help="продолжить незавершённые диапазоны по checkpoint'ам")
+    parser.add_argument("--in-place", action="store_true", help="очистить и пересобрать саму таблицу, без теневой копии")
+    parser.add_argument("--no-swap", action="store_true", help="оставить теневую таблицу для проверки; заменить --resume")
+    parser.add_argument(
+        "--writers-timeout", type=float, default=300.0, help="сколько секунд ждать транзакции, начатые до cutoff"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    start_log_listener()
+    try:
+        projection = PROJECTIONS[args.projection]
+        engine = get_engine()
+        batch_size = max(args.batch_size, 1)
+        started = time.perf_counter()
+
+        if args.resume:
+            target = _checkpoint_target(engine, projection)
+            if target is None:
+                print(f"Нет прерванной пересборки {projection.name}", file=sys.stderr)
+                return 2
+        else:
+            ranges_count = plan_rebuild(engine, projection, args.range_days, args.in_place)
+            target = projection.table.name if args.in_place else shadow_table(projection).name
+            print(f"{projection.name}: {ranges_count} диапазонов по {max(args.range_days, 1)} дн. в {target}")
+
+        if not wait_for_writers(engine, args.writers_timeout):
+            print(
+                f"Транзакции, начатые до cutoff, не завершились за {args.writers_timeout:g} с; "
+                f"повторите: python -m app.events.rebuild {projection.name} --resume",
+                file=sys.stderr,
+            )
+            return 3
+        pending = _pending_ranges(engine, projection)
+        applied = _run_ranges(projection, pending, batch_size, args.workers)
+        print(f"Применено событий: {applied} (диапазонов {len(pending)}) за {time.perf_counter() - started:.2f} с")
+
+        if target == projection.table.name:
+            with engine.begin() as connection:
+                connection.execute(delete(_ranges).where(_ranges.c.projection == projection.name))
+            print(f"{projection.name} пересобрана на месте")
+        elif args.no_swap:
+            print(f"Теневая таблица {target} готова; замена: python -m app.events.rebuild {projection.name} --resume")
+        else:
+            tail = swap_shadow(engine, projection, batch_size)
+            print(f"{projection.name} заменена теневой таблицей; догнано событий после cutoff: {tail}")
+        return 0
+    finally:
+        stop_log_listener()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,20 +3,46 @@
 Минимальность сохраняет только один маршрут и подключение к БД без бизнес-логики.
 """
 
+import hmac
 import logging
+from dataclasses import asdict
 
-from fastapi import FastAPI
+import anyio.to_thread
+from fastapi import Depends, FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy import inspect, text
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.core.admission import AdmissionControlMiddleware
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings, validate_required_envs
-from app.core.db import get_engine
+from app.core.db import (
+    dispose_async_engine,
+    dispose_engine,
+    get_async_pool_stats,
+    get_engine,
+    get_pool_stats,
+)
+from app.core.log_pipeline import RequestIdMiddleware, configure_logging, start_log_listener, stop_log_listener
+from app.core.metrics import MetricsMiddleware, registry as metrics_registry
+from app.core.password_pool import password_pool
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.read_routing import ReadYourWritesMiddleware, replica_status
+from app.core.schema import check_schema, get_schema_verdict
+from app.core.warmup import cancel_warmup, start_warmup, startup_phase, startup_phases, warmup_finished
 from app.modules.auth.service import init_auth_storage
-from app.modules.registry import include_module_routers
+from app.modules.registry import collect_required_tables, include_module_routers, start_background_jobs
+
+# Очередь логов ставится до первых записей; поток вывода запускается на старте воркера.
+configure_logging()
 
-app = FastAPI(title="Core Platform Bootstrap")
+# orjson рендерит ответы всех маршрутов в разы быстрее стандартного json.dumps.
+app = FastAPI(title="Core Platform Bootstrap", default_response_class=ORJSONResponse)
+
+# Контроль допуска — самый внутренний слой: 503 при перегрузке получает CORS-заголовки (браузер видит статус),
+# а метрики и учёт SQL снаружи видят отказы и время ожидания в очереди класса.
+app.add_middleware(AdmissionControlMiddleware)
 
 # CORS нужен для браузерного frontend (http://localhost:5173), чтобы preflight OPTIONS проходил корректно.
 # Это инфраструктурный middleware; архитектура BLOCK 11 и маршрутизация модулей не меняются.
@@ -28,6 +54,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Метрики снимаются middleware поверх CORS, чтобы preflight тоже попадал в счётчики маршрутов.
+# Учёт SQL на запрос добавляется раньше, поэтому он выполняется внутри замера latency.
+# Сжатие — самый внутренний слой: метрики видят полное время ответа вместе со сжатием.
+# Отметка записи для read-your-writes ставится ещё глубже, по статусу ответа обработчика.
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Request id выставляется самым внешним слоем, чтобы его получили записи всех middleware и обработчиков.
+app.add_middleware(RequestIdMiddleware)
 
 include_module_routers(app)
 logger = logging.getLogger("startup")
@@ -35,7 +71,7 @@ logger = logging.getLogger("startup")
 
 def _init_db() -> None:
     """Инициализация подключения без создания моделей.
-    Нужна только проверка доступности базы при старте.
+    Нужна проверка доступности базы и готовности схемы при старте.
     Минимальна, потому что никаких таблиц здесь не создаётся.
     """
 
@@ -45,45 +81,11 @@ def _init_db() -> None:
 
     # Проверка обязательной схемы нужна для fail-fast, если миграции не применены.
     # Runtime не создаёт таблицы, потому что схема управляется только Alembic.
-    inspector = inspect(engine)
-    if not inspector.has_table("auth_users"):
-        raise RuntimeError(
-            "Таблица auth_users не найдена. "
-            "Перед запуском backend необходимо выполнить alembic upgrade head."
-        )
-    if not inspector.has_table("platform_modules"):
-        raise RuntimeError(
-            "Таблица platform_modules не найдена. "
-            "Перед запуском backend необходимо выполнить alembic upgrade head."
-        )
-    if not inspector.has_table("auth_roles"):
-        raise RuntimeError(
-            "Таблица auth_roles не найдена. "
-            "Перед запуском backend необходимо выполнить alembic upgrade head."
-        )
-    if not inspector.has_table("auth_user_roles"):
-        raise RuntimeError(
-            "Таблица auth_user_roles не найдена. "
-            "Перед запуском backend необходимо выполнить alembic upgrade head."
-        )
-    if not inspector.has_table("auth_role_modules"):
+    # Одна проверка сверяет head Alembic и таблицы из манифестов модулей за один запрос.
+    verdict = check_schema(engine, collect_required_tables())
+    if not verdict.ok:
         raise RuntimeError(
-            "Таблица auth_role_modules не найдена. "
-            "Перед запуском backend необходимо выполнить alembic upgrade head."
-        )
-    if not inspector.has_table("auth_role_module_permissions"):
-        raise RuntimeError(
-            "Таблица auth_role_module_permissions не найдена. "
-            "Перед запуском backend необходимо выполнить alembic upgrade head."
-        )
-    if not inspector.has_table("domain_events"):
-        raise RuntimeError(
-            "Таблица domain_events не найдена. "
-            "Перед запуском backend необходимо выполнить alembic upgrade head."
-        )
-    if not inspector.has_table("calendar_day_summary"):
-        raise RuntimeError(
-            "Таблица calendar_day_summary не найдена. "
+            f"{verdict.reason}. "
             "Перед запуском backend необходимо выполнить alembic upgrade head."
         )
 
@@ -94,6 +96,9 @@ def on_startup() -> None:
     Нужна для демонстрации запуска, без дополнительной логики.
     """
 
+    # Поток вывода логов стартует в процессе воркера: поток, запущенный до fork, в потомок не переходит.
+    start_log_listener()
+
     # Логирование ограничено только фазой старта, чтобы не шуметь в runtime.
     # Формат сообщений един для быстрой диагностики и поиска причины остановки.
     logger.info("STARTUP | начало запуска backend")
@@ -101,7 +106,8 @@ def on_startup() -> None:
     # Проверка конфигурации выполняется при старте, чтобы остановить запуск при отсутствии env.
     # Fail-fast предотвращает скрытые ошибки в runtime и упрощает диагностику.
     try:
-        validate_required_envs()
+        with startup_phase("config"):
+            validate_required_envs()
     except Exception as exc:
         logger.error("STARTUP | проверка конфигурации не пройдена: %s", exc)
         raise
@@ -109,15 +115,21 @@ def on_startup() -> None:
 
     # Проверка БД логируется, потому что это ключевая зависимость для старта сервиса.
     try:
-        _init_db()
+        with startup_phase("database"):
+            _init_db()
     except Exception as exc:
         logger.error("STARTUP | проверка БД не пройдена: %s", exc)
         raise
     logger.info("STARTUP | проверка БД успешна")
 
+    # Размер threadpool выравнивается по пулу соединений: sync-endpoint'ы почти всегда держат соединение.
+    if settings.threadpool_size > 0:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
     # Инициализация auth-хранилища логируется как финальный шаг старта.
     try:
-        init_auth_storage()
+        with startup_phase("auth_storage"):
+            init_auth_storage()
     except Exception as exc:
         logger.error(
             "STARTUP | инициализация auth-хранилища не пройдена: %s",
@@ -125,9 +137,29 @@ def on_startup() -> None:
         )
         raise
 
+    # Фоновые задачи запускаются только для модулей, включённых в этом процессе.
+    with startup_phase("background_jobs"):
+        start_background_jobs()
+
+    # Прогрев идёт фоном: /health отвечает сразу, /ready — после прогрева, чтобы балансировщик
+    # не отдавал воркеру трафик, пока первые запросы платят за соединения и компиляцию SQL.
+    start_warmup(app)
+
     logger.info("STARTUP | запуск backend завершён успешно")
 
 
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    """Закрывает пулы соединений и пул процессов bcrypt при остановке процесса."""
+
+    await cancel_warmup()
+    dispose_engine()
+    await dispose_async_engine()
+    password_pool.shutdown()
+    # Последним: записи, сделанные при остановке, успевают попасть в вывод.
+    stop_log_listener()
+
+
 @app.get("/health")
 def health() -> dict[str, str]:
     """Простой endpoint проверки состояния.
@@ -142,7 +174,11 @@ def health() -> dict[str, str]:
 def ready() -> JSONResponse:
     """Проверка готовности сервиса работать с зависимостями."""
 
+    if not warmup_finished():
+        return JSONResponse(status_code=503, content={"status": "not_ready", "reason": "Прогрев воркера не завершён"})
+
     # /ready ходит в БД, потому что readiness должен подтверждать доступность зависимостей.
+    # Engine общий для процесса, поэтому частые probe не открывают новый пул на каждый вызов.
     engine = get_engine()
     try:
         with engine.connect() as connection:
@@ -154,4 +190,58 @@ def ready() -> JSONResponse:
             content={"status": "not_ready", "reason": f"База данных недоступна: {exc}"},
         )
 
+    # Вердикт по схеме кэшируется, поэтому частые probe не ходят в каталог каждый раз.
+    verdict = get_schema_verdict(engine, collect_required_tables())
+    if not verdict.ok:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "not_ready", "reason": f"Схема БД не готова: {verdict.reason}"},
+        )
+
     return JSONResponse(status_code=200, content={"status": "ready"})
+
+
+def require_diagnostics_access(x_diagnostics_token: str | None = Header(default=None)) -> None:
+    """Пускает к внутренней диагностике по DIAGNOSTICS_TOKEN.
+    Без токена диагностика открыта только вне production; в production она скрыта, как несуществующий маршрут.
+    """
+
+    if settings.diagnostics_token:
+        if x_diagnostics_token is None or not hmac.compare_digest(x_diagnostics_token, settings.diagnostics_token):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    elif settings.environment == "production":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+@app.get("/diagnostics/pool", include_in_schema=False, dependencies=[Depends(require_diagnostics_access)])
+def pool_diagnostics() -> dict:
+    """Состояние пулов соединений процесса.
+    Не ходит в БД: возвращает только счётчики занятых соединений, overflow и ожиданий.
+    Поля верхнего уровня описывают sync-пул, async_pool — пул async-стека, replicas — последние замеры отставания реплик.
+    """
+
+    async_stats = get_async_pool_stats()
+    return {
+        **asdict(get_pool_stats()),
+        "async_pool": asdict(async_stats) if async_stats is not None else None,
+        "replicas": replica_status(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_diagnostics_access)])
+async def metrics() -> PlainTextResponse:
+    """Метрики процесса в текстовом формате Prometheus.
+    Endpoint async, потому что заполненность threadpool читается только из event loop.
+    """
+
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.get("/diagnostics/startup", include_in_schema=False, dependencies=[Depends(require_diagnostics_access)])
+def startup_diagnostics() -> dict:
+    """Длительности фаз старта и прогрева процесса в секундах; не ходит в БД."""
+
+    return {"warmup_finished": warmup_finished(), "phases": startup_phases()}
@@ -1,3 +1 @@
-from .api import router
-
-__all__ = ["router"]
+"""Пакет модуля управления доступом; router загружается реестром по манифесту."""
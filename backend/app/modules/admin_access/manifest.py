@@ -0,0 +1,12 @@
+"""Манифест модуля управления доступом.
+Файл существует для описания модуля через общий контракт.
+Минимальность: только декларация без импорта router'а и сервисов.
+"""
+
+from app.modules.base import Module
+
+module = Module(
+    name="admin_access",
+    router="app.modules.admin_access.api:router",
+    permissions=(("admin", ("view", "create", "edit", "delete")),),
+)
@@ -3,16 +3,17 @@ from __future__ import annotations
 from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
+from app.modules.auth.claims import token_grants
 from app.modules.auth.models import Role, RoleModule, RoleModulePermission, User, UserRole
 from app.modules.admin_access.schemas import PermissionItem
 from app.modules.module_registry.models import PlatformModule
-
-DEFAULT_PERMISSIONS_BY_MODULE: dict[str, list[str]] = {
-    "admin": ["view", "create", "edit", "delete"],
-}
+from app.modules.registry import module_permissions
 
 
 def user_can_manage_access(db: Session, user_id: int) -> bool:
+    grants = token_grants(db, user_id)
+    if grants is not None:
+        return grants.can_manage_access
     role_ids = select(UserRole.role_id).where(UserRole.user_id == user_id)
     return bool(
         db.scalar(
@@ -44,7 +45,7 @@ def list_roles(db: Session) -> list[dict]:
 
 
 def _module_permission_catalog(db: Session, module_id: str) -> list[str]:
-    known = set(DEFAULT_PERMISSIONS_BY_MODULE.get(module_id, []))
+    known = set(module_permissions(module_id))
     db_known = db.scalars(
         select(RoleModulePermission.permission)
         .where(RoleModulePermission.module_id == module_id)
@@ -1,8 +1,4 @@
 """Модуль аутентификации.
 Он нужен для изоляции минимального техничного входа пользователя.
-Минимальность соблюдается: только базовые операции регистрации и входа.
+Минимальность соблюдается: только базовые операции регистрации и входа; router загружается реестром по манифесту.
 """
-
-from app.modules.auth.api import router
-
-__all__ = ["router"]
@@ -4,52 +4,63 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.context import UserContext
 from app.core.security import get_current_user
+from app.modules.auth.claims import build_token_claims
 from app.modules.auth.schemas import Token, UserCreate, UserLogin, UserPublic
-from app.modules.auth.security import create_access_token
-from app.modules.auth.service import authenticate_user, create_user, get_db, get_user_by_username
+from app.modules.auth.security import create_access_token, hash_password_async
+from app.modules.auth.service import (
+    authenticate_user_async,
+    create_user,
+    get_async_db,
+    get_user_by_username_async,
+)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
-def register(payload: UserCreate, db: Session = Depends(get_db)) -> UserPublic:
+async def register(payload: UserCreate, db: AsyncSession = Depends(get_async_db)) -> UserPublic:
     """Регистрация пользователя.
     Нужна только для создания минимальной учётной записи.
+    Хэш считается в пуле процессов до записи, запись выполняется sync-сервисом через run_sync.
     """
 
-    if get_user_by_username(db, payload.username):
+    if await get_user_by_username_async(db, payload.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered",
         )
-    user = create_user(db, payload.username, payload.password)
+    hashed_password = await hash_password_async(payload.password)
+    user = await db.run_sync(create_user, payload.username, payload.password, hashed_password)
     return UserPublic(id=user.id, username=user.username)
 
 
 @router.post("/login", response_model=Token)
-def login(payload: UserLogin, db: Session = Depends(get_db)) -> Token:
+async def login(payload: UserLogin, db: AsyncSession = Depends(get_async_db)) -> Token:
     """Логин пользователя.
     Возвращает access token для дальнейших запросов.
     """
 
     # OAuth2PasswordRequestForm не используется, потому что логин оформлен как обычный JSON endpoint.
     # Принимаем Pydantic-схему, чтобы сохранить архитектуру BLOCK 11 без изменений роутера.
-    user = authenticate_user(db, payload.username, payload.password)
+    # Endpoint async: проверка bcrypt ждётся в пуле процессов, поток threadpool на это время не занят.
+    user = await authenticate_user_async(db, payload.username, payload.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
-    token = create_access_token(str(user.id))
+    claims = await db.run_sync(build_token_claims, user) if settings.auth_token_claims_enabled else None
+    token = create_access_token(str(user.id), claims)
     return Token(access_token=token)
 
 
 @router.get("/me", response_model=UserPublic)
-def me(
+async def me(
     current_user: UserContext = Depends(get_current_user),
 ) -> UserPublic:
     """Текущий пользователь.
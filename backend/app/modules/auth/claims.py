@@ -0,0 +1,331 @@
+"""Claims доступа внутри access token.
+Файл нужен, чтобы проверки ролей и прав выполнялись по токену без запросов к БД на каждый вызов.
+Минимальность: роли, битовая маска прав по каталогу и штамп версии; при устаревшей версии — чтение из БД.
+"""
+
+from __future__ import annotations
+
+import base64
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.modules.auth.models import (
+    PermissionVersion,
+    Role,
+    RoleModule,
+    RoleModulePermission,
+    User,
+    UserRole,
+)
+from app.modules.module_registry.models import PlatformModule
+
+AUTH_CLAIMS_CHECKS = registry.counter(
+    "auth_claims_checks_total",
+    "Проверки доступа по claims токена: token — без БД, stale — версия устарела, absent — claims нет.",
+    ("result",),
+)
+
+MANAGE_ACCESS_ENTRY = "manage_access"
+
+
+@dataclass(frozen=True)
+class AccessClaims:
+    """Claims доступа, разобранные из токена."""
+
+    user_id: int
+    username: str
+    role_ids: tuple[int, ...]
+    bits: int
+    version: int
+
+
+@dataclass(frozen=True)
+class AccessGrants:
+    """Права пользователя в том же виде, в каком их собирают сервисы из БД."""
+
+    role_ids: tuple[int, ...]
+    can_manage_access: bool
+    module_ids: frozenset[str]
+    permissions: dict[str, dict[str, bool]]
+
+
+@dataclass(frozen=True)
+class _CatalogState:
+    """Версия доступов и каталог позиций битовой маски для этой версии."""
+
+    version: int
+    catalog: tuple[str, ...]
+    loaded_at: float
+
+
+_state: _CatalogState | None = None
+_state_lock = threading.Lock()
+_current_claims: ContextVar[AccessClaims | None] = ContextVar("access_claims", default=None)
+
+
+def _module_entry(module_id: str) -> str:
+    return f"module:{module_id}"
+
+
+def _permission_entry(module_id: str, permission: str) -> str:
+    return f"perm:{module_id}:{permission}"
+
+
+def _catalog_queries():
+    return (
+        select(PlatformModule.id),
+        select(RoleModulePermission.module_id, RoleModulePermission.permission).distinct(),
+    )
+
+
+def _build_catalog(module_ids, permission_pairs) -> tuple[str, ...]:
+    """Каталог позиций маски: порядок детерминирован, чтобы все процессы одной версии совпадали."""
+
+    entries = {_module_entry(module_id) for module_id in module_ids}
+    entries.update(_permission_entry(module_id, permission) for module_id, permission in permission_pairs)
+    return (MANAGE_ACCESS_ENTRY, *sorted(entries))
+
+
+def _version_query():
+    return select(PermissionVersion.version).where(PermissionVersion.id == 1)
+
+
+def _store_state(before: int | None, catalog: tuple[str, ...], after: int | None) -> _CatalogState:
+    global _state
+    # Версия читается до и после каталога: если между ними прошёл bump, каталог мог быть
+    # от другой версии, и такое состояние не подтверждает ни один токен до следующей загрузки.
+    version = before if before is not None and before == after else -1
+    state = _CatalogState(version=version, catalog=catalog, loaded_at=time.monotonic())
+    with _state_lock:
+        _state = state
+    return state
+
+
+def _fresh_state() -> _CatalogState | None:
+    state = _state
+    if state is not None and time.monotonic() - state.loaded_at < settings.auth_claims_version_ttl_seconds:
+        return state
+    return None
+
+
+def _load_state(db: Session) -> _CatalogState:
+    state = _fresh_state()
+    if state is not None:
+        return state
+    modules_query, permissions_query = _catalog_queries()
+    before = db.scalar(_version_query())
+    catalog = _build_catalog(db.scalars(modules_query).all(), db.execute(permissions_query).all())
+    return _store_state(before, catalog, db.scalar(_version_query()))
+
+
+async def _load_state_async(db: AsyncSession) -> _CatalogState:
+    state = _fresh_state()
+    if state is not None:
+        return state
+    modules_query, permissions_query = _catalog_queries()
+    before = await db.scalar(_version_query())
+    catalog = _build_catalog(
+        (await db.scalars(modules_query)).all(),
+        (await db.execute(permissions_query)).all(),
+    )
+    return _store_state(before, catalog, await db.scalar(_version_query()))
+
+
+def _encode_bits(bits: int) -> str:
+    return base64.urlsafe_b64encode(bits.to_bytes((bits.bit_length() + 7) // 8 or 1, "little")).rstrip(b"=").decode()
+
+
+def _decode_bits(raw: str) -> int:
+    return int.from_bytes(base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)), "little")
+
+
+def build_token_claims(db: Session, user: User) -> dict[str, Any]:
+    """Собирает claims для нового токена.
+    Маска: на каждую позицию каталога два бита — «известна» (2i) и «разрешена» (2i+1);
+    «известна» нужна, чтобы /modules отдавал и явно запрещённые permissions.
+    """
+
+    state = _load_state(db)
+    if state.version < 0:
+        return {"name": user.username}
+
+    role_ids = sorted(db.scalars(select(UserRole.role_id).where(UserRole.user_id == user.id)).all())
+    granted: dict[str, bool] = {}
+    if role_ids:
+        can_manage = db.scalar(
+            select(Role.id).where(Role.id.in_(role_ids), Role.can_manage_access.is_(True)).limit(1)
+        )
+        granted[MANAGE_ACCESS_ENTRY] = can_manage is not None
+        for module_id in db.scalars(select(RoleModule.module_id).where(RoleModule.role_id.in_(role_ids))).all():
+            granted[_module_entry(module_id)] = True
+        rows = db.execute(
+            select(RoleModulePermission.module_id, RoleModulePermission.permission, RoleModulePermission.is_allowed)
+            .where(RoleModulePermission.role_id.in_(role_ids))
+        ).all()
+        for module_id, permission, is_allowed in rows:
+            entry = _permission_entry(module_id, permission)
+            granted[entry] = granted.get(entry, False) or bool(is_allowed)
+
+    # Версия перепроверяется после чтения прав: если доступы поменялись посреди сборки,
+    # токен выпускается без штампа и проверяется по БД.
+    if db.scalar(_version_query()) != state.version:
+        return {"name": user.username}
+
+    positions = {entry: index for index, entry in enumerate(state.catalog)}
+    bits = 0
+    for entry, allowed in granted.items():
+        index = positions.get(entry)
+        if index is None:
+            continue
+        bits |= 1 << (2 * index)
+        if allowed:
+            bits |= 1 << (2 * index + 1)
+    return {"name": user.username, "rid": role_ids, "perm": _encode_bits(bits), "pv": state.version}
+
+
+def parse_claims(payload: dict[str, Any]) -> AccessClaims | None:
+    """Достаёт claims из payload; токены без штампа версии (старый формат) дают None."""
+
+    try:
+        return AccessClaims(
+            user_id=int(payload["sub"]),
+            username=str(payload["name"]),
+            role_ids=tuple(int(role_id) for role_id in payload["rid"]),
+            bits=_decode_bits(payload["perm"]),
+            version=int(payload["pv"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def bind_claims(claims: AccessClaims | None) -> None:
+    """Делает claims текущего запроса доступными сервисам, которые получают только user_id."""
+
+    _current_claims.set(claims)
+
+
+def _grants(claims: AccessClaims | None, user_id: int, state: _CatalogState | None) -> AccessGrants | None:
+    if claims is None or claims.user_id != user_id:
+        AUTH_CLAIMS_CHECKS.inc(result="absent")
+        return None
+    if state is None or state.version != claims.version:
+        AUTH_CLAIMS_CHECKS.inc(result="stale")
+        return None
+    AUTH_CLAIMS_CHECKS.inc(result="token")
+
+    can_manage_access = False
+    module_ids: set[str] = set()
+    permissions: dict[str, dict[str, bool]] = {}
+    for index, entry in enumerate(state.catalog):
+        if not claims.bits >> (2 * index) & 1:
+            continue
+        allowed = bool(claims.bits >> (2 * index + 1) & 1)
+        if entry == MANAGE_ACCESS_ENTRY:
+            can_manage_access = allowed
+        elif entry.startswith("module:"):
+            module_ids.add(entry.removeprefix("module:"))
+        else:
+            module_id, permission = entry.removeprefix("perm:").split(":", 1)
+            permissions.setdefault(module_id, {})[permission] = allowed
+    return AccessGrants(
+        role_ids=claims.role_ids,
+        can_manage_access=can_manage_access,
+        module_ids=frozenset(module_ids),
+        permissions=permissions,
+    )
+
+
+def token_grants(db: Session, user_id: int) -> AccessGrants | None:
+    """Права пользователя из токена текущего запроса или None, если нужно читать БД."""
+
+    claims = _current_claims.get()
+    if claims is None or not settings.auth_token_claims_enabled:
+        return _grants(None, user_id, None)
+    return _grants(claims, user_id, _load_state(db))
+
+
+async def token_grants_async(db: AsyncSession, user_id: int) -> AccessGrants | None:
+    """Async-вариант token_grants."""
+
+    claims = _current_claims.get()
+    if claims is None or not settings.auth_token_claims_enabled:
+        return _grants(None, user_id, None)
+    return _grants(claims, user_id, await _load_state_async(db))
+
+
+async def claims_are_fresh_async(db: AsyncSession, claims: AccessClaims) -> bool:
+    """Проверяет штамп версии без загрузки пользователя: так get_current_user обходится без БД."""
+
+    return (await _load_state_async(db)).version == claims.version
+
+
+# Сдвиг версии. Изменения ролей, прав, пользователей и набора модулей ловятся и на flush ORM-объектов,
+# и на bulk update/delete; версия растёт один раз на транзакцию, а локальный каталог сбрасывается после commit.
+_BUMPED_KEY = "auth_permission_version_bumped"
+_ROLE_CLASSES = (Role, UserRole, RoleModule, RoleModulePermission)
+
+
+def _bump_version(session: Session) -> None:
+    if session.info.get(_BUMPED_KEY):
+        return
+    session.info[_BUMPED_KEY] = True
+    session.connection().execute(
+        update(PermissionVersion).where(PermissionVersion.id == 1).values(version=PermissionVersion.version + 1)
+    )
+
+
+def _username_changed(user: User) -> bool:
+    return inspect(user).attrs.username.history.has_changes()
+
+
+def _changes_access(session: Session) -> bool:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _ROLE_CLASSES):
+            return True
+        # У пользователя в токен попадает только логин: пересчёт хэша пароля при логине версию не двигает.
+        if isinstance(obj, User) and (obj in session.deleted or _username_changed(obj)):
+            return True
+        # Порядок и основной модуль не влияют на доступы, важен только набор модулей.
+        if isinstance(obj, PlatformModule) and obj not in session.dirty:
+            return True
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_flush(session: Session, flush_context) -> None:
+    if _changes_access(session):
+        _bump_version(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_bulk(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    target = mapper.class_
+    if issubclass(target, _ROLE_CLASSES) or (target is User and orm_execute_state.is_delete):
+        _bump_version(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _reset_after_commit(session: Session) -> None:
+    global _state
+    if session.info.pop(_BUMPED_KEY, None):
+        with _state_lock:
+            _state = None
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_after_rollback(session: Session) -> None:
+    session.info.pop(_BUMPED_KEY, None)
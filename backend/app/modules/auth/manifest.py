@@ -0,0 +1,19 @@
+"""Манифест модуля аутентификации.
+Файл существует для описания модуля через общий контракт.
+Минимальность: только декларация без импорта router'а и сервисов.
+"""
+
+from app.modules.base import Module
+
+module = Module(
+    name="auth",
+    router="app.modules.auth.api:router",
+    required_tables=(
+        "auth_users",
+        "auth_roles",
+        "auth_user_roles",
+        "auth_role_modules",
+        "auth_role_module_permissions",
+        "auth_permission_version",
+    ),
+)
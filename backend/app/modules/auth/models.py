@@ -3,7 +3,7 @@
 Минимальность: только то, что нужно для входа и RBAC уровня модулей.
 """
 
-from sqlalchemy import Boolean, ForeignKey, Integer, String
+from sqlalchemy import BigInteger, Boolean, ForeignKey, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -90,3 +90,15 @@ class RoleModulePermission(Base):
     )
     permission: Mapped[str] = mapped_column(String(64), primary_key=True)
     is_allowed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+
+class PermissionVersion(Base):
+    """Версия ролей и доступов.
+    Единственная строка; значение растёт с каждой транзакцией, меняющей роли, права или пользователей,
+    и служит штампом актуальности для токенов с claims.
+    """
+
+    __tablename__ = "auth_permission_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=1)
@@ -1,6 +1,7 @@
 """Утилиты безопасности для аутентификации.
 Файл существует, чтобы изолировать хэширование пароля и выпуск токенов.
 Минимальность: только bcrypt и простые JWT без дополнительных функций.
+bcrypt выполняется в пуле процессов app.core.password_pool, а не в потоке запроса.
 """
 
 from __future__ import annotations
@@ -11,17 +12,29 @@ import hmac
 import json
 import os
 import time
+from functools import lru_cache
 from typing import Any
 
 import bcrypt
 
+from app.core.config import settings
+from app.core.password_pool import password_pool
+
 
 def hash_password(password: str) -> str:
-    """Создаёт bcrypt-хэш пароля.
+    """Создаёт bcrypt-хэш пароля с BCRYPT_ROUNDS.
     Нужен исключительно для безопасного хранения в базе.
     """
 
-    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    salt = bcrypt.gensalt(settings.bcrypt_rounds)
+    return password_pool.run("hash", bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+
+async def hash_password_async(password: str) -> str:
+    """Async-вариант hash_password для endpoint'ов в event loop."""
+
+    salt = bcrypt.gensalt(settings.bcrypt_rounds)
+    hashed = await password_pool.run_async("hash", bcrypt.hashpw, password.encode("utf-8"), salt)
     return hashed.decode("utf-8")
 
 
@@ -30,18 +43,49 @@ def verify_password(password: str, hashed_password: str) -> bool:
     Используется только при логине.
     """
 
-    return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+    return password_pool.run("verify", bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """Async-вариант verify_password для логина."""
+
+    return await password_pool.run_async(
+        "verify", bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8")
+    )
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Проверяет, отличается ли cost хэша от BCRYPT_ROUNDS.
+    Хэш формата $2b$<cost>$...; нераспознанный формат не трогаем, чтобы не сломать вход.
+    """
+
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return False
+    return int(parts[2]) != settings.bcrypt_rounds
 
 
-def _get_secret_key() -> bytes:
-    """Читает секрет для подписи токенов.
-    Минимально: только из окружения без дефолта.
+@lru_cache(maxsize=1)
+def _get_signer() -> hmac.HMAC:
+    """Готовит HMAC-подписчик по AUTH_SECRET_KEY один раз на процесс.
+    Ключ читается только из окружения без дефолта; исключение не кэшируется, поэтому
+    ошибка конфигурации повторится на следующем вызове, а не превратится в пустой ключ.
     """
 
     secret = os.getenv("AUTH_SECRET_KEY")
     if not secret:
         raise RuntimeError("AUTH_SECRET_KEY is required")
-    return secret.encode("utf-8")
+    return hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+
+
+def _sign(signing_input: bytes) -> bytes:
+    """Подписывает данные копией заранее подготовленного HMAC.
+    copy() переиспользует уже посчитанные inner/outer pad ключа вместо разбора ключа на каждый токен.
+    """
+
+    signer = _get_signer().copy()
+    signer.update(signing_input)
+    return signer.digest()
 
 
 def _b64url_encode(data: bytes) -> str:
@@ -61,22 +105,22 @@ def _b64url_decode(data: str) -> bytes:
     return base64.urlsafe_b64decode(data + padding)
 
 
-def create_access_token(subject: str) -> str:
+def create_access_token(subject: str, claims: dict[str, Any] | None = None) -> str:
     """Создаёт JWT access token.
-    Токен содержит только технический subject и срок жизни.
+    Токен содержит технический subject, срок жизни и, в режиме claims, роли и права пользователя.
     """
 
     header = {"alg": "HS256", "typ": "JWT"}
     now = int(time.time())
     expires_minutes = int(os.getenv("AUTH_TOKEN_EXPIRES_MINUTES", "30"))
-    payload = {"sub": subject, "iat": now, "exp": now + expires_minutes * 60}
+    payload = {**(claims or {}), "sub": subject, "iat": now, "exp": now + expires_minutes * 60}
 
     header_b64 = _b64url_encode(json.dumps(header, separators=(",", ":")).encode("utf-8"))
     payload_b64 = _b64url_encode(
         json.dumps(payload, separators=(",", ":")).encode("utf-8")
     )
     signing_input = f"{header_b64}.{payload_b64}".encode("utf-8")
-    signature = hmac.new(_get_secret_key(), signing_input, hashlib.sha256).digest()
+    signature = _sign(signing_input)
     signature_b64 = _b64url_encode(signature)
     return f"{header_b64}.{payload_b64}.{signature_b64}"
 
@@ -92,9 +136,7 @@ def decode_access_token(token: str) -> dict[str, Any]:
         raise ValueError("Invalid token format") from exc
 
     signing_input = f"{header_b64}.{payload_b64}".encode("utf-8")
-    expected_signature = hmac.new(
-        _get_secret_key(), signing_input, hashlib.sha256
-    ).digest()
+    expected_signature = _sign(signing_input)
     if not hmac.compare_digest(_b64url_decode(signature_b64), expected_signature):
         raise ValueError("Invalid token signature")
 
@@ -5,18 +5,30 @@
 
 from __future__ import annotations
 
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker
 
-from app.core.db import get_engine
+from app.core.db import get_async_engine, get_engine
+from app.core.read_routing import RoutingSession
 from app.modules.auth.models import Role, User, UserRole
-from app.modules.auth.security import hash_password, verify_password
+from app.modules.auth.security import (
+    hash_password,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password,
+    verify_password_async,
+)
 
 # Импорт Base удалён, потому что схемой управляют миграции, а лишний импорт вводит в заблуждение.
+# Engine общий для процесса: сессии, /ready и Alembic используют один и тот же пул.
 engine = get_engine()
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# RoutingSession читает с реплики только в маршрутах с зависимостью replica_reads, иначе работает с primary.
+SessionLocal = sessionmaker(bind=engine, class_=RoutingSession, autoflush=False, autocommit=False)
+# Async-фабрика привязывается к engine при открытии сессии, чтобы импорт не требовал async-драйвера.
+AsyncSessionLocal = async_sessionmaker(sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False)
 DEFAULT_ROLE_NAME = "employee"
 
 
@@ -41,6 +53,15 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Возвращает async-сессию базы данных.
+    Нужна горячим read-endpoint'ам, которые не должны занимать поток threadpool.
+    """
+
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
+
+
 def get_user_by_username(db: Session, username: str) -> User | None:
     """Ищет пользователя по логину.
     Нужен для регистрации и логина.
@@ -49,12 +70,12 @@ def get_user_by_username(db: Session, username: str) -> User | None:
     return db.scalar(select(User).where(User.username == username))
 
 
-def create_user(db: Session, username: str, password: str) -> User:
+def create_user(db: Session, username: str, password: str, hashed_password: str | None = None) -> User:
     """Создаёт пользователя.
-    Хранит только хэш пароля и логин.
+    Хранит только хэш пароля и логин; готовый hashed_password позволяет посчитать хэш вне сессии.
     """
 
-    user = User(username=username, hashed_password=hash_password(password))
+    user = User(username=username, hashed_password=hashed_password or hash_password(password))
     db.add(user)
     db.commit()
     db.refresh(user)
@@ -75,6 +96,28 @@ def authenticate_user(db: Session, username: str, password: str) -> User | None:
     return user
 
 
+async def get_user_by_username_async(db: AsyncSession, username: str) -> User | None:
+    """Async-вариант get_user_by_username."""
+
+    return await db.scalar(select(User).where(User.username == username))
+
+
+async def authenticate_user_async(db: AsyncSession, username: str, password: str) -> User | None:
+    """Async-вариант authenticate_user: bcrypt ждётся без занятого потока.
+    После успешной проверки хэш со старым cost пересчитывается с текущим BCRYPT_ROUNDS.
+    """
+
+    user = await get_user_by_username_async(db, username)
+    if not user:
+        return None
+    if not await verify_password_async(password, user.hashed_password):
+        return None
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(password)
+        await db.commit()
+    return user
+
+
 def get_user_by_id(db: Session, user_id: int) -> User | None:
     """Ищет пользователя по id.
     Используется при восстановлении текущего пользователя из токена.
@@ -83,6 +126,12 @@ def get_user_by_id(db: Session, user_id: int) -> User | None:
     return db.get(User, user_id)
 
 
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> User | None:
+    """Async-вариант get_user_by_id для зависимостей, работающих в event loop."""
+
+    return await db.get(User, user_id)
+
+
 def assign_default_role(db: Session, user_id: int) -> None:
     """Назначает роль по умолчанию новому пользователю."""
 
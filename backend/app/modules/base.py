@@ -1,19 +1,46 @@
 """Базовый контракт модулей.
-Файл существует для единого технического описания модуля.
-Роль минимальна: фиксируются только имя и router без логики инициализации.
+Файл существует для единого декларативного описания модуля.
+Роль минимальна: фиксируются имя, путь к router'у, таблицы схемы, фоновые задачи, прогрев и права без импорта кода модуля.
 """
 
 from dataclasses import dataclass
+from importlib import import_module
+from typing import Any, Awaitable, Callable
 
 from fastapi import APIRouter
 
 
+def _resolve(path: str) -> Any:
+    """Объект по пути вида "пакет.модуль:атрибут"."""
+
+    module_path, _, attribute = path.partition(":")
+    return getattr(import_module(module_path), attribute)
+
+
 @dataclass(frozen=True)
 class Module:
     """Контракт модуля платформы.
-    Нужен для предсказуемого подключения маршрутов.
-    Минимальность: только имя и router, без логики старта.
+    Нужен для предсказуемого подключения маршрутов и проверки схемы на старте.
+    Минимальность: манифест содержит только строки и кортежи, поэтому чтение реестра не импортирует
+    router, сервисы и тяжёлые зависимости модуля; они загружаются при подключении включённого модуля.
     """
 
     name: str
-    router: APIRouter
+    # Путь "пакет.модуль:атрибут" к APIRouter.
+    router: str
+    required_tables: tuple[str, ...] = ()
+    # Пути к функциям без аргументов, которые запускаются на старте воркера, где модуль включён.
+    background_jobs: tuple[str, ...] = ()
+    # Пути к async-функциям прогрева вида f(db: AsyncSession), которые выполняют горячие запросы модуля.
+    warmups: tuple[str, ...] = ()
+    # Каталог прав для выдачи ролям: пары (id модуля платформы из platform_modules.id, права).
+    permissions: tuple[tuple[str, tuple[str, ...]], ...] = ()
+
+    def load_router(self) -> APIRouter:
+        return _resolve(self.router)
+
+    def load_background_jobs(self) -> list[Callable[[], None]]:
+        return [_resolve(path) for path in self.background_jobs]
+
+    def load_warmups(self) -> list[Callable[[Any], Awaitable[None]]]:
+        return [_resolve(path) for path in self.warmups]
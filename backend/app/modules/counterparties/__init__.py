@@ -1,3 +1 @@
-from .api import router
-
-__all__ = ["router"]
+"""Пакет модуля контрагентов; router загружается реестром по манифесту."""
@@ -3,6 +3,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
+from app.core.conditional import conditional_get
 from app.core.security import get_current_user
 from app.modules.auth.service import get_db
 from app.modules.counterparties.schemas import (
@@ -51,7 +52,7 @@ def patch_settings(payload: CounterpartyTaskCreatorSettingsPayload, db: Session
     return update_task_creator_settings(db, payload)
 
 
-@router.get("/folders", response_model=list[CounterpartyFolderDto])
+@router.get("/folders", response_model=list[CounterpartyFolderDto], dependencies=[Depends(conditional_get("counterparty_folders"))])
 def get_folders(db: Session = Depends(get_db)) -> list[CounterpartyFolderDto]:
     return list_folders(db)
 
@@ -83,7 +84,7 @@ def remove_folder(folder_id: int, db: Session = Depends(get_db)) -> Response:
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.get("", response_model=list[CounterpartyDto])
+@router.get("", response_model=list[CounterpartyDto], dependencies=[Depends(conditional_get("counterparties"))])
 def get_counterparties(include_archived: bool = Query(False), db: Session = Depends(get_db)) -> list[CounterpartyDto]:
     return list_counterparties(db, include_archived)
 
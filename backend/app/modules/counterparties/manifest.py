@@ -0,0 +1,19 @@
+"""Манифест модуля контрагентов.
+Файл существует для описания модуля через общий контракт.
+Минимальность: только декларация без импорта router'а и сервисов.
+"""
+
+from app.modules.base import Module
+
+module = Module(
+    name="counterparties",
+    router="app.modules.counterparties.api:router",
+    required_tables=(
+        "counterparty_folders",
+        "counterparties",
+        "counterparty_auto_task_rules",
+        "counterparty_auto_task_rule_assignees",
+        "counterparty_auto_task_rule_verifiers",
+        "counterparty_module_settings",
+    ),
+)
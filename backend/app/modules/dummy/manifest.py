@@ -1,9 +1,8 @@
 """Манифест тестового модуля.
 Файл существует для описания модуля через общий контракт.
-Минимальность: только имя и router без инициализации.
+Минимальность: только имя и путь к router'у без инициализации.
 """
 
 from app.modules.base import Module
-from app.modules.dummy.api import router
 
-module = Module(name="dummy", router=router)
+module = Module(name="dummy", router="app.modules.dummy.api:router")
@@ -1,3 +1 @@
-from app.modules.employees.api import router
-
-__all__ = ["router"]
+"""Пакет модуля сотрудников; router загружается реестром по манифесту."""
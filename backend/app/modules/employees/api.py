@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
+from app.core.conditional import conditional_get
 from app.core.context import UserContext
+from app.core.read_routing import replica_reads
 from app.core.security import get_current_user
 from app.modules.auth.service import get_db
 from app.modules.employees.models import (
@@ -48,7 +51,7 @@ from app.modules.employees.service import (
 router = APIRouter(tags=["employees"])
 
 
-@router.get("/users")
+@router.get("/users", dependencies=[Depends(replica_reads)])
 def users_list(
     organization_id: int | None = None,
     search: str | None = None,
@@ -57,7 +60,8 @@ def users_list(
     current_user: UserContext = Depends(get_current_user),
 ):
     require_permission(db, current_user.id, "users.view")
-    return list_users(db, organization_id=organization_id, search=search, archived=show_archived)
+    # Готовый ORJSONResponse минует jsonable_encoder: список пользователей бывает большим.
+    return ORJSONResponse(list_users(db, organization_id=organization_id, search=search, archived=show_archived))
 
 
 @router.get("/users/{user_id}")
@@ -236,25 +240,8 @@ def groups_list(organization_id: int, db: Session = Depends(get_db), current_use
     ]
 
 
-@router.get("/org/groups/{group_id}")
-def group_get(group_id: int, db: Session = Depends(get_db), current_user: UserContext = Depends(get_current_user)):
-    require_permission(db, current_user.id, "orgstructure.view")
-    group = db.get(Group, group_id)
-    if not group:
-        raise HTTPException(status_code=404, detail="group_not_found")
-    return {
-        "id": group.id,
-        "organization_id": group.organization_id,
-        "parent_group_id": group.parent_group_id,
-        "name": group.name,
-        "head_user_id": group.head_user_id,
-        "sort_order": group.sort_order,
-        "is_active": group.is_active,
-        "is_archived": group.is_archived,
-    }
-
-
-@router.get("/org/groups/tree")
+# Маршрут объявлен раньше /org/groups/{group_id}, иначе "tree" попадает в group_id и запрос получает 422.
+@router.get("/org/groups/tree", dependencies=[Depends(replica_reads)])
 def groups_tree(organization_id: int, show_archived: bool = False, db: Session = Depends(get_db), current_user: UserContext = Depends(get_current_user)):
     require_permission(db, current_user.id, "orgstructure.view")
     groups_stmt = select(Group).where(Group.organization_id == organization_id)
@@ -275,7 +262,7 @@ def groups_tree(organization_id: int, show_archived: bool = False, db: Session =
         users_by_position.setdefault(position_id, []).append(
             {"id": uid, "full_name": full_name, "is_archived": is_archived}
         )
-    return {
+    return ORJSONResponse({
         "groups": [
             {
                 "id": g.id,
@@ -300,6 +287,24 @@ def groups_tree(organization_id: int, show_archived: bool = False, db: Session =
             }
             for p in positions
         ],
+    })
+
+
+@router.get("/org/groups/{group_id}")
+def group_get(group_id: int, db: Session = Depends(get_db), current_user: UserContext = Depends(get_current_user)):
+    require_permission(db, current_user.id, "orgstructure.view")
+    group = db.get(Group, group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail="group_not_found")
+    return {
+        "id": group.id,
+        "organization_id": group.organization_id,
+        "parent_group_id": group.parent_group_id,
+        "name": group.name,
+        "head_user_id": group.head_user_id,
+        "sort_order": group.sort_order,
+        "is_active": group.is_active,
+        "is_archived": group.is_archived,
     }
 
 
@@ -479,7 +484,7 @@ def position_users(position_id: int, db: Session = Depends(get_db), current_user
     return [{"id": uid, "full_name": full_name, "is_archived": is_archived} for uid, full_name, is_archived in rows]
 
 
-@router.get("/roles")
+@router.get("/roles", dependencies=[Depends(conditional_get("roles", per_user=True))])
 def roles(show_archived: bool = False, db: Session = Depends(get_db), current_user: UserContext = Depends(get_current_user)):
     require_permission(db, current_user.id, "roles.view")
     stmt = select(Role)
@@ -579,7 +584,7 @@ def role_delete(role_id: int, db: Session = Depends(get_db), current_user: UserC
     return {"ok": True}
 
 
-@router.get("/permissions")
+@router.get("/permissions", dependencies=[Depends(conditional_get("permissions", per_user=True))])
 def permissions(db: Session = Depends(get_db), current_user: UserContext = Depends(get_current_user)):
     require_permission(db, current_user.id, "roles.view")
     rows = list(db.scalars(select(Permission).order_by(Permission.module, Permission.action)))
@@ -0,0 +1,46 @@
+"""Манифест модуля сотрудников.
+Файл существует для описания модуля через общий контракт.
+Минимальность: только декларация без импорта router'а и сервисов.
+"""
+
+from app.modules.base import Module
+
+module = Module(
+    name="employees",
+    router="app.modules.employees.api:router",
+    required_tables=(
+        "users",
+        "organizations",
+        "user_organizations",
+        "groups",
+        "positions",
+        "user_positions",
+        "roles",
+        "permissions",
+        "role_permissions",
+        "position_roles",
+    ),
+    # Права, которые проверяет require_permission в api модуля.
+    permissions=(
+        (
+            "employees",
+            (
+                "users.view",
+                "users.create",
+                "users.edit",
+                "users.archive",
+                "users.set_password",
+                "orgstructure.view",
+                "orgstructure.edit",
+                "roles.view",
+                "roles.create",
+                "roles.edit",
+                "roles.archive",
+                "roles.delete",
+                "organizations.switch",
+                "organizations.manage",
+                "employees.view",
+            ),
+        ),
+    ),
+)
@@ -6,6 +6,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
+from app.modules.auth.claims import token_grants
 from app.modules.auth.models import RoleModule, RoleModulePermission, UserRole
 from app.modules.auth.security import hash_password
 from app.modules.employees.models import (
@@ -25,6 +26,12 @@ MODULE_ID = "employees"
 
 
 def require_permission(db: Session, current_user_id: int, permission: str) -> None:
+    grants = token_grants(db, current_user_id)
+    if grants is not None:
+        allowed = MODULE_ID in grants.module_ids and grants.permissions.get(MODULE_ID, {}).get(permission, False)
+        if not grants.role_ids or not allowed:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
+        return None
     role_ids = list(db.scalars(select(UserRole.role_id).where(UserRole.user_id == current_user_id)))
     if not role_ids:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
@@ -3,14 +3,17 @@ BLOCK 13 вводит единый реестр, поэтому UI модуле
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.conditional import conditional_get
 from app.core.context import UserContext
 from app.core.security import get_current_user
-from app.modules.auth.service import get_db
+from app.modules.auth.service import get_async_db, get_db
 from app.modules.module_registry.schemas import ModuleDto, ModuleOrderUpdate, ModulePrimaryUpdate
 from app.modules.module_registry.service import (
     list_modules_with_access,
+    list_modules_with_access_async,
     reorder_modules,
     set_primary_module,
 )
@@ -22,16 +25,20 @@ router = APIRouter(
 )
 
 
-@router.get("", response_model=list[ModuleDto])
-def get_modules(
+@router.get(
+    "",
+    response_model=list[ModuleDto],
+    dependencies=[Depends(conditional_get("platform_modules", per_user=True))],
+)
+async def get_modules(
     current_user: UserContext = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[ModuleDto]:
     """Возвращает модули с флагом доступа для текущего пользователя.
     Backend вычисляет доступ по ролям и остаётся источником истины.
     """
 
-    return list_modules_with_access(db, current_user.id)
+    return await list_modules_with_access_async(db, current_user.id)
 
 
 @router.patch("/primary", response_model=list[ModuleDto])
@@ -0,0 +1,13 @@
+"""Манифест модуля реестра модулей платформы.
+Файл существует для описания модуля через общий контракт.
+Минимальность: только декларация без импорта router'а и сервисов.
+"""
+
+from app.modules.base import Module
+
+module = Module(
+    name="module_registry",
+    router="app.modules.module_registry.api:router",
+    required_tables=("platform_modules",),
+    warmups=("app.modules.module_registry.service:warm_up_statements",),
+)
@@ -4,8 +4,10 @@ Backend остаётся источником истины о состоянии
 """
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.modules.auth.claims import token_grants, token_grants_async
 from app.modules.auth.models import RoleModule, RoleModulePermission, UserRole
 from app.modules.module_registry.models import PlatformModule
 
@@ -18,19 +20,24 @@ def list_modules(db: Session) -> list[PlatformModule]:
     return list(db.scalars(select(PlatformModule).order_by(PlatformModule.order)))
 
 
-def _build_permissions_map(db: Session, role_ids: list[int]) -> dict[str, dict[str, bool]]:
-    """Строит карту permissions по module_id с OR-агрегацией по ролям."""
+def _permissions_query(role_ids: list[int]):
+    """Запрос permission-флагов всех ролей пользователя."""
+
+    return select(
+        RoleModulePermission.module_id,
+        RoleModulePermission.permission,
+        RoleModulePermission.is_allowed,
+    ).where(RoleModulePermission.role_id.in_(role_ids))
 
-    if not role_ids:
-        return {}
 
-    rows = db.execute(
-        select(
-            RoleModulePermission.module_id,
-            RoleModulePermission.permission,
-            RoleModulePermission.is_allowed,
-        ).where(RoleModulePermission.role_id.in_(role_ids))
-    ).all()
+def _accessible_modules_query(role_ids: list[int]):
+    """Запрос id модулей, доступных ролям пользователя."""
+
+    return select(RoleModule.module_id).where(RoleModule.role_id.in_(role_ids))
+
+
+def _group_permissions(rows) -> dict[str, dict[str, bool]]:
+    """Строит карту permissions по module_id с OR-агрегацией по ролям."""
 
     permissions_by_module: dict[str, dict[str, bool]] = {}
     for module_id, permission, is_allowed in rows:
@@ -40,31 +47,21 @@ def _build_permissions_map(db: Session, role_ids: list[int]) -> dict[str, dict[s
     return permissions_by_module
 
 
-def list_modules_with_access(db: Session, user_id: int) -> list[dict]:
-    """Возвращает модули с флагом доступа и permissions по ролям пользователя."""
-
-    modules = list_modules(db)
-    role_ids = list(db.scalars(select(UserRole.role_id).where(UserRole.user_id == user_id)))
-    permissions_by_module = _build_permissions_map(db, role_ids)
+def _build_permissions_map(db: Session, role_ids: list[int]) -> dict[str, dict[str, bool]]:
+    """Строит карту permissions по module_id с OR-агрегацией по ролям."""
 
     if not role_ids:
-        return [
-            {
-                "id": module.id,
-                "name": module.name,
-                "title": module.title,
-                "path": module.path,
-                "order": module.order,
-                "is_primary": module.is_primary,
-                "has_access": False,
-                "permissions": {},
-            }
-            for module in modules
-        ]
-
-    accessible_ids = set(
-        db.scalars(select(RoleModule.module_id).where(RoleModule.role_id.in_(role_ids))).all()
-    )
+        return {}
+
+    return _group_permissions(db.execute(_permissions_query(role_ids)).all())
+
+
+def _modules_with_access_payload(
+    modules: list[PlatformModule],
+    accessible_ids: set[str],
+    permissions_by_module: dict[str, dict[str, bool]],
+) -> list[dict]:
+    """Собирает ответ /modules из уже загруженных данных."""
 
     return [
         {
@@ -81,6 +78,49 @@ def list_modules_with_access(db: Session, user_id: int) -> list[dict]:
     ]
 
 
+def list_modules_with_access(db: Session, user_id: int) -> list[dict]:
+    """Возвращает модули с флагом доступа и permissions по ролям пользователя."""
+
+    modules = list_modules(db)
+    grants = token_grants(db, user_id)
+    if grants is not None:
+        return _modules_with_access_payload(modules, set(grants.module_ids), grants.permissions)
+    role_ids = list(db.scalars(select(UserRole.role_id).where(UserRole.user_id == user_id)))
+    if not role_ids:
+        return _modules_with_access_payload(modules, set(), {})
+
+    permissions_by_module = _build_permissions_map(db, role_ids)
+    accessible_ids = set(db.scalars(_accessible_modules_query(role_ids)).all())
+    return _modules_with_access_payload(modules, accessible_ids, permissions_by_module)
+
+
+async def list_modules_with_access_async(db: AsyncSession, user_id: int) -> list[dict]:
+    """Async-вариант list_modules_with_access для GET /modules."""
+
+    modules = list((await db.scalars(select(PlatformModule).order_by(PlatformModule.order))).all())
+    grants = await token_grants_async(db, user_id)
+    if grants is not None:
+        return _modules_with_access_payload(modules, set(grants.module_ids), grants.permissions)
+    role_ids = list((await db.scalars(select(UserRole.role_id).where(UserRole.user_id == user_id))).all())
+    if not role_ids:
+        return _modules_with_access_payload(modules, set(), {})
+
+    permissions_by_module = _group_permissions((await db.execute(_permissions_query(role_ids))).all())
+    accessible_ids = set((await db.scalars(_accessible_modules_query(role_ids))).all())
+    return _modules_with_access_payload(modules, accessible_ids, permissions_by_module)
+
+
+async def warm_up_statements(db: AsyncSession) -> None:
+    """Прогрев: запросы GET /modules попадают в кэш компиляции engine.
+    У пользователя и роли с id 0 нет строк; запросы прав и доступных модулей вызываются отдельно,
+    потому что без ролей list_modules_with_access_async до них не доходит.
+    """
+
+    await list_modules_with_access_async(db, 0)
+    await db.execute(_permissions_query([0]))
+    await db.scalars(_accessible_modules_query([0]))
+
+
 def set_primary_module(db: Session, module_id: str | None) -> list[PlatformModule]:
     """Обновляет основной модуль.
     При module_id=None снимает флаг со всех модулей.
@@ -1,37 +1,104 @@
 """Явный реестр модулей.
-Файл существует для централизованного подключения router'ов.
-Роль минимальна: только include_router без инициализации модулей.
+Файл существует для централизованного подключения router'ов по манифестам модулей.
+Роль минимальна: импорт кода только включённых модулей и include_router без инициализации модулей.
 """
 
+import logging
+from typing import Any, Awaitable, Callable
+
 from fastapi import FastAPI
 
+from app.core.config import settings
+from app.modules.admin_access.manifest import module as admin_access_module
+from app.modules.auth.manifest import module as auth_module
 from app.modules.base import Module
-from app.modules.auth import router as auth_router
-from app.modules.admin_access import router as admin_access_router
-from app.modules.counterparties import router as counterparties_router
+from app.modules.counterparties.manifest import module as counterparties_module
 from app.modules.dummy.manifest import module as dummy_module
-from app.modules.module_registry.api import router as module_registry_router
-from app.modules.tasks import router as tasks_router
-from app.modules.user_sidebar_settings import router as user_sidebar_settings_router
-from app.modules.employees import router as employees_router
+from app.modules.employees.manifest import module as employees_module
+from app.modules.module_registry.manifest import module as module_registry_module
+from app.modules.tasks.manifest import module as tasks_module
+from app.modules.user_sidebar_settings.manifest import module as user_sidebar_settings_module
+
+logger = logging.getLogger("startup")
 
 modules: list[Module] = [
-    Module(name="auth", router=auth_router),
-    Module(name="admin_access", router=admin_access_router),
-    Module(name="module_registry", router=module_registry_router),
-    Module(name="tasks", router=tasks_router),
-    Module(name="counterparties", router=counterparties_router),
-    Module(name="user_sidebar_settings", router=user_sidebar_settings_router),
-    Module(name="employees", router=employees_router),
+    auth_module,
+    admin_access_module,
+    module_registry_module,
+    tasks_module,
+    counterparties_module,
+    user_sidebar_settings_module,
+    employees_module,
     dummy_module,
 ]
 
+# Таблицы платформенного ядра, которые не принадлежат ни одному модулю.
+CORE_REQUIRED_TABLES: tuple[str, ...] = (
+    "domain_events",
+    "domain_event_deliveries",
+    "calendar_day_summary",
+    "projection_rebuild_ranges",
+    "table_versions",
+)
+
+
+def enabled_modules() -> list[Module]:
+    """Модули, которые обслуживает этот процесс: ENABLED_MODULES (пусто — все) без DISABLED_MODULES.
+    Опечатка в имени модуля останавливает старт, а не молча отключает маршруты.
+    """
+
+    known = {module.name for module in modules}
+    unknown = sorted((set(settings.enabled_modules) | set(settings.disabled_modules)) - known)
+    if unknown:
+        raise RuntimeError(f"ENABLED_MODULES/DISABLED_MODULES: неизвестные модули {', '.join(unknown)}")
+    enabled = set(settings.enabled_modules) or known
+    return [module for module in modules if module.name in enabled and module.name not in settings.disabled_modules]
+
 
 def include_module_routers(app: FastAPI) -> None:
-    """Подключает router'ы модулей к приложению.
+    """Подключает router'ы включённых модулей к приложению.
     Нужен единый вход для регистрации маршрутов.
-    Минимальность: только include_router без startup-логики.
+    Минимальность: импорт router'а и include_router без startup-логики;
+    код выключенных модулей и их зависимости в процесс не загружаются.
     """
 
+    for module in enabled_modules():
+        app.include_router(module.load_router())
+
+
+def start_background_jobs() -> None:
+    """Запускает фоновые задачи включённых модулей; вызывается на старте воркера."""
+
+    for module in enabled_modules():
+        for job in module.load_background_jobs():
+            logger.info("STARTUP | фоновая задача %s.%s", module.name, job.__name__)
+            job()
+
+
+def warmup_hooks() -> list[tuple[str, Callable[[Any], Awaitable[None]]]]:
+    """Функции прогрева включённых модулей с именами модулей."""
+
+    return [(module.name, hook) for module in enabled_modules() for hook in module.load_warmups()]
+
+
+def collect_required_tables() -> list[str]:
+    """Собирает обязательные таблицы ядра и всех модулей реестра.
+    Нужен для единой проверки схемы на старте и в /ready.
+    Схема общая для всех воркеров, поэтому проверяются и таблицы модулей, выключенных в этом процессе.
+    """
+
+    tables = set(CORE_REQUIRED_TABLES)
+    for module in modules:
+        tables.update(module.required_tables)
+    return sorted(tables)
+
+
+def module_permissions(module_id: str) -> tuple[str, ...]:
+    """Права модуля платформы из манифестов всех модулей, включая выключенные в этом процессе."""
+
+    permissions: list[str] = []
     for module in modules:
-        app.include_router(module.router)
+        for catalog_module_id, catalog in module.permissions:
+            if catalog_module_id == module_id:
+                permissions.extend(catalog)
+    return tuple(permissions)
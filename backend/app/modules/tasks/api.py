@@ -3,12 +3,15 @@ from __future__ import annotations
 from datetime import date, datetime, timezone
 
 from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, UploadFile, status
-from fastapi.responses import Response
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.conditional import conditional_get
 from app.core.context import UserContext
+from app.core.read_routing import replica_reads
 from app.core.security import get_current_user
-from app.modules.auth.service import get_db
+from app.modules.auth.service import get_async_db, get_db
 from app.modules.tasks.schemas import (
     CalendarDayDto,
     RecurrenceActionPayload,
@@ -31,11 +34,11 @@ from app.modules.tasks.service import (
     create_task,
     delete_recurrence_children,
     delete_task,
-    get_task_badges,
+    get_task_badges_async,
     get_task_dto,
     is_user_task_viewer,
-    list_calendar_days,
-    list_tasks_for_date,
+    list_calendar_days_async,
+    list_tasks_for_date_async,
     list_users,
     return_task_to_active,
     update_task,
@@ -66,7 +69,7 @@ def download_tasks_template(
     return _xlsx_response(build_template_workbook(), "tasks_template")
 
 
-@router.get("/admin/export")
+@router.get("/admin/export", dependencies=[Depends(replica_reads)])
 def export_tasks_excel(
     _: None = Depends(validate_admin_pin),
     db: Session = Depends(get_db),
@@ -79,8 +82,9 @@ def import_tasks_excel_preview(
     file: UploadFile = File(...),
     _: None = Depends(validate_admin_pin),
     db: Session = Depends(get_db),
-) -> dict:
-    return build_import_preview(db, file)
+) -> ORJSONResponse:
+    # Превью включает всех пользователей и все строки файла, поэтому отдаётся без jsonable_encoder.
+    return ORJSONResponse(build_import_preview(db, file))
 
 
 @router.post("/admin/import")
@@ -97,7 +101,11 @@ def import_tasks_excel(
 
 # ───────────────── USERS ─────────────────
 
-@router.get("/users", response_model=list[TaskUserDto])
+@router.get(
+    "/users",
+    response_model=list[TaskUserDto],
+    dependencies=[Depends(replica_reads), Depends(conditional_get("auth_users"))],
+)
 def get_task_users(
     current_user: UserContext = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -109,36 +117,36 @@ def get_task_users(
 # ───────────────── BADGES ─────────────────
 
 @router.get("/badges", response_model=TaskBadgeDto)
-def get_badges(
+async def get_badges(
     current_user: UserContext = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> TaskBadgeDto:
-    return get_task_badges(db, current_user.id)
+    return await get_task_badges_async(db, current_user.id)
 
 
 # ───────────────── CALENDAR ─────────────────
 
-@router.get("/calendar", response_model=list[CalendarDayDto])
-def get_tasks_calendar(
+@router.get("/calendar", response_model=list[CalendarDayDto], dependencies=[Depends(replica_reads)])
+async def get_tasks_calendar(
     from_date: date = Query(..., alias="from"),
     to_date: date = Query(..., alias="to"),
     tab: str = Query("assigned"),
     current_user: UserContext = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[CalendarDayDto]:
-    return list_calendar_days(db, current_user.id, from_date, to_date, tab)
+    return await list_calendar_days_async(db, current_user.id, from_date, to_date, tab)
 
 
 # ───────────────── LIST ─────────────────
 
 @router.get("", response_model=list[TaskDto])
-def get_tasks(
+async def get_tasks(
     date_value: date = Query(..., alias="date"),
     tab: str = Query("assigned"),
     current_user: UserContext = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[TaskDto]:
-    return list_tasks_for_date(db, current_user.id, date_value, tab)
+    return await list_tasks_for_date_async(db, current_user.id, date_value, tab)
 
 
 @router.get("/{task_id}", response_model=TaskDto)
@@ -8,10 +8,6 @@ from typing import Any
 from uuid import uuid4
 
 from fastapi import Header, HTTPException, UploadFile
-from openpyxl import Workbook, load_workbook
-from openpyxl.comments import Comment
-from openpyxl.worksheet.datavalidation import DataValidation
-from openpyxl.styles import Font
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -224,6 +220,12 @@ def _rows_from_sheet(sheet) -> tuple[list[str], list[dict[str, Any]]]:
 
 
 def build_template_workbook() -> bytes:
+    # openpyxl импортируется при первом Excel-запросе: он нужен редко, а его импорт — заметная часть старта воркера.
+    from openpyxl import Workbook
+    from openpyxl.comments import Comment
+    from openpyxl.styles import Font
+    from openpyxl.worksheet.datavalidation import DataValidation
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Шаблон"
@@ -310,6 +312,8 @@ def build_template_workbook() -> bytes:
 
 
 def export_tasks_workbook(db: Session) -> bytes:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Экспорт задач"
@@ -420,6 +424,8 @@ def _validate_row(db: Session, row: dict[str, Any], user_cache: dict[int, bool])
 def build_import_preview(db: Session, upload: UploadFile) -> dict[str, Any]:
     if not upload.filename or not upload.filename.lower().endswith(".xlsx"):
         raise HTTPException(status_code=400, detail="Only .xlsx files are supported")
+    from openpyxl import load_workbook
+
     sheet = load_workbook(filename=BytesIO(upload.file.read()), data_only=True).active
     _, rows = _rows_from_sheet(sheet)
     user_cache: dict[int, bool] = {}
@@ -0,0 +1,13 @@
+"""Манифест модуля задач.
+Файл существует для описания модуля через общий контракт.
+Минимальность: только декларация без импорта router'а и сервисов.
+"""
+
+from app.modules.base import Module
+
+module = Module(
+    name="tasks",
+    router="app.modules.tasks.api:router",
+    required_tables=("tasks", "task_assignees", "task_verifiers"),
+    warmups=("app.modules.tasks.service:warm_up_statements",),
+)
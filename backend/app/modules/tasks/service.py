@@ -4,7 +4,8 @@ from calendar import monthrange
 from datetime import date, datetime, time, timezone
 from uuid import uuid4
 
-from sqlalchemy import and_, delete, exists, func, or_, select
+from sqlalchemy import Select, and_, delete, exists, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.modules.admin_access.service import user_can_manage_access
@@ -54,16 +55,27 @@ def _advance_date(current: date, recurrence_type: str, recurrence_interval: int)
     return date(year, month, day)
 
 
-def _get_linked_user_ids_map(db: Session, task_ids: list[str], model: type[TaskAssignee] | type[TaskVerifier]) -> dict[str, list[int]]:
-    if not task_ids:
-        return {}
-    rows = db.execute(select(model.task_id, model.user_id).where(model.task_id.in_(task_ids))).all()
+def _group_linked_user_ids(task_ids: list[str], rows) -> dict[str, list[int]]:
     ret: dict[str, list[int]] = {task_id: [] for task_id in task_ids}
     for task_id, user_id in rows:
         ret.setdefault(task_id, []).append(user_id)
     return ret
 
 
+def _get_linked_user_ids_map(db: Session, task_ids: list[str], model: type[TaskAssignee] | type[TaskVerifier]) -> dict[str, list[int]]:
+    if not task_ids:
+        return {}
+    rows = db.execute(select(model.task_id, model.user_id).where(model.task_id.in_(task_ids))).all()
+    return _group_linked_user_ids(task_ids, rows)
+
+
+async def _get_linked_user_ids_map_async(db: AsyncSession, task_ids: list[str], model: type[TaskAssignee] | type[TaskVerifier]) -> dict[str, list[int]]:
+    if not task_ids:
+        return {}
+    rows = (await db.execute(select(model.task_id, model.user_id).where(model.task_id.in_(task_ids)))).all()
+    return _group_linked_user_ids(task_ids, rows)
+
+
 def _is_overdue(task: Task, now_local: datetime) -> bool:
     if task.status == DONE_STATUS or task.is_hidden or not task.due_date:
         return False
@@ -176,9 +188,9 @@ def list_users(db: Session) -> list[TaskUserDto]:
     return [TaskUserDto(id=user.id, username=user.username) for user in users]
 
 
-def list_calendar_days(db: Session, current_user_id: int, from_date: date, to_date: date, tab: str) -> list[CalendarDayDto]:
+def _calendar_days_query(current_user_id: int, from_date: date, to_date: date, tab: str) -> Select:
     today = _now_local().date()
-    query = (
+    return (
         select(Task.due_date, func.count(Task.id))
         .where(
             Task.due_date.is_not(None),
@@ -192,12 +204,19 @@ def list_calendar_days(db: Session, current_user_id: int, from_date: date, to_da
         .group_by(Task.due_date)
         .order_by(Task.due_date)
     )
-    rows = db.execute(query).all()
+
+
+def list_calendar_days(db: Session, current_user_id: int, from_date: date, to_date: date, tab: str) -> list[CalendarDayDto]:
+    rows = db.execute(_calendar_days_query(current_user_id, from_date, to_date, tab)).all()
     return [CalendarDayDto(date=row[0], count=row[1]) for row in rows]
 
 
-def list_tasks_for_date(db: Session, current_user_id: int, selected_date: date, tab: str) -> list[TaskDto]:
-    now_local = _now_local()
+async def list_calendar_days_async(db: AsyncSession, current_user_id: int, from_date: date, to_date: date, tab: str) -> list[CalendarDayDto]:
+    rows = (await db.execute(_calendar_days_query(current_user_id, from_date, to_date, tab))).all()
+    return [CalendarDayDto(date=row[0], count=row[1]) for row in rows]
+
+
+def _tasks_for_date_queries(current_user_id: int, selected_date: date, tab: str, now_local: datetime) -> tuple[Select, Select, Select]:
     today = now_local.date()
     now_time = now_local.time().replace(tzinfo=None)
     tab_filter = _build_tab_filter(current_user_id, tab)
@@ -227,42 +246,108 @@ def list_tasks_for_date(db: Session, current_user_id: int, selected_date: date,
         Task.is_hidden.is_(False),
         tab_filter,
     )
+    return active_query, overdue_query, done_query
 
-    active_tasks = list(db.scalars(active_query))
-    overdue_tasks = list(db.scalars(overdue_query))
-    done_tasks = list(db.scalars(done_query))
-    all_tasks = active_tasks + overdue_tasks + done_tasks
-    assignee_map = _get_linked_user_ids_map(db, [task.id for task in all_tasks], TaskAssignee)
-    verifier_map = _get_linked_user_ids_map(db, [task.id for task in all_tasks], TaskVerifier)
 
+def _active_sort_key(item: TaskDto) -> tuple:
+    return (-_priority_weight(item.priority), item.due_time or time.max, item.created_at)
+
+
+def _overdue_sort_key(item: TaskDto, today: date) -> tuple:
+    return (-((today - item.due_date).days if item.due_date else -1), -_priority_weight(item.priority), item.created_at)
+
+
+def _done_sort_key(item: TaskDto) -> datetime:
+    return item.verified_at or datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _sort_tasks_for_date(
+    active_tasks: list[Task],
+    overdue_tasks: list[Task],
+    done_tasks: list[Task],
+    assignee_map: dict[str, list[int]],
+    verifier_map: dict[str, list[int]],
+    now_local: datetime,
+) -> list[TaskDto]:
+    today = now_local.date()
     active_sorted = sorted(
         [_to_dto(task, assignee_map.get(task.id, []), verifier_map.get(task.id, []), now_local) for task in active_tasks],
-        key=lambda item: (-_priority_weight(item.priority), item.due_time or time.max, item.created_at),
+        key=_active_sort_key,
     )
     overdue_sorted = sorted(
         [_to_dto(task, assignee_map.get(task.id, []), verifier_map.get(task.id, []), now_local) for task in overdue_tasks],
-        key=lambda item: (-((today - item.due_date).days if item.due_date else -1), -_priority_weight(item.priority), item.created_at),
+        key=lambda item: _overdue_sort_key(item, today),
     )
     done_sorted = sorted(
         [_to_dto(task, assignee_map.get(task.id, []), verifier_map.get(task.id, []), now_local) for task in done_tasks],
-        key=lambda item: item.verified_at or datetime.min.replace(tzinfo=timezone.utc),
+        key=_done_sort_key,
         reverse=True,
     )
     return [*active_sorted, *overdue_sorted, *done_sorted]
 
 
-def get_task_badges(db: Session, current_user_id: int) -> TaskBadgeDto:
+def list_tasks_for_date(db: Session, current_user_id: int, selected_date: date, tab: str) -> list[TaskDto]:
+    now_local = _now_local()
+    active_query, overdue_query, done_query = _tasks_for_date_queries(current_user_id, selected_date, tab, now_local)
+
+    active_tasks = list(db.scalars(active_query))
+    overdue_tasks = list(db.scalars(overdue_query))
+    done_tasks = list(db.scalars(done_query))
+    task_ids = [task.id for task in [*active_tasks, *overdue_tasks, *done_tasks]]
+    assignee_map = _get_linked_user_ids_map(db, task_ids, TaskAssignee)
+    verifier_map = _get_linked_user_ids_map(db, task_ids, TaskVerifier)
+    return _sort_tasks_for_date(active_tasks, overdue_tasks, done_tasks, assignee_map, verifier_map, now_local)
+
+
+async def list_tasks_for_date_async(db: AsyncSession, current_user_id: int, selected_date: date, tab: str) -> list[TaskDto]:
+    now_local = _now_local()
+    active_query, overdue_query, done_query = _tasks_for_date_queries(current_user_id, selected_date, tab, now_local)
+
+    active_tasks = list((await db.scalars(active_query)).all())
+    overdue_tasks = list((await db.scalars(overdue_query)).all())
+    done_tasks = list((await db.scalars(done_query)).all())
+    task_ids = [task.id for task in [*active_tasks, *overdue_tasks, *done_tasks]]
+    assignee_map = await _get_linked_user_ids_map_async(db, task_ids, TaskAssignee)
+    verifier_map = await _get_linked_user_ids_map_async(db, task_ids, TaskVerifier)
+    return _sort_tasks_for_date(active_tasks, overdue_tasks, done_tasks, assignee_map, verifier_map, now_local)
+
+
+def _task_badges_queries(current_user_id: int) -> tuple[Select, Select]:
     base_filter = exists(select(TaskVerifier.task_id).where(TaskVerifier.task_id == Task.id, TaskVerifier.user_id == current_user_id))
-    verify_total = db.scalar(select(func.count(Task.id)).where(Task.status.in_([ACTIVE_STATUS, PENDING_VERIFY_STATUS]), Task.is_hidden.is_(False), base_filter)) or 0
-    verify_need_action = (
-        db.scalar(
-            select(func.count(Task.id)).where(Task.status == PENDING_VERIFY_STATUS, Task.is_hidden.is_(False), base_filter)
-        )
-        or 0
-    ) > 0
+    total_query = select(func.count(Task.id)).where(Task.status.in_([ACTIVE_STATUS, PENDING_VERIFY_STATUS]), Task.is_hidden.is_(False), base_filter)
+    need_action_query = select(func.count(Task.id)).where(Task.status == PENDING_VERIFY_STATUS, Task.is_hidden.is_(False), base_filter)
+    return total_query, need_action_query
+
+
+def get_task_badges(db: Session, current_user_id: int) -> TaskBadgeDto:
+    total_query, need_action_query = _task_badges_queries(current_user_id)
+    verify_total = db.scalar(total_query) or 0
+    verify_need_action = (db.scalar(need_action_query) or 0) > 0
     return TaskBadgeDto(verify_total=verify_total, verify_need_action=verify_need_action)
 
 
+async def get_task_badges_async(db: AsyncSession, current_user_id: int) -> TaskBadgeDto:
+    total_query, need_action_query = _task_badges_queries(current_user_id)
+    verify_total = (await db.scalar(total_query)) or 0
+    verify_need_action = ((await db.scalar(need_action_query)) or 0) > 0
+    return TaskBadgeDto(verify_total=verify_total, verify_need_action=verify_need_action)
+
+
+async def warm_up_statements(db: AsyncSession) -> None:
+    """Прогрев: запросы календаря, списка на дату и бейджей для всех вкладок попадают в кэш компиляции engine.
+    Пользователя и задачи с id 0 нет, поэтому запросы ничего не читают.
+    """
+
+    today = _now_local().date()
+    for tab in ("assigned", "verify", "created"):
+        await list_calendar_days_async(db, 0, today, today, tab)
+        await list_tasks_for_date_async(db, 0, today, tab)
+    await get_task_badges_async(db, 0)
+    # Карты исполнителей и проверяющих для пустого списка задач не запрашиваются, поэтому вызываются отдельно.
+    await _get_linked_user_ids_map_async(db, ["0"], TaskAssignee)
+    await _get_linked_user_ids_map_async(db, ["0"], TaskVerifier)
+
+
 def create_task(db: Session, current_user_id: int, payload: TaskCreatePayload) -> TaskDto:
     task = Task(
         id=str(uuid4()),
@@ -1,3 +1 @@
-from .api import router
-
-__all__ = ["router"]
+"""Пакет модуля настроек боковой панели; router загружается реестром по манифесту."""
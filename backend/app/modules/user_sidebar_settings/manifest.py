@@ -0,0 +1,12 @@
+"""Манифест модуля настроек боковой панели.
+Файл существует для описания модуля через общий контракт.
+Минимальность: только декларация без импорта router'а и сервисов.
+"""
+
+from app.modules.base import Module
+
+module = Module(
+    name="user_sidebar_settings",
+    router="app.modules.user_sidebar_settings.api:router",
+    required_tables=("user_sidebar_settings",),
+)
@@ -0,0 +1,134 @@
+"""Запуск backend в production-режиме.
+Файл нужен, чтобы процессы, предзагрузка, перезапуск воркеров и мягкая остановка настраивались из Settings, а не флагами uvicorn.
+Минимальность: gunicorn как супервизор процессов и uvicorn-воркер с проверкой памяти, без собственного менеджера процессов.
+
+Запуск из каталога backend:
+    python -m app.serve [--print-config]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+from typing import Any
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from app.core.config import settings, validate_required_envs
+
+logger = logging.getLogger("serve")
+
+# Запас между мягкой остановкой uvicorn и SIGKILL от gunicorn: на него приходится lifespan shutdown (закрытие пулов).
+SHUTDOWN_MARGIN_SECONDS = 5
+
+
+def _rss_mb() -> float | None:
+    """Текущий RSS процесса; None, если /proc недоступен (не Linux)."""
+
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            resident_pages = int(handle.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class ServerWorker(UvicornWorker):
+    """Uvicorn-воркер под gunicorn.
+    Перезапуск по числу запросов делают gunicorn и uvicorn (max_requests с jitter),
+    по памяти — сам воркер: превысив потолок, он мягко завершается, и gunicorn поднимает замену.
+    """
+
+    CONFIG_KWARGS = {"loop": "auto", "http": "auto", "lifespan": "on"}
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Uvicorn дожидается открытых запросов не дольше этого срока, затем закрывает соединения.
+        self.config.timeout_graceful_shutdown = settings.server_graceful_timeout_seconds
+        self._recycling = False
+
+    async def callback_notify(self) -> None:
+        self.notify()
+        limit = settings.server_max_worker_memory_mb
+        if limit <= 0 or self._recycling:
+            return
+        rss = _rss_mb()
+        if rss is not None and rss > limit:
+            self._recycling = True
+            logger.warning("SERVE | воркер %s: RSS %.0f МБ выше %s МБ, перезапуск", self.pid, rss, limit)
+            # SIGTERM себе запускает штатную мягкую остановку uvicorn: новые соединения не принимаются,
+            # начатые запросы завершаются.
+            os.kill(os.getpid(), signal.SIGTERM)
+
+
+def _post_fork(server, worker) -> None:
+    # С предзагрузкой engine создаётся в мастере; потомок начинает с пустыми пулами соединений.
+    from app.core.db import reset_pools_after_fork
+
+    reset_pools_after_fork()
+
+
+def build_options() -> dict[str, Any]:
+    """Настройки gunicorn из Settings."""
+
+    return {
+        "bind": f"{settings.server_host}:{settings.server_port}",
+        "workers": max(settings.server_workers, 1),
+        "worker_class": "app.serve.ServerWorker",
+        "preload_app": settings.server_preload,
+        "max_requests": max(settings.server_max_requests, 0),
+        "max_requests_jitter": max(settings.server_max_requests_jitter, 0),
+        "graceful_timeout": settings.server_graceful_timeout_seconds + SHUTDOWN_MARGIN_SECONDS,
+        "timeout": settings.server_timeout_seconds,
+        "keepalive": settings.server_keepalive_seconds,
+        "post_fork": _post_fork,
+    }
+
+
+class ServerApplication(BaseApplication):
+    """Gunicorn-приложение без конфигурационного файла и аргументов командной строки."""
+
+    def __init__(self, options: dict[str, Any]) -> None:
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+
+        return app
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Запуск backend: gunicorn + uvicorn-воркеры по настройкам Settings")
+    parser.add_argument("--print-config", action="store_true", help="вывести итоговые настройки и выйти")
+    args = parser.parse_args(argv)
+
+    options = build_options()
+    if args.print_config:
+        printable = {key: value for key, value in options.items() if not callable(value)}
+        printable.update(
+            threadpool_size=settings.threadpool_size,
+            max_worker_memory_mb=settings.server_max_worker_memory_mb,
+            db_pool_size=settings.db_pool_size,
+            db_max_overflow=settings.db_max_overflow,
+        )
+        print(json.dumps(printable, ensure_ascii=False, indent=2))
+        return 0
+
+    # Проверка до fork: без обязательных env все воркеры упали бы на старте по очереди.
+    validate_required_envs()
+    ServerApplication(options).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""Служебные CLI-инструменты backend (бенчмарки, проверки, генераторы данных).
+Запускаются через python -m app.tools.<имя> и не подключаются к HTTP-приложению.
+"""
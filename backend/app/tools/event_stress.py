@@ -0,0 +1,183 @@
+"""Конкурентная проверка агрегата calendar_day_summary.
+Файл нужен, чтобы доказать, что счётчики дней остаются точными, когда несколько publisher'ов пишут в одни и те же дни.
+Минимальность: потоки с отдельными сессиями публикуют события в общий набор дней, затем счётчики сверяются с числом событий.
+
+Запуск из каталога backend против отдельной БД (лучше PostgreSQL: SQLite сериализует запись целиком):
+    python -m app.tools.event_stress [--publishers 8] [--transactions 50] [--events 5] [--days 3] [--mode mixed]
+Инструмент пишет события в дни далеко в будущем (--first-day) и удаляет их после проверки, если не указан --keep.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.db import get_engine
+from app.events.bootstrap import build_event_registry
+from app.events.domain import DomainEvent
+from app.events.models import CalendarDaySummary, DomainEventRecord
+from app.events.publisher import EventPublisher
+
+STRESS_ENTITY = "event_stress"
+STRESS_EVENT_TYPE = "task.created"
+# Взаимоблокировка (PostgreSQL) или занятая БД (SQLite) откатывают транзакцию целиком; она повторяется.
+MAX_RETRIES = 20
+
+
+@dataclass
+class PublisherStats:
+    published: Counter = field(default_factory=Counter)
+    retries: int = 0
+    seconds: float = 0.0
+
+
+def _stress_days(first_day: date, count: int) -> list[date]:
+    return [first_day + timedelta(days=offset) for offset in range(count)]
+
+
+def _publish_transaction(
+    db: Session,
+    publisher: EventPublisher,
+    rng: random.Random,
+    days: list[date],
+    events: int,
+    mode: str,
+) -> Counter:
+    """Одна транзакция publisher'а: события в случайные дни, поштучно или пачкой."""
+
+    batch = [
+        DomainEvent.create(
+            type=STRESS_EVENT_TYPE,
+            entity=STRESS_ENTITY,
+            entity_id=str(rng.randrange(1_000_000)),
+            payload={"date": rng.choice(days).isoformat()},
+        )
+        for _ in range(events)
+    ]
+    use_many = mode == "many" or (mode == "mixed" and rng.random() < 0.5)
+    if use_many:
+        publisher.publish_many(db, batch)
+    else:
+        for event in batch:
+            publisher.publish(db, event)
+    db.commit()
+    return Counter(date.fromisoformat(event.payload["date"]) for event in batch)
+
+
+def _run_publisher(
+    index: int,
+    session_factory: sessionmaker[Session],
+    start: threading.Barrier,
+    days: list[date],
+    args: argparse.Namespace,
+) -> PublisherStats:
+    stats = PublisherStats()
+    rng = random.Random(args.seed * 1000 + index)
+    # Синхронный режим: обработчик агрегата выполняется в транзакции publish, как при EVENT_OUTBOX_ENABLED=false.
+    publisher = EventPublisher(build_event_registry(), outbox=False)
+    start.wait()
+    started = time.perf_counter()
+    for _ in range(args.transactions):
+        state = rng.getstate()
+        for attempt in range(MAX_RETRIES + 1):
+            with session_factory() as db:
+                try:
+                    stats.published += _publish_transaction(db, publisher, rng, days, args.events, args.mode)
+                    break
+                except OperationalError:
+                    db.rollback()
+                    if attempt == MAX_RETRIES:
+                        raise
+                    stats.retries += 1
+                    # Повтор публикует те же дни, чтобы ожидаемые счётчики не зависели от числа повторов.
+                    rng.setstate(state)
+                    time.sleep(0.01 * (attempt + 1))
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def _summary_counts(session_factory: sessionmaker[Session], days: list[date]) -> dict[date, int]:
+    with session_factory() as db:
+        rows = db.execute(
+            select(CalendarDaySummary.day, CalendarDaySummary.events_count).where(CalendarDaySummary.day.in_(days))
+        )
+        return {day: count for day, count in rows}
+
+
+def _cleanup(session_factory: sessionmaker[Session], days: list[date]) -> None:
+    with session_factory() as db:
+        db.execute(delete(DomainEventRecord).where(DomainEventRecord.entity == STRESS_ENTITY))
+        db.execute(delete(CalendarDaySummary).where(CalendarDaySummary.day.in_(days)))
+        db.commit()
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Конкурентная проверка счётчиков calendar_day_summary")
+    parser.add_argument("--publishers", type=int, default=8, help="параллельные publisher'ы (потоки с отдельными сессиями)")
+    parser.add_argument("--transactions", type=int, default=50, help="транзакций на publisher")
+    parser.add_argument("--events", type=int, default=5, help="событий в транзакции")
+    parser.add_argument("--days", type=int, default=3, help="число общих дней: чем меньше, тем больше конфликтов")
+    parser.add_argument("--mode", choices=("single", "many", "mixed"), default="mixed", help="publish, publish_many или оба")
+    parser.add_argument("--first-day", type=date.fromisoformat, default=date(2199, 1, 1), help="первый день диапазона проверки")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="не удалять события и агрегаты после проверки")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    days = _stress_days(args.first_day, max(args.days, 1))
+    session_factory = sessionmaker(bind=get_engine(), autoflush=False)
+
+    with session_factory() as db:
+        leftovers = db.scalar(select(func.count()).select_from(CalendarDaySummary).where(CalendarDaySummary.day.in_(days)))
+    if leftovers:
+        print(f"В днях {days[0]}..{days[-1]} уже есть агрегаты ({leftovers}); укажите другой --first-day", file=sys.stderr)
+        return 2
+
+    start = threading.Barrier(args.publishers)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.publishers) as pool:
+        futures = [
+            pool.submit(_run_publisher, index, session_factory, start, days, args) for index in range(args.publishers)
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    expected: Counter = Counter()
+    for stats in results:
+        expected += stats.published
+    actual = _summary_counts(session_factory, days)
+    mismatches = {day: (expected.get(day, 0), actual.get(day, 0)) for day in days if expected.get(day, 0) != actual.get(day, 0)}
+
+    total = sum(expected.values())
+    print(
+        f"publishers={args.publishers} mode={args.mode} events={total} "
+        f"retries={sum(stats.retries for stats in results)} {total / elapsed:.0f} событий/с за {elapsed:.2f} с"
+    )
+    print(f"{'day':<12} {'expected':>9} {'actual':>9}")
+    for day in days:
+        print(f"{day.isoformat():<12} {expected.get(day, 0):>9} {actual.get(day, 0):>9}")
+
+    if not args.keep:
+        _cleanup(session_factory, days)
+    if mismatches:
+        print(f"Счётчики расходятся в {len(mismatches)} днях", file=sys.stderr)
+        return 1
+    print("Счётчики точны")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
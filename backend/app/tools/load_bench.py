@@ -0,0 +1,364 @@
+"""Нагрузочный прогон endpoint'ов с перцентилями задержек и сравнением прогонов.
+Файл нужен, чтобы эффект изменения производительности измерялся одинаковым сценарием до и после, а не на глаз.
+Минимальность: виртуальные пользователи в одном event loop, взвешенная смесь запросов, JSON-отчёт и diff двух отчётов.
+
+Запуск против работающего backend с данными генератора (python -m app.tools.seed):
+    python -m app.tools.load_bench run --base-url http://localhost:8000 --users 50 --duration 60 --json after.json
+    python -m app.tools.load_bench diff before.json after.json [--threshold 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+
+# Смесь запросов: веса отражают, как часто фронтенд обращается к endpoint'у за сессию.
+TRAFFIC_MIX: dict[str, int] = {
+    "tasks_day": 30,
+    "tasks_badges": 20,
+    "tasks_calendar": 15,
+    "modules": 10,
+    "counterparty_folders": 5,
+    "counterparties": 5,
+    "task_complete": 5,
+    "task_verify": 3,
+}
+DAY_TABS = ("assigned", "assigned", "created", "verify")
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Перцентиль по методу ближайшего ранга."""
+
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+    def record(self, elapsed_ms: float, status: int | str, ok: bool) -> None:
+        self.latencies_ms.append(elapsed_ms)
+        self.statuses[str(status)] += 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, duration_s: float) -> dict[str, Any]:
+        values = sorted(self.latencies_ms)
+        count = len(values)
+        return {
+            "requests": count,
+            "throughput_rps": round(count / duration_s, 2) if duration_s > 0 else 0.0,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "p50_ms": round(percentile(values, 0.50), 2),
+            "p95_ms": round(percentile(values, 0.95), 2),
+            "p99_ms": round(percentile(values, 0.99), 2),
+            "max_ms": round(values[-1], 2) if values else 0.0,
+            "mean_ms": round(sum(values) / count, 2) if count else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+class Recorder:
+    """Собирает замеры; запросы до конца прогрева не учитываются."""
+
+    def __init__(self, measure_from: float) -> None:
+        self.measure_from = measure_from
+        self.endpoints: dict[str, EndpointStats] = {}
+
+    def record(self, name: str, started: float, status: int | str, ok: bool) -> None:
+        if started < self.measure_from:
+            return
+        self.endpoints.setdefault(name, EndpointStats()).record((time.perf_counter() - started) * 1000, status, ok)
+
+
+class VirtualUser:
+    """Пользователь фронтенда: свой токен, кэш ETag и задачи, которые можно закрыть или проверить."""
+
+    def __init__(self, client: httpx.AsyncClient, username: str, rng: random.Random, anchor: date, conditional: bool) -> None:
+        self.client = client
+        self.username = username
+        self.rng = rng
+        self.anchor = anchor
+        self.conditional = conditional
+        self.headers: dict[str, str] = {}
+        self.etags: dict[str, str] = {}
+        self.active_task_ids: list[str] = []
+        self.pending_task_ids: list[str] = []
+
+    async def request(self, recorder: Recorder, name: str, method: str, path: str, **kwargs: Any) -> httpx.Response | None:
+        headers = dict(self.headers)
+        cache_key = f"{path}?{sorted((kwargs.get('params') or {}).items())}"
+        if self.conditional and method == "GET" and cache_key in self.etags:
+            headers["If-None-Match"] = self.etags[cache_key]
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=headers, **kwargs)
+        except httpx.HTTPError as exc:
+            recorder.record(name, started, type(exc).__name__, ok=False)
+            return None
+        recorder.record(name, started, response.status_code, ok=response.status_code < 400)
+        if self.conditional and "etag" in response.headers:
+            self.etags[cache_key] = response.headers["etag"]
+        return response
+
+    async def login(self, recorder: Recorder, password: str) -> bool:
+        response = await self.request(recorder, "auth_login", "POST", "/auth/login", json={"username": self.username, "password": password})
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def tasks_day(self, recorder: Recorder) -> None:
+        tab = self.rng.choice(DAY_TABS)
+        day = self.anchor + timedelta(days=self.rng.randint(-3, 3))
+        response = await self.request(recorder, "tasks_day", "GET", "/tasks", params={"date": day.isoformat(), "tab": tab})
+        if response is None or response.status_code != 200:
+            return
+        tasks = response.json()
+        if tab == "assigned":
+            self.active_task_ids = [task["id"] for task in tasks if task["status"] == "active" and not task["is_recurring"]]
+        elif tab == "verify":
+            self.pending_task_ids = [task["id"] for task in tasks if task["status"] == "done_pending_verify"]
+
+    async def tasks_badges(self, recorder: Recorder) -> None:
+        await self.request(recorder, "tasks_badges", "GET", "/tasks/badges")
+
+    async def tasks_calendar(self, recorder: Recorder) -> None:
+        first = self.anchor.replace(day=1)
+        last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        params = {"from": first.isoformat(), "to": last.isoformat(), "tab": self.rng.choice(DAY_TABS)}
+        await self.request(recorder, "tasks_calendar", "GET", "/tasks/calendar", params=params)
+
+    async def modules(self, recorder: Recorder) -> None:
+        await self.request(recorder, "modules", "GET", "/modules")
+
+    async def counterparty_folders(self, recorder: Recorder) -> None:
+        await self.request(recorder, "counterparty_folders", "GET", "/counterparties/folders")
+
+    async def counterparties(self, recorder: Recorder) -> None:
+        await self.request(recorder, "counterparties", "GET", "/counterparties")
+
+    async def task_complete(self, recorder: Recorder) -> None:
+        if not self.active_task_ids:
+            await self.tasks_day(recorder)
+            return
+        task_id = self.active_task_ids.pop(self.rng.randrange(len(self.active_task_ids)))
+        await self.request(recorder, "task_complete", "POST", f"/tasks/{task_id}/complete")
+
+    async def task_verify(self, recorder: Recorder) -> None:
+        if not self.pending_task_ids:
+            await self.tasks_day(recorder)
+            return
+        task_id = self.pending_task_ids.pop(self.rng.randrange(len(self.pending_task_ids)))
+        await self.request(recorder, "task_verify", "POST", f"/tasks/{task_id}/verify")
+
+
+async def _user_loop(user: VirtualUser, recorder: Recorder, deadline: float, think_s: float) -> None:
+    actions = list(TRAFFIC_MIX)
+    weights = [TRAFFIC_MIX[name] for name in actions]
+    while time.perf_counter() < deadline:
+        action = user.rng.choices(actions, weights)[0]
+        await getattr(user, action)(recorder)
+        if think_s > 0:
+            await asyncio.sleep(user.rng.uniform(0, 2 * think_s))
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    rng = random.Random(args.seed)
+    usernames = [args.username_format.format(args.first_user_id + index) for index in range(args.users)]
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        users = [
+            VirtualUser(client, username, random.Random(rng.getrandbits(64)), args.anchor, args.conditional)
+            for username in usernames
+        ]
+
+        # Логины идут отдельной фазой с ограниченной параллельностью: bcrypt не должен искажать основную смесь.
+        login_recorder = Recorder(measure_from=0.0)
+        login_started = time.perf_counter()
+        semaphore = asyncio.Semaphore(args.login_concurrency)
+
+        async def login(user: VirtualUser) -> bool:
+            async with semaphore:
+                return await user.login(login_recorder, args.password)
+
+        logged_in = await asyncio.gather(*(login(user) for user in users))
+        login_duration = time.perf_counter() - login_started
+        users = [user for user, ok in zip(users, logged_in) if ok]
+        if not users:
+            raise SystemExit("Ни один пользователь не вошёл: проверьте --username-format, --first-user-id и --password")
+
+        started = time.perf_counter()
+        recorder = Recorder(measure_from=started + args.warmup)
+        deadline = started + args.warmup + args.duration
+        await asyncio.gather(*(_user_loop(user, recorder, deadline, args.think_ms / 1000) for user in users))
+        measured = max(time.perf_counter() - recorder.measure_from, 1e-9)
+
+    endpoints = {name: stats.summary(measured) for name, stats in sorted(recorder.endpoints.items())}
+    total = EndpointStats()
+    for stats in recorder.endpoints.values():
+        total.latencies_ms.extend(stats.latencies_ms)
+        total.statuses.update(stats.statuses)
+        total.errors += stats.errors
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "base_url": args.base_url,
+            "label": args.label,
+            "users": len(users),
+            "users_failed_login": args.users - len(users),
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "think_ms": args.think_ms,
+            "conditional": args.conditional,
+            "seed": args.seed,
+            "anchor": args.anchor.isoformat(),
+            "mix": TRAFFIC_MIX,
+        },
+        "login": login_recorder.endpoints.get("auth_login", EndpointStats()).summary(login_duration),
+        "endpoints": endpoints,
+        "total": total.summary(measured),
+    }
+
+
+def _print_run(report: dict[str, Any]) -> None:
+    print(f"{'endpoint':<22} {'req':>8} {'rps':>9} {'err%':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    rows = [("auth_login", report["login"]), *report["endpoints"].items(), ("total", report["total"])]
+    for name, item in rows:
+        print(
+            f"{name:<22} {item['requests']:>8} {item['throughput_rps']:>9.1f} {item['error_rate'] * 100:>7.2f} "
+            f"{item['p50_ms']:>9.1f} {item['p95_ms']:>9.1f} {item['p99_ms']:>9.1f} {item['max_ms']:>9.1f}"
+        )
+
+
+def _change(before: float, after: float) -> float | None:
+    if before == 0:
+        return None
+    return (after - before) / before * 100
+
+
+def diff_reports(before: dict[str, Any], after: dict[str, Any], threshold: float) -> tuple[list[dict[str, Any]], list[str]]:
+    """Сравнивает два отчёта по endpoint'ам.
+    Регрессия — рост p95 или p99 больше threshold процентов, падение throughput больше threshold или рост доли ошибок.
+    """
+
+    rows: list[dict[str, Any]] = []
+    regressions: list[str] = []
+    names = sorted(set(before["endpoints"]) | set(after["endpoints"])) + ["total"]
+    for name in names:
+        old = before["total"] if name == "total" else before["endpoints"].get(name)
+        new = after["total"] if name == "total" else after["endpoints"].get(name)
+        if old is None or new is None:
+            rows.append({"endpoint": name, "missing_in": "before" if old is None else "after"})
+            continue
+        row: dict[str, Any] = {"endpoint": name}
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            row[metric] = {"before": old[metric], "after": new[metric], "change_pct": _change(old[metric], new[metric])}
+        row["error_rate"] = {"before": old["error_rate"], "after": new["error_rate"]}
+        rows.append(row)
+
+        for metric in ("p95_ms", "p99_ms"):
+            change = row[metric]["change_pct"]
+            if change is not None and change > threshold:
+                regressions.append(f"{name}: {metric} {old[metric]} → {new[metric]} (+{change:.1f}%)")
+        change = row["throughput_rps"]["change_pct"]
+        if change is not None and change < -threshold:
+            regressions.append(f"{name}: throughput {old['throughput_rps']} → {new['throughput_rps']} ({change:.1f}%)")
+        if new["error_rate"] > old["error_rate"]:
+            regressions.append(f"{name}: error_rate {old['error_rate']} → {new['error_rate']}")
+    return rows, regressions
+
+
+def _format_change(value: float | None) -> str:
+    return "—" if value is None else f"{value:+.1f}%"
+
+
+def _print_diff(rows: list[dict[str, Any]], regressions: list[str]) -> None:
+    print(f"{'endpoint':<22} {'rps':>16} {'p50_ms':>16} {'p95_ms':>16} {'p99_ms':>16} {'err%':>14}")
+    for row in rows:
+        if "missing_in" in row:
+            print(f"{row['endpoint']:<22} нет в отчёте {row['missing_in']}")
+            continue
+        cells = [
+            f"{row[metric]['after']:>8} {_format_change(row[metric]['change_pct']):>7}"
+            for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        ]
+        errors = f"{row['error_rate']['before'] * 100:.2f}→{row['error_rate']['after'] * 100:.2f}"
+        print(f"{row['endpoint']:<22} {' '.join(cells)} {errors:>14}")
+    if regressions:
+        print("\nРегрессии:")
+        for item in regressions:
+            print(f"  {item}")
+    else:
+        print("\nРегрессий нет")
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон endpoint'ов и сравнение прогонов")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="прогон смеси запросов против работающего backend")
+    run.add_argument("--base-url", default="http://localhost:8000")
+    run.add_argument("--users", type=int, default=50, help="число виртуальных пользователей (одновременных сессий)")
+    run.add_argument("--duration", type=float, default=60.0, help="длительность замера, секунды")
+    run.add_argument("--warmup", type=float, default=5.0, help="прогрев до начала замера, секунды")
+    run.add_argument("--think-ms", type=float, default=0.0, help="средняя пауза пользователя между запросами")
+    run.add_argument("--username-format", default="seed_{:07d}", help="формат логина по id (как у app.tools.seed)")
+    run.add_argument("--first-user-id", type=int, default=2, help="id первого пользователя")
+    run.add_argument("--password", default="seed-password")
+    run.add_argument("--login-concurrency", type=int, default=8, help="одновременных логинов в фазе входа")
+    run.add_argument("--anchor", type=date.fromisoformat, default=date.today(), help="«сегодня» для дневных и календарных запросов")
+    run.add_argument("--no-conditional", dest="conditional", action="store_false", help="не отправлять If-None-Match")
+    run.add_argument("--timeout", type=float, default=30.0, help="таймаут одного запроса, секунды")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--label", default="", help="метка прогона в отчёте")
+    run.add_argument("--json", dest="json_path", help="записать отчёт в JSON-файл")
+
+    diff = commands.add_parser("diff", help="сравнить два JSON-отчёта")
+    diff.add_argument("before")
+    diff.add_argument("after")
+    diff.add_argument("--threshold", type=float, default=10.0, help="допустимое ухудшение, процентов")
+    diff.add_argument("--json", dest="json_path", help="записать сравнение в JSON-файл")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    if args.command == "run":
+        report = asyncio.run(run_benchmark(args))
+        _print_run(report)
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as handle:
+                json.dump(report, handle, ensure_ascii=False, indent=2)
+        return 0
+
+    with open(args.before, encoding="utf-8") as handle:
+        before = json.load(handle)
+    with open(args.after, encoding="utf-8") as handle:
+        after = json.load(handle)
+    rows, regressions = diff_reports(before, after, args.threshold)
+    _print_diff(rows, regressions)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump({"threshold_pct": args.threshold, "endpoints": rows, "regressions": regressions}, handle, ensure_ascii=False, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,360 @@
+"""Микробенчмарки чистых функций горячих путей.
+Файл нужен, чтобы оптимизации CPU-части (даты повторений, DTO задач, токены, разбор Excel) оценивались числами, а не на глаз.
+Минимальность: timeit на синтетических входах реалистичного размера, без БД; базовые значения в JSON рядом с инструментом.
+
+Запуск из каталога backend:
+    python -m app.tools.micro_bench [--filter tasks.] [--tolerance 30] [--json results.json]
+    python -m app.tools.micro_bench --update    # перезаписать базовые значения
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import timeit
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+from uuid import UUID
+
+# Подпись токена требует ключ; на время выполнения HMAC его значение не влияет.
+os.environ.setdefault("AUTH_SECRET_KEY", "micro-bench")
+
+from app.modules.auth.claims import _encode_bits
+from app.modules.auth.security import create_access_token, decode_access_token
+from app.modules.counterparties.models import Counterparty
+from app.modules.counterparties.service import _render_template, _weekday_dates
+from app.modules.tasks.excel_admin import _parse_date_value, _parse_user_ids, _validate_row
+from app.modules.tasks.models import Task
+from app.modules.tasks.service import (
+    _active_sort_key,
+    _advance_date,
+    _done_sort_key,
+    _is_overdue,
+    _overdue_sort_key,
+    _to_dto,
+)
+
+BASELINES_PATH = Path(__file__).with_name("micro_bench_baselines.json")
+
+# Размеры входов: столько элементов функция обрабатывает за один запрос или одну операцию.
+DAY_LIST_TASKS = 200
+RECURRENCE_STEPS = 1000
+COUNTERPARTIES = 500
+IMPORT_ROWS = 500
+NOW_LOCAL = datetime(2026, 3, 18, 14, 30, tzinfo=timezone(timedelta(hours=3)))
+
+
+@dataclass(frozen=True)
+class Case:
+    """Замер: func обрабатывает items элементов за вызов."""
+
+    name: str
+    items: int
+    func: Callable[[], Any]
+
+
+class _StubSession:
+    """Сессия без БД для _validate_row: любой пользователь и любая задача существуют."""
+
+    def scalar(self, statement: Any) -> int:
+        return 1
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(UUID(int=rng.getrandbits(128), version=4))
+
+
+def _build_tasks(rng: random.Random, count: int) -> list[Task]:
+    today = NOW_LOCAL.date()
+    tasks = []
+    for _ in range(count):
+        status = rng.choices(("active", "done", "done_pending_verify"), weights=(6, 3, 1))[0]
+        created_at = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=rng.randrange(100_000))
+        recurring = rng.random() < 0.2
+        tasks.append(
+            Task(
+                id=_uuid(rng),
+                title=f"Задача {rng.randrange(100_000)}",
+                description="Описание задачи" if rng.random() < 0.5 else None,
+                due_date=today + timedelta(days=rng.randint(-10, 0)),
+                due_time=time(rng.randrange(8, 20), rng.choice((0, 15, 30, 45))) if rng.random() < 0.6 else None,
+                status=status,
+                priority=rng.choice(("normal", "normal", "urgent", "very_urgent", None)),
+                created_by_user_id=rng.randrange(2, 500),
+                created_at=created_at,
+                completed_at=created_at + timedelta(hours=5) if status != "active" else None,
+                verified_at=created_at + timedelta(hours=8) if status == "done" else None,
+                source_type=None,
+                source_id=None,
+                source_module="counterparties" if rng.random() < 0.3 else None,
+                source_counterparty_id=None,
+                source_trigger_id=None,
+                is_recurring=recurring,
+                recurrence_type="weekly" if recurring else None,
+                recurrence_interval=1 if recurring else None,
+                recurrence_days_of_week=None,
+                recurrence_end_date=None,
+                recurrence_master_task_id=None,
+                recurrence_state="active",
+                is_hidden=rng.random() < 0.02,
+            )
+        )
+    return tasks
+
+
+def _tasks_cases(rng: random.Random) -> list[Case]:
+    steps = [
+        (
+            date(2026, rng.randrange(1, 13), rng.randrange(1, 29)),
+            rng.choice(("daily", "weekly", "monthly", "yearly")),
+            rng.choice((1, 1, 2, 3)),
+        )
+        for _ in range(RECURRENCE_STEPS)
+    ]
+    # Конец месяца — отдельная ветка с monthrange; в реальных повторениях он встречается часто.
+    steps[::10] = [(date(2026, 1, 31), "monthly", 1)] * len(steps[::10])
+
+    tasks = _build_tasks(rng, DAY_LIST_TASKS)
+    links = {task.id: ([task.created_by_user_id, *rng.sample(range(2, 500), rng.randrange(0, 3))], rng.sample(range(2, 500), rng.randrange(0, 2))) for task in tasks}
+    dtos = [_to_dto(task, *links[task.id], NOW_LOCAL) for task in tasks]
+    today = NOW_LOCAL.date()
+
+    def advance_date() -> None:
+        for current, recurrence_type, interval in steps:
+            _advance_date(current, recurrence_type, interval)
+
+    def is_overdue() -> None:
+        for task in tasks:
+            _is_overdue(task, NOW_LOCAL)
+
+    def to_dto() -> None:
+        for task in tasks:
+            _to_dto(task, *links[task.id], NOW_LOCAL)
+
+    return [
+        Case("tasks._advance_date", RECURRENCE_STEPS, advance_date),
+        Case("tasks._is_overdue", DAY_LIST_TASKS, is_overdue),
+        Case("tasks._to_dto", DAY_LIST_TASKS, to_dto),
+        Case("tasks.sort_active", DAY_LIST_TASKS, lambda: sorted(dtos, key=_active_sort_key)),
+        Case("tasks.sort_overdue", DAY_LIST_TASKS, lambda: sorted(dtos, key=lambda item: _overdue_sort_key(item, today))),
+        Case("tasks.sort_done", DAY_LIST_TASKS, lambda: sorted(dtos, key=_done_sort_key, reverse=True)),
+    ]
+
+
+def _auth_cases(rng: random.Random) -> list[Case]:
+    # Claims как у пользователя с несколькими ролями и каталогом на сотню прав.
+    claims = {"name": "seed_0000042", "rid": [1, 3, 7], "perm": _encode_bits(rng.getrandbits(200)), "pv": 12}
+    token = create_access_token("42", claims)
+    return [
+        Case("auth.create_access_token", 1, lambda: create_access_token("42", claims)),
+        Case("auth.decode_access_token", 1, lambda: decode_access_token(token)),
+    ]
+
+
+def _counterparties_cases(rng: random.Random) -> list[Case]:
+    start = NOW_LOCAL.date()
+    counterparties = [Counterparty(id=index, name=f"ООО «Контрагент {rng.randrange(100_000)}»") for index in range(COUNTERPARTIES)]
+    templates = ["Сверка с {counterparty_name}", "Звонок: {counterparty_name} — уточнить оплату", None]
+
+    def weekday_dates() -> None:
+        # Одно правило на каждый день недели с горизонтом по умолчанию и максимальным.
+        for horizon_days in (15, 30):
+            for weekday in range(1, 8):
+                _weekday_dates(start, horizon_days, weekday)
+
+    def render_template() -> None:
+        for index, counterparty in enumerate(counterparties):
+            _render_template(templates[index % len(templates)], counterparty)
+
+    return [
+        Case("counterparties._weekday_dates", 14, weekday_dates),
+        Case("counterparties._render_template", COUNTERPARTIES, render_template),
+    ]
+
+
+def _excel_row(rng: random.Random, index: int) -> dict[str, Any]:
+    due = date(2026, 3, 1) + timedelta(days=rng.randrange(60))
+    done = rng.random() < 0.3
+    return {
+        "id": _uuid(rng) if rng.random() < 0.5 else None,
+        "title": f"Импорт {index}",
+        "description": "Описание",
+        "creator_id": str(rng.randrange(2, 500)),
+        "assignee_ids": ", ".join(str(rng.randrange(2, 500)) for _ in range(rng.randrange(1, 4))),
+        "verifier_ids": str(rng.randrange(2, 500)) if rng.random() < 0.4 else None,
+        "status": "done" if done else "active",
+        "priority": rng.choice(("normal", "high", "low")),
+        # openpyxl отдаёт даты ячеек как datetime, а текстовые — строкой.
+        "due_date": datetime.combine(due, time()) if index % 2 else due.isoformat(),
+        "due_time": "10:30" if rng.random() < 0.5 else None,
+        "completed_at": "2026-03-10 12:00" if done else None,
+        "is_recurring": "FALSE",
+        "recurrence_interval": None,
+        "recurrence_end_date": None,
+        "_row_number": index + 2,
+    }
+
+
+def _excel_cases(rng: random.Random) -> list[Case]:
+    rows = [_excel_row(rng, index) for index in range(IMPORT_ROWS)]
+    date_cells = [row["due_date"] for row in rows] + [row["recurrence_end_date"] for row in rows[:50]]
+    id_cells = [row["assignee_ids"] for row in rows] + [row["verifier_ids"] for row in rows]
+    session = _StubSession()
+
+    def parse_date_value() -> None:
+        for value in date_cells:
+            _parse_date_value(value, "Дата выполнения")
+
+    def parse_user_ids() -> None:
+        for value in id_cells:
+            _parse_user_ids(value, "ID исполнителей")
+
+    def validate_rows() -> None:
+        # Кэш пользователей живёт одно превью импорта, как в build_import_preview.
+        user_cache: dict[int, bool] = {}
+        for row in rows:
+            _validate_row(session, row, user_cache)
+
+    return [
+        Case("excel._parse_date_value", len(date_cells), parse_date_value),
+        Case("excel._parse_user_ids", len(id_cells), parse_user_ids),
+        Case("excel._validate_row", IMPORT_ROWS, validate_rows),
+    ]
+
+
+def build_cases(seed: int) -> list[Case]:
+    rng = random.Random(seed)
+    return [*_tasks_cases(rng), *_auth_cases(rng), *_counterparties_cases(rng), *_excel_cases(rng)]
+
+
+@dataclass
+class CaseResult:
+    name: str
+    items: int
+    loops: int
+    best_us: float
+    median_us: float
+    per_item_ns: float
+
+
+def measure(case: Case, repeat: int) -> CaseResult:
+    """Лучшее и медианное время вызова: число вызовов в серии подбирается на ~0.2 с, серий repeat.
+    С базой сравнивается лучшее время: оно меньше всего зависит от фоновой нагрузки машины.
+    """
+
+    timer = timeit.Timer(case.func)
+    loops, _ = timer.autorange()
+    samples = [total / loops * 1_000_000 for total in timer.repeat(repeat=repeat, number=loops)]
+    median_us = statistics.median(samples)
+    return CaseResult(
+        name=case.name,
+        items=case.items,
+        loops=loops,
+        best_us=round(min(samples), 3),
+        median_us=round(median_us, 3),
+        per_item_ns=round(median_us * 1000 / case.items, 1),
+    )
+
+
+def load_baselines(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_baselines(path: Path, baselines: dict[str, Any], results: list[CaseResult]) -> None:
+    """Записывает замеры поверх базы: значения, не попавшие в прогон (--filter), сохраняются."""
+
+    cases = dict(baselines.get("cases", {}))
+    cases.update({item.name: {"items": item.items, "best_us": item.best_us} for item in results})
+    data = {
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "cases": cases,
+    }
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(data, handle, ensure_ascii=False, indent=2, sort_keys=True)
+        handle.write("\n")
+
+
+def compare(results: list[CaseResult], baselines: dict[str, Any], tolerance_pct: float) -> list[str]:
+    """Замеры медленнее базовых больше чем на tolerance_pct процентов."""
+
+    problems = []
+    cases = baselines.get("cases", {})
+    for item in results:
+        baseline = cases.get(item.name)
+        if baseline is None or "best_us" not in baseline:
+            continue
+        if baseline["items"] != item.items:
+            problems.append(f"{item.name}: размер входа {item.items}, в базе {baseline['items']} — обновите базу")
+            continue
+        if item.best_us > baseline["best_us"] * (1 + tolerance_pct / 100):
+            change = (item.best_us / baseline["best_us"] - 1) * 100
+            problems.append(f"{item.name}: {baseline['best_us']:g} → {item.best_us:g} мкс (+{change:.1f}%)")
+    return problems
+
+
+def _print_report(results: list[CaseResult], baselines: dict[str, Any]) -> None:
+    cases = baselines.get("cases", {})
+    print(f"{'case':<34} {'items':>6} {'best_us':>11} {'median_us':>11} {'ns/item':>9} {'baseline':>11} {'Δ%':>7}")
+    for item in results:
+        baseline = cases.get(item.name)
+        if baseline is None or "best_us" not in baseline or baseline["items"] != item.items:
+            base_cell, delta_cell = "—", "—"
+        else:
+            base_cell = f"{baseline['best_us']:.2f}"
+            delta_cell = f"{(item.best_us / baseline['best_us'] - 1) * 100:+.1f}"
+        print(
+            f"{item.name:<34} {item.items:>6} {item.best_us:>11.2f} {item.median_us:>11.2f} "
+            f"{item.per_item_ns:>9.1f} {base_cell:>11} {delta_cell:>7}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Микробенчмарки чистых функций горячих путей")
+    parser.add_argument("--filter", default="", help="только замеры, в имени которых есть подстрока")
+    parser.add_argument("--repeat", type=int, default=5, help="число серий замера")
+    parser.add_argument("--seed", type=int, default=42, help="seed генерации входов")
+    parser.add_argument("--tolerance", type=float, default=30.0, help="допустимое замедление относительно базы, %%")
+    parser.add_argument("--baselines", type=Path, default=BASELINES_PATH, help="путь к JSON с базовыми значениями")
+    parser.add_argument("--update", action="store_true", help="перезаписать базовые значения текущими")
+    parser.add_argument("--json", dest="json_path", help="записать результаты в JSON-файл")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in build_cases(args.seed) if args.filter in case.name]
+    if not cases:
+        print(f"Нет замеров с '{args.filter}' в имени", file=sys.stderr)
+        return 1
+    results = [measure(case, args.repeat) for case in cases]
+    baselines = load_baselines(args.baselines)
+    _print_report(results, baselines)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump([asdict(item) for item in results], handle, ensure_ascii=False, indent=2)
+
+    if args.update:
+        save_baselines(args.baselines, baselines, results)
+        print(f"\nБазовые значения записаны в {args.baselines}")
+        return 0
+
+    environment = baselines.get("environment")
+    if environment and environment.get("python") != platform.python_version():
+        print(f"\nБаза снята на Python {environment.get('python')}, сравнение ориентировочное", file=sys.stderr)
+    problems = compare(results, baselines, args.tolerance)
+    if problems:
+        print("\n".join(["", "Замедления:", *problems]), file=sys.stderr)
+        return 1
+    print("\nВсе замеры в пределах базы")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
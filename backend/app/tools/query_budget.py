@@ -0,0 +1,573 @@
+"""Регрессионный контроль бюджета SQL-запросов по endpoint'ам.
+Файл нужен, чтобы новый цикл запросов внутри обработчика ломал проверку до релиза, а не production.
+Минимальность: фиксированный сценарий через HTTP API, сравнение с JSON-бюджетом и текстовый отчёт.
+
+Запуск на пустой базе PostgreSQL сразу после `alembic upgrade head` (сценарий сам создаёт данные):
+    python -m app.tools.query_budget            # проверка, код выхода 1 при превышении
+    python -m app.tools.query_budget --update   # перезапись query_budgets.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+from fastapi.routing import APIRoute
+from sqlalchemy import func, select
+from starlette.routing import Match
+
+from app.core.db import get_engine
+from app.core.query_stats import track_queries
+from app.main import app
+from app.modules.auth.models import User as AuthUser
+from app.modules.auth.security import create_access_token
+from app.modules.counterparties.models import Counterparty
+from app.modules.employees.models import Organization
+from app.modules.tasks.models import Task
+
+BUDGETS_PATH = Path(__file__).with_name("query_budgets.json")
+
+# Роутеры, все маршруты которых обязаны быть покрыты сценарием.
+COVERED_MODULES = (
+    "app.modules.tasks.api",
+    "app.modules.counterparties.api",
+    "app.modules.employees.api",
+    "app.modules.admin_access.api",
+    "app.modules.module_registry.api",
+    "app.modules.user_sidebar_settings.api",
+)
+
+# Небольшой запас по времени: wall time шумит сильнее, чем число statement'ов.
+WALL_MS_FLOOR = 50.0
+
+Payload = Any | Callable[[dict[str, Any]], Any]
+
+
+@dataclass(frozen=True)
+class Step:
+    """Один HTTP-вызов сценария.
+    path и params форматируются значениями контекста, capture сохраняет id из ответа для следующих шагов.
+    """
+
+    method: str
+    path: str
+    json: Payload = None
+    params: Payload = None
+    upload: str | None = None
+    capture: Callable[[dict[str, Any], httpx.Response], None] | None = None
+
+
+@dataclass
+class RouteMeasure:
+    """Максимумы по всем вызовам одного маршрута."""
+
+    calls: int = 0
+    statements: int = 0
+    rows: int = 0
+    wall_ms: float = 0.0
+
+    def add(self, statements: int, rows: int, wall_ms: float) -> None:
+        self.calls += 1
+        self.statements = max(self.statements, statements)
+        self.rows = max(self.rows, rows)
+        self.wall_ms = max(self.wall_ms, wall_ms)
+
+
+@dataclass
+class RunResult:
+    measures: dict[str, RouteMeasure] = field(default_factory=dict)
+    errors: list[str] = field(default_factory=list)
+
+
+def _resolve(value: Payload, ctx: dict[str, Any]) -> Any:
+    return value(ctx) if callable(value) else value
+
+
+def _capture_id(key: str) -> Callable[[dict[str, Any], httpx.Response], None]:
+    def capture(ctx: dict[str, Any], response: httpx.Response) -> None:
+        ctx[key] = response.json()["id"]
+
+    return capture
+
+
+def _capture_module_ids(ctx: dict[str, Any], response: httpx.Response) -> None:
+    ctx["module_ids"] = [item["id"] for item in response.json()]
+
+
+def _capture_admin_roles(ctx: dict[str, Any], response: httpx.Response) -> None:
+    ctx["admin_role_ids"] = next(item["role_ids"] for item in response.json() if item["id"] == ctx["admin_id"])
+
+
+def _capture_permission_ids(ctx: dict[str, Any], response: httpx.Response) -> None:
+    ctx["permission_ids"] = [item["id"] for item in response.json()[:3]]
+
+
+def _capture_employee_admin(ctx: dict[str, Any], response: httpx.Response) -> None:
+    ctx["employee_admin_id"] = next(item["id"] for item in response.json() if item["login"] == "admin")
+
+
+def _capture_template(ctx: dict[str, Any], response: httpx.Response) -> None:
+    ctx["xlsx_template"] = response.content
+
+
+def _counterparty_payload(folder_key: str, name: str) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    def payload(ctx: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "folder_id": ctx[folder_key],
+            "name": name,
+            "legal_name": f"ООО «{name}»",
+            "city": "Москва",
+            "phone": "+70000000000",
+            "order_day_of_week": 2,
+            "order_deadline_time": "12:00:00",
+            "inn": "7700000000",
+        }
+
+    return payload
+
+
+def build_scenario(today: date) -> list[Step]:
+    """Сценарий, который создаёт фиксированный набор данных и вызывает каждый маршрут.
+    Размеры набора постоянны, поэтому число statement'ов воспроизводимо между запусками.
+    """
+
+    # День недели правила — завтра: на горизонте 7 дней ровно одна дата, независимо от дня запуска.
+    rule_weekday = (today + timedelta(days=1)).isoweekday()
+    month_start = today.replace(day=1)
+    steps: list[Step] = [
+        # ── module_registry / user_sidebar_settings ──
+        Step("GET", "/modules", capture=_capture_module_ids),
+        Step("PATCH", "/modules/primary", json=lambda ctx: {"module_id": ctx["module_ids"][0]}),
+        Step("PATCH", "/modules/order", json=lambda ctx: {"ordered_ids": ctx["module_ids"]}),
+        Step("GET", "/user/sidebar-settings"),
+        Step("PUT", "/user/sidebar-settings/modules-order", json=lambda ctx: {"modules_order": ctx["module_ids"]}),
+        # ── admin_access ──
+        Step("GET", "/admin/access/roles"),
+        Step("POST", "/admin/access/roles", json={"name": "qb-operator"}, capture=_capture_id("access_role_id")),
+        Step("POST", "/admin/access/roles", json={"name": "qb-temporary"}, capture=_capture_id("access_temp_role_id")),
+        Step("GET", "/admin/access/modules"),
+        Step("PATCH", "/admin/access/roles/{access_role_id}/modules/tasks", json={"has_access": True}),
+        Step("GET", "/admin/access/roles/{access_role_id}/modules/tasks/permissions"),
+        Step(
+            "PUT",
+            "/admin/access/roles/{access_role_id}/modules/tasks/permissions",
+            json={"permissions": [{"name": "view", "is_allowed": True}, {"name": "edit", "is_allowed": False}]},
+        ),
+        Step("GET", "/admin/access/users", capture=_capture_admin_roles),
+        Step(
+            "PUT",
+            "/admin/access/users/{admin_id}/roles",
+            json=lambda ctx: {"role_ids": [*ctx["admin_role_ids"], ctx["access_role_id"]]},
+        ),
+        Step("POST", "/admin/access/session-actions", json=lambda ctx: {"user_ids": [ctx["admin_id"]], "mode": "now"}),
+        Step("DELETE", "/admin/access/roles/{access_temp_role_id}"),
+        # ── employees: роли и организации ──
+        Step("GET", "/permissions", capture=_capture_permission_ids),
+        Step("GET", "/roles"),
+        Step(
+            "POST",
+            "/roles",
+            json=lambda ctx: {"name": "QB Менеджер", "code": "QB_MANAGER", "permission_ids": ctx["permission_ids"]},
+            capture=_capture_id("employee_role_id"),
+        ),
+        Step("POST", "/roles", json={"name": "QB Временная", "code": "QB_TEMP"}, capture=_capture_id("employee_temp_role_id")),
+        Step("GET", "/roles/{employee_role_id}"),
+        Step(
+            "PATCH",
+            "/roles/{employee_role_id}",
+            json=lambda ctx: {"description": "Роль сценария бюджета", "permission_ids": ctx["permission_ids"]},
+        ),
+        Step("POST", "/organizations", json={"name": "QB Организация", "code": "QB-ORG"}, capture=_capture_id("org_id")),
+        Step("POST", "/organizations", json={"name": "QB Архивная", "code": "QB-ARCHIVE"}, capture=_capture_id("archive_org_id")),
+        Step("GET", "/organizations"),
+        Step("PATCH", "/organizations/{org_id}", json={"name": "QB Организация (основная)"}),
+        Step("GET", "/users", capture=_capture_employee_admin),
+        Step("PATCH", "/users/{employee_admin_id}", json=lambda ctx: {"organization_ids": [ctx["org_id"]]}),
+        # ── employees: оргструктура с цепочкой руководителей ──
+        Step("POST", "/org/groups", json=lambda ctx: {"organization_id": ctx["org_id"], "name": "Дирекция"}, capture=_capture_id("group_0")),
+        Step(
+            "POST",
+            "/org/groups",
+            json=lambda ctx: {"organization_id": ctx["org_id"], "parent_group_id": ctx["group_0"], "name": "Отдел"},
+            capture=_capture_id("group_1"),
+        ),
+        Step(
+            "POST",
+            "/org/groups",
+            json=lambda ctx: {"organization_id": ctx["org_id"], "parent_group_id": ctx["group_1"], "name": "Сектор"},
+            capture=_capture_id("group_2"),
+        ),
+        Step(
+            "POST",
+            "/org/groups",
+            json=lambda ctx: {"organization_id": ctx["org_id"], "parent_group_id": ctx["group_0"], "name": "Пустая группа"},
+            capture=_capture_id("group_empty"),
+        ),
+        Step(
+            "POST",
+            "/org/positions",
+            json=lambda ctx: {
+                "organization_id": ctx["org_id"],
+                "group_id": ctx["group_0"],
+                "name": "Директор",
+                "role_ids": [ctx["employee_role_id"]],
+            },
+            capture=_capture_id("position_0"),
+        ),
+    ]
+    for index, (group_key, name) in enumerate(
+        [("group_1", "Начальник отдела"), ("group_2", "Руководитель сектора"), ("group_2", "Специалист")],
+        start=1,
+    ):
+        steps.append(
+            Step(
+                "POST",
+                "/org/positions",
+                json=lambda ctx, group_key=group_key, name=name, index=index: {
+                    "organization_id": ctx["org_id"],
+                    "group_id": ctx[group_key],
+                    "name": name,
+                    "manager_position_id": ctx[f"position_{index - 1}"],
+                    "role_ids": [ctx["employee_role_id"]],
+                },
+                capture=_capture_id(f"position_{index}"),
+            )
+        )
+    steps.append(
+        Step(
+            "POST",
+            "/org/positions",
+            json=lambda ctx: {
+                "organization_id": ctx["org_id"],
+                "group_id": ctx["group_0"],
+                "name": "Пустая должность",
+                "manager_position_id": ctx["position_0"],
+            },
+            capture=_capture_id("position_empty"),
+        )
+    )
+    for index in range(6):
+        steps.append(
+            Step(
+                "POST",
+                "/users",
+                json=lambda ctx, index=index: {
+                    "full_name": f"Сотрудник {index}",
+                    "login": f"qb.user{index}",
+                    "password": "qb-secret",
+                    "organization_ids": [ctx["org_id"]],
+                    "position_ids": [ctx[f"position_{index % 4}"]],
+                },
+                capture=_capture_id(f"user_{index}"),
+            )
+        )
+    steps += [
+        # Модуль сотрудников ищет членство по id пользователя auth: на PostgreSQL admin в auth_users получает id 2,
+        # а строка users с этим id появляется только после создания сотрудников.
+        Step("PATCH", "/users/{admin_id}", json=lambda ctx: {"organization_ids": [ctx["org_id"]]}),
+        Step("POST", "/auth/switch-organization", json=lambda ctx: {"organization_id": ctx["org_id"]}),
+        Step("GET", "/organizations/my"),
+        Step("POST", "/org/positions/{position_3}/assign-user", json=lambda ctx: {"user_id": ctx["user_0"]}),
+        Step("GET", "/users", params=lambda ctx: {"organization_id": ctx["org_id"]}),
+        Step("GET", "/users/{user_0}"),
+        Step("GET", "/users/{user_3}/permissions", params=lambda ctx: {"organization_id": ctx["org_id"]}),
+        Step("GET", "/users/{user_3}/managers", params=lambda ctx: {"organization_id": ctx["org_id"]}),
+        Step("PATCH", "/users/{user_1}", json=lambda ctx: {"full_name": "Сотрудник 1 (обновлён)", "position_ids": [ctx["position_2"]]}),
+        Step("POST", "/users/{user_5}/archive"),
+        Step("POST", "/users/{user_5}/restore"),
+        Step("POST", "/users/{user_4}/set-password", json={"password": "qb-secret-2"}),
+        Step("GET", "/org/groups", params=lambda ctx: {"organization_id": ctx["org_id"]}),
+        Step("GET", "/org/groups/tree", params=lambda ctx: {"organization_id": ctx["org_id"]}),
+        Step("GET", "/org/groups/{group_2}"),
+        Step("PATCH", "/org/groups/{group_2}", json={"sort_order": 5}),
+        Step("POST", "/org/groups/{group_empty}/archive"),
+        Step("GET", "/org/positions", params=lambda ctx: {"organization_id": ctx["org_id"]}),
+        Step("GET", "/org/positions/{position_3}"),
+        Step("GET", "/org/positions/{position_3}/users"),
+        Step("PATCH", "/org/positions/{position_3}", json=lambda ctx: {"name": "Ведущий специалист", "manager_position_id": ctx["position_2"]}),
+        Step("POST", "/org/positions/{position_3}/unassign-user", json=lambda ctx: {"user_id": ctx["user_0"]}),
+        Step("POST", "/org/positions/{position_empty}/archive"),
+        Step("POST", "/roles/{employee_temp_role_id}/archive"),
+        Step("DELETE", "/roles/{employee_temp_role_id}"),
+        Step("POST", "/organizations/{archive_org_id}/archive"),
+        # ── counterparties ──
+        Step("GET", "/counterparties/settings"),
+        Step("PATCH", "/counterparties/settings", json=lambda ctx: {"task_creator_user_id": ctx["admin_id"]}),
+        Step("POST", "/counterparties/folders", json={"name": "Поставщики"}, capture=_capture_id("folder_0")),
+        Step("POST", "/counterparties/folders", json=lambda ctx: {"parent_id": ctx["folder_0"], "name": "Продукты"}, capture=_capture_id("folder_1")),
+        Step("POST", "/counterparties/folders", json=lambda ctx: {"parent_id": ctx["folder_1"], "name": "Молочные"}, capture=_capture_id("folder_2")),
+        Step("POST", "/counterparties/folders", json=lambda ctx: {"parent_id": ctx["folder_0"], "name": "Пустая"}, capture=_capture_id("folder_empty")),
+        Step("GET", "/counterparties/folders"),
+        Step("PATCH", "/counterparties/folders/{folder_2}", json={"name": "Молочная продукция"}),
+        Step("DELETE", "/counterparties/folders/{folder_empty}"),
+    ]
+    for index in range(3):
+        steps.append(
+            Step(
+                "POST",
+                "/counterparties",
+                json=_counterparty_payload(f"folder_{index}", f"Контрагент {index}"),
+                capture=_capture_id(f"counterparty_{index}"),
+            )
+        )
+    steps += [
+        Step("GET", "/counterparties"),
+        Step("GET", "/counterparties/{counterparty_0}"),
+        Step("PUT", "/counterparties/{counterparty_0}", json=_counterparty_payload("folder_1", "Контрагент 0 (переименован)")),
+        Step("POST", "/counterparties/{counterparty_2}/archive"),
+        Step("POST", "/counterparties/{counterparty_2}/restore"),
+    ]
+    for counterparty_index in range(3):
+        for rule_index, task_kind in enumerate(("MAKE_ORDER", "SEND_ORDER")):
+            steps.append(
+                Step(
+                    "POST",
+                    f"/counterparties/{{counterparty_{counterparty_index}}}/auto-tasks",
+                    json=lambda ctx, task_kind=task_kind: {
+                        "task_kind": task_kind,
+                        "title_template": "Заказ {counterparty_name}",
+                        "assignee_user_ids": [ctx["admin_id"]],
+                        "verifier_user_ids": [ctx["admin_id"]],
+                        "schedule_weekday": rule_weekday,
+                        "schedule_due_time": "10:00:00",
+                        "horizon_days": 7,
+                    },
+                    capture=_capture_id(f"rule_{counterparty_index}_{rule_index}"),
+                )
+            )
+    steps += [
+        Step("GET", "/counterparties/{counterparty_0}/auto-tasks"),
+        Step("PATCH", "/counterparties/{counterparty_0}/auto-tasks/{rule_0_0}", json={"title_template": "Срочный заказ {counterparty_name}"}),
+        Step("POST", "/counterparties/{counterparty_0}/auto-tasks/{rule_0_1}/pause"),
+        Step("POST", "/counterparties/{counterparty_0}/auto-tasks/{rule_0_1}/resume"),
+        Step("POST", "/counterparties/{counterparty_1}/auto-tasks/{rule_1_0}/stop"),
+        Step("DELETE", "/counterparties/{counterparty_1}/auto-tasks/{rule_1_1}"),
+        # ── tasks ──
+        Step("GET", "/tasks/users"),
+    ]
+    for index in range(5):
+        steps.append(
+            Step(
+                "POST",
+                "/tasks",
+                json=lambda ctx, index=index: {
+                    "title": f"Задача {index}",
+                    "due_date": today.isoformat(),
+                    "priority": "urgent" if index % 2 else "normal",
+                    "assignee_user_ids": [ctx["admin_id"]],
+                    "verifier_user_ids": [ctx["admin_id"]] if index == 2 else [],
+                },
+                capture=_capture_id(f"task_{index}"),
+            )
+        )
+    steps += [
+        Step(
+            "POST",
+            "/tasks",
+            json=lambda ctx: {
+                "title": "Еженедельная задача",
+                "due_date": today.isoformat(),
+                "assignee_user_ids": [ctx["admin_id"]],
+                "is_recurring": True,
+                "recurrence_type": "weekly",
+                "recurrence_interval": 1,
+                "recurrence_days_of_week": str(today.isoweekday()),
+                "recurrence_end_date": (today + timedelta(days=28)).isoformat(),
+            },
+            capture=_capture_id("task_recurring"),
+        ),
+        Step("GET", "/tasks", params={"date": today.isoformat()}),
+        Step("GET", "/tasks", params={"date": today.isoformat(), "tab": "verify"}),
+        Step("GET", "/tasks", params={"date": today.isoformat(), "tab": "created"}),
+        Step("GET", "/tasks/calendar", params={"from": month_start.isoformat(), "to": (month_start + timedelta(days=41)).isoformat()}),
+        Step("GET", "/tasks/badges"),
+        Step("GET", "/tasks/{task_0}"),
+        Step("PATCH", "/tasks/{task_0}", json=lambda ctx: {"title": "Задача 0 (обновлена)", "verifier_user_ids": [ctx["admin_id"]]}),
+        Step("POST", "/tasks/{task_1}/complete"),
+        Step("POST", "/tasks/{task_1}/return-active"),
+        Step("POST", "/tasks/{task_2}/complete"),
+        Step("POST", "/tasks/{task_2}/verify"),
+        Step("DELETE", "/tasks/{task_3}"),
+        Step("POST", "/tasks/{task_recurring}/recurrence-action", json={"action": "pause"}),
+        Step("DELETE", "/tasks/{task_recurring}/recurrence-children", params={"mode": "all"}),
+        Step("GET", "/tasks/admin/template", capture=_capture_template),
+        Step("GET", "/tasks/admin/export"),
+        Step("POST", "/tasks/admin/import-preview", upload="xlsx_template"),
+        Step("POST", "/tasks/admin/import", json={"rows": []}),
+    ]
+    return steps
+
+
+def _route_key(method: str, path: str) -> str | None:
+    """Находит шаблон маршрута так же, как это делает роутер приложения."""
+
+    scope = {"type": "http", "path": path, "root_path": "", "method": method}
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return f"{method} {route.path}"
+    return None
+
+
+def covered_route_keys() -> set[str]:
+    """Все маршруты роутеров из COVERED_MODULES."""
+
+    keys: set[str] = set()
+    for route in app.router.routes:
+        if isinstance(route, APIRoute) and route.endpoint.__module__ in COVERED_MODULES:
+            keys.update(f"{method} {route.path}" for method in route.methods)
+    return keys
+
+
+def _bootstrap_context() -> dict[str, Any]:
+    """Проверяет, что БД пустая, и находит администратора, созданного миграциями."""
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        # На SQLite другое число statement'ов у части маршрутов и нет счёта строк: бюджеты с ним несравнимы.
+        raise SystemExit("Бюджеты сняты на PostgreSQL: запустите инструмент на пустой базе PostgreSQL")
+    with engine.connect() as connection:
+        existing = sum(
+            connection.scalar(select(func.count()).select_from(model)) or 0
+            for model in (Organization, Counterparty, Task)
+        )
+        admin_id = connection.scalar(select(AuthUser.id).where(AuthUser.username == "admin"))
+    if existing:
+        raise SystemExit("Бюджет снимается только на пустой БД: выполните alembic upgrade head на новой базе")
+    if admin_id is None:
+        raise SystemExit("Не найден пользователь admin: миграции применены не полностью")
+    return {"admin_id": admin_id}
+
+
+async def run_scenario(steps: list[Step]) -> RunResult:
+    """Прогоняет сценарий через ASGI-приложение в том же event loop.
+    Вызов выполняется внутри track_queries, поэтому учитываются и sync-, и async-endpoint'ы.
+    """
+
+    ctx = _bootstrap_context()
+    result = RunResult()
+    headers = {
+        "Authorization": f"Bearer {create_access_token(str(ctx['admin_id']))}",
+        "X-Tasks-Admin-Pin": os.getenv("TASKS_ADMIN_PIN", "0000"),
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://budget", headers=headers) as client:
+            for step in steps:
+                path = step.path.format_map(ctx)
+                route_key = _route_key(step.method, path)
+                files = None
+                if step.upload is not None:
+                    files = {"file": ("tasks.xlsx", ctx[step.upload], "application/octet-stream")}
+
+                started = time.perf_counter()
+                with track_queries() as stats:
+                    response = await client.request(
+                        step.method,
+                        path,
+                        json=_resolve(step.json, ctx),
+                        params=_resolve(step.params, ctx),
+                        files=files,
+                    )
+                wall_ms = (time.perf_counter() - started) * 1000
+
+                if route_key is None or not response.is_success:
+                    result.errors.append(f"{step.method} {path}: HTTP {response.status_code} {response.text[:200]}")
+                    continue
+                result.measures.setdefault(route_key, RouteMeasure()).add(stats.statements, stats.rows, wall_ms)
+                if step.capture is not None:
+                    step.capture(ctx, response)
+    return result
+
+
+def load_budgets(path: Path) -> dict[str, dict[str, float | None]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_budgets(path: Path, measures: dict[str, RouteMeasure]) -> None:
+    payload = {
+        key: {"statements": item.statements, "rows": item.rows, "wall_ms": round(item.wall_ms, 1)}
+        for key, item in sorted(measures.items())
+    }
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(
+    measures: dict[str, RouteMeasure],
+    budgets: dict[str, dict[str, float | None]],
+    time_factor: float,
+) -> list[str]:
+    """Возвращает нарушения бюджета; null в бюджете означает «метрика не контролируется»."""
+
+    violations: list[str] = []
+    for key, item in sorted(measures.items()):
+        budget = budgets.get(key)
+        if budget is None:
+            violations.append(f"{key}: нет бюджета, запустите с --update")
+            continue
+        if budget.get("statements") is not None and item.statements > budget["statements"]:
+            violations.append(f"{key}: statements {item.statements} > {budget['statements']}")
+        if budget.get("rows") is not None and item.rows > budget["rows"]:
+            violations.append(f"{key}: rows {item.rows} > {budget['rows']}")
+        wall_budget = budget.get("wall_ms")
+        if wall_budget is not None and item.wall_ms > max(wall_budget * time_factor, wall_budget + WALL_MS_FLOOR):
+            violations.append(f"{key}: wall {item.wall_ms:.1f}ms > {wall_budget}ms x{time_factor}")
+    return violations
+
+
+def _print_report(measures: dict[str, RouteMeasure], budgets: dict[str, dict[str, float | None]]) -> None:
+    print(f"{'route':<70} {'calls':>5} {'stmts':>11} {'rows':>11} {'wall_ms':>17}")
+    for key, item in sorted(measures.items()):
+        budget = budgets.get(key, {})
+
+        def cell(value: float, limit: float | None) -> str:
+            return f"{value:g}/{'—' if limit is None else f'{limit:g}'}"
+
+        print(
+            f"{key:<70} {item.calls:>5} {cell(item.statements, budget.get('statements')):>11} "
+            f"{cell(item.rows, budget.get('rows')):>11} {cell(round(item.wall_ms, 1), budget.get('wall_ms')):>17}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Проверка бюджета SQL-запросов по endpoint'ам")
+    parser.add_argument("--update", action="store_true", help="перезаписать бюджеты текущими значениями")
+    parser.add_argument("--budgets", type=Path, default=BUDGETS_PATH, help="путь к JSON с бюджетами")
+    parser.add_argument("--time-factor", type=float, default=3.0, help="допустимый множитель wall time")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run_scenario(build_scenario(date.today())))
+    budgets = load_budgets(args.budgets)
+    _print_report(result.measures, budgets)
+
+    uncovered = sorted(covered_route_keys() - set(result.measures))
+    problems = [*result.errors, *(f"{key}: маршрут не покрыт сценарием" for key in uncovered)]
+    if args.update:
+        if problems:
+            print("\n".join(["", "Бюджеты не обновлены:", *problems]), file=sys.stderr)
+            return 1
+        save_budgets(args.budgets, result.measures)
+        print(f"\nБюджеты записаны в {args.budgets}")
+        return 0
+
+    problems += compare(result.measures, budgets, args.time_factor)
+    if problems:
+        print("\n".join(["", "Нарушения:", *problems]), file=sys.stderr)
+        return 1
+    print("\nВсе маршруты в пределах бюджета")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Бенчмарк сериализации и сжатия больших JSON-ответов.
+Файл нужен, чтобы видеть выигрыш orjson и gzip/brotli на реальных данных конкретной БД.
+Минимальность: несколько тяжёлых endpoint'ов, медианы по повторам и текстовый отчёт.
+
+Запуск на БД с данными (например, после генератора нагрузочного набора):
+    python -m app.tools.response_bench [--repeat 20] [--json results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Any, Callable
+
+import httpx
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import select
+
+from app.core.compression import brotli
+from app.core.config import settings
+from app.core.db import get_engine
+from app.main import app
+from app.modules.auth.models import User as AuthUser
+from app.modules.auth.security import create_access_token
+from app.modules.employees.models import Organization
+
+
+@dataclass(frozen=True)
+class Target:
+    """Endpoint бенчмарка.
+    encoder=True — маршрут без response_model: до orjson его ответ проходил jsonable_encoder.
+    """
+
+    name: str
+    method: str
+    path: str
+    params: dict[str, Any] | None = None
+    upload_from: str | None = None
+    encoder: bool = False
+
+
+def build_targets(organization_id: int | None, today: date) -> list[Target]:
+    targets = [
+        Target("counterparties", "GET", "/counterparties", {"include_archived": "true"}),
+        Target("users", "GET", "/users", {"show_archived": "true"}, encoder=True),
+        Target("tasks_assigned", "GET", "/tasks", {"date": today.isoformat(), "tab": "assigned"}),
+        Target("tasks_created", "GET", "/tasks", {"date": today.isoformat(), "tab": "created"}),
+        Target("import_preview", "POST", "/tasks/admin/import-preview", upload_from="/tasks/admin/export", encoder=True),
+    ]
+    if organization_id is not None:
+        targets.insert(
+            2,
+            Target(
+                "groups_tree",
+                "GET",
+                "/org/groups/tree",
+                {"organization_id": organization_id, "show_archived": "true"},
+                encoder=True,
+            ),
+        )
+    return targets
+
+
+@dataclass
+class BenchResult:
+    name: str
+    path: str
+    items: int
+    json_bytes: int
+    stdlib_ms: float
+    orjson_ms: float
+    gzip_bytes: int
+    gzip_ms: float
+    br_bytes: int | None
+    br_ms: float | None
+
+
+def _median_ms(func: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def measure(target: Target, payload: Any, repeat: int) -> BenchResult:
+    """Сравнивает прежний путь (jsonable_encoder для маршрутов без модели + json.dumps) с orjson и сжатием."""
+
+    def stdlib() -> bytes:
+        content = jsonable_encoder(payload) if target.encoder else payload
+        return JSONResponse(content).body
+
+    def fast() -> bytes:
+        return ORJSONResponse(payload).body
+
+    body = fast()
+    gzip_body = gzip.compress(body, compresslevel=settings.response_gzip_level, mtime=0)
+    br_bytes = br_ms = None
+    if brotli is not None:
+        br_bytes = len(brotli.compress(body, quality=settings.response_brotli_quality))
+        br_ms = _median_ms(lambda: brotli.compress(body, quality=settings.response_brotli_quality), repeat)
+    return BenchResult(
+        name=target.name,
+        path=target.path,
+        items=len(payload) if isinstance(payload, list) else sum(len(v) for v in payload.values() if isinstance(v, list)),
+        json_bytes=len(body),
+        stdlib_ms=_median_ms(stdlib, repeat),
+        orjson_ms=_median_ms(fast, repeat),
+        gzip_bytes=len(gzip_body),
+        gzip_ms=_median_ms(lambda: gzip.compress(body, compresslevel=settings.response_gzip_level, mtime=0), repeat),
+        br_bytes=br_bytes,
+        br_ms=br_ms,
+    )
+
+
+def _context() -> tuple[int, int | None]:
+    with get_engine().connect() as connection:
+        admin_id = connection.scalar(select(AuthUser.id).where(AuthUser.username == "admin"))
+        organization_id = connection.scalar(select(Organization.id).order_by(Organization.id).limit(1))
+    if admin_id is None:
+        raise SystemExit("Не найден пользователь admin: миграции применены не полностью")
+    return admin_id, organization_id
+
+
+async def fetch_payloads(targets: list[Target], admin_id: int) -> dict[str, Any]:
+    """Получает тела ответов через ASGI-приложение без сжатия."""
+
+    headers = {
+        "Authorization": f"Bearer {create_access_token(str(admin_id))}",
+        "X-Tasks-Admin-Pin": os.getenv("TASKS_ADMIN_PIN", "0000"),
+        "Accept-Encoding": "identity",
+    }
+    payloads: dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=None) as client:
+            for target in targets:
+                files = None
+                if target.upload_from is not None:
+                    source = await client.get(target.upload_from)
+                    source.raise_for_status()
+                    files = {"file": ("tasks.xlsx", source.content, "application/octet-stream")}
+                response = await client.request(target.method, target.path, params=target.params, files=files)
+                if not response.is_success:
+                    raise SystemExit(f"{target.method} {target.path}: HTTP {response.status_code} {response.text[:200]}")
+                payloads[target.name] = orjson.loads(response.content)
+    return payloads
+
+
+def _print_report(results: list[BenchResult]) -> None:
+    print(
+        f"{'endpoint':<16} {'items':>7} {'json_kb':>9} {'stdlib_ms':>10} {'orjson_ms':>10} {'x':>6} "
+        f"{'gzip_kb':>8} {'gzip_ms':>8} {'br_kb':>8} {'br_ms':>8}"
+    )
+    for item in results:
+        speedup = item.stdlib_ms / item.orjson_ms if item.orjson_ms else 0.0
+        br_kb = f"{item.br_bytes / 1024:.1f}" if item.br_bytes is not None else "—"
+        br_ms = f"{item.br_ms:.2f}" if item.br_ms is not None else "—"
+        print(
+            f"{item.name:<16} {item.items:>7} {item.json_bytes / 1024:>9.1f} {item.stdlib_ms:>10.2f} "
+            f"{item.orjson_ms:>10.2f} {speedup:>6.1f} {item.gzip_bytes / 1024:>8.1f} {item.gzip_ms:>8.2f} "
+            f"{br_kb:>8} {br_ms:>8}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк сериализации и сжатия JSON-ответов")
+    parser.add_argument("--repeat", type=int, default=20, help="число повторов для медианы")
+    parser.add_argument("--json", dest="json_path", help="записать результаты в JSON-файл")
+    args = parser.parse_args(argv)
+
+    admin_id, organization_id = _context()
+    targets = build_targets(organization_id, date.today())
+    payloads = asyncio.run(fetch_payloads(targets, admin_id))
+    results = [measure(target, payloads[target.name], args.repeat) for target in targets]
+    _print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump([asdict(item) for item in results], handle, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
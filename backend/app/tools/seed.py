@@ -0,0 +1,577 @@
+"""Детерминированный генератор большого набора данных.
+Файл нужен, чтобы воспроизводить поведение на объёмах production локально и в нагрузочных прогонах.
+Минимальность: построчные генераторы по таблицам и bulk-запись (COPY для PostgreSQL, executemany для остальных).
+
+Запуск из каталога backend на БД после alembic upgrade head:
+    python -m app.tools.seed --scale medium [--seed 42] [--anchor 2026-10-17] [--tasks 1000000 ...]
+
+Одинаковые аргументы (включая --anchor) дают одинаковые данные, кроме соли общего хэша пароля:
+у каждой таблицы свой генератор случайных чисел, поэтому изменение одного параметра не сдвигает остальные таблицы.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, fields, replace
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Iterable, Iterator
+
+import bcrypt
+from sqlalchemy import JSON, Engine, Table, func, select
+
+from app.core.config import settings
+from app.core.db import get_engine
+from app.db.table_versions import bump_versions
+from app.events.default_handlers import calendar_day_upsert
+from app.events.models import CalendarDaySummary, DomainEventRecord
+from app.events.partitions import add_months, create_partitions, month_start
+from app.events.projections import CALENDAR_DAY_SUMMARY
+from app.modules.auth.models import Role as AuthRole, User as AuthUser, UserRole
+from app.modules.auth.service import DEFAULT_ROLE_NAME
+from app.modules.counterparties.models import (
+    Counterparty,
+    CounterpartyAutoTaskRule,
+    CounterpartyAutoTaskRuleAssignee,
+    CounterpartyAutoTaskRuleVerifier,
+    CounterpartyFolder,
+)
+from app.modules.employees.models import (
+    Group,
+    Organization,
+    Position,
+    User as Employee,
+    UserOrganization,
+    UserPosition,
+)
+from app.modules.tasks.models import Task, TaskAssignee, TaskVerifier
+from app.modules.tasks.service import _advance_date
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Объём генерации. Значения пресетов переопределяются одноимёнными аргументами CLI."""
+
+    auth_users: int
+    employees: int
+    organizations: int
+    group_depth: int
+    group_fanout: int
+    positions_per_group: int
+    folder_depth: int
+    folder_fanout: int
+    counterparties: int
+    rules_per_counterparty: int
+    task_masters: int
+    children_per_master: int
+    tasks: int
+    max_assignees: int
+    max_verifiers: int
+    events: int
+
+
+# large даёт порядка 10 млн строк: задачи, их исполнители и проверяющие составляют основную массу.
+SCALES: dict[str, Scale] = {
+    "small": Scale(200, 200, 2, 3, 3, 2, 2, 4, 500, 1, 200, 20, 10_000, 2, 1, 10_000),
+    "medium": Scale(2_000, 2_000, 5, 4, 3, 3, 3, 5, 10_000, 1, 5_000, 50, 500_000, 2, 1, 500_000),
+    "large": Scale(20_000, 20_000, 10, 5, 3, 3, 3, 8, 100_000, 2, 40_000, 52, 2_000_000, 2, 1, 1_000_000),
+}
+
+RECURRENCE_TYPES = ("daily", "weekly", "weekly", "monthly")
+PRIORITIES = (None, "normal", "normal", "urgent", "very_urgent")
+EVENT_TYPES = ("task.created", "task.created", "task.completed", "task.verified")
+CITIES = ("Москва", "Санкт-Петербург", "Казань", "Екатеринбург", "Новосибирск", "Самара")
+PRODUCT_GROUPS = ("Овощи", "Молочная продукция", "Бакалея", "Напитки", "Заморозка", "Хозтовары")
+
+
+def _rng(seed: int, section: str) -> random.Random:
+    return random.Random(f"{seed}:{section}")
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _at(anchor: date, days: int, seconds: int = 0) -> datetime:
+    return datetime.combine(anchor, dt_time(9, 0), tzinfo=timezone.utc) + timedelta(days=days, seconds=seconds)
+
+
+class BulkWriter:
+    """Пакетная запись строк в таблицу.
+    PostgreSQL (psycopg2) получает данные через COPY FROM STDIN в CSV, остальные диалекты — executemany.
+    """
+
+    def __init__(self, engine: Engine, batch_size: int) -> None:
+        self.engine = engine
+        self.batch_size = batch_size
+        self.counts: dict[str, int] = defaultdict(int)
+        self.use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+    def write(self, table: Table, columns: tuple[str, ...], rows: Iterable[tuple]) -> int:
+        written = 0
+        batch: list[tuple] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                written += self._flush(table, columns, batch)
+                batch = []
+        if batch:
+            written += self._flush(table, columns, batch)
+        return written
+
+    def _flush(self, table: Table, columns: tuple[str, ...], batch: list[tuple]) -> int:
+        with self.engine.begin() as connection:
+            if self.use_copy:
+                self._copy(connection, table, columns, batch)
+            else:
+                connection.execute(table.insert(), [dict(zip(columns, row)) for row in batch])
+        self.counts[table.name] += len(batch)
+        return len(batch)
+
+    def _copy(self, connection, table: Table, columns: tuple[str, ...], batch: list[tuple]) -> None:
+        json_positions = [index for index, name in enumerate(columns) if isinstance(table.c[name].type, JSON)]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            if json_positions:
+                row = list(row)
+                for index in json_positions:
+                    row[index] = json.dumps(row[index], ensure_ascii=False)
+            writer.writerow(row)
+        buffer.seek(0)
+        quoted = ", ".join(f'"{name}"' for name in columns)
+        cursor = connection.connection.driver_connection.cursor()
+        try:
+            # Пустое значение без кавычек COPY читает как NULL; пустых строк генератор не создаёт.
+            cursor.copy_expert(f'COPY "{table.name}" ({quoted}) FROM STDIN WITH (FORMAT csv)', buffer)
+        finally:
+            cursor.close()
+
+
+class Seeder:
+    def __init__(self, engine: Engine, writer: BulkWriter, scale: Scale, seed: int, anchor: date, prefix: str) -> None:
+        self.engine = engine
+        self.writer = writer
+        self.scale = scale
+        self.seed = seed
+        self.anchor = anchor
+        self.prefix = prefix
+        self._next_ids: dict[str, int] = {}
+
+    def _max_id(self, table: Table) -> int:
+        with self.engine.connect() as connection:
+            return connection.scalar(select(func.max(table.c.id))) or 0
+
+    def _allocate(self, table: Table, count: int) -> int:
+        """Первый id диапазона: строки пишутся с явными id, чтобы ссылки собирались без RETURNING."""
+
+        if table.name not in self._next_ids:
+            self._next_ids[table.name] = self._max_id(table) + 1
+        start = self._next_ids[table.name]
+        self._next_ids[table.name] = start + count
+        return start
+
+    def _pick(self, rng: random.Random, population: list[int], upper: int) -> list[int]:
+        if not population or upper <= 0:
+            return []
+        return sorted(rng.sample(population, min(rng.randint(1, upper), len(population))))
+
+    def check_clean(self) -> None:
+        with self.engine.connect() as connection:
+            taken = connection.scalar(
+                select(AuthUser.id).where(AuthUser.username.like(f"{self.prefix}\\_%", escape="\\")).limit(1)
+            )
+        if taken is not None:
+            raise SystemExit(f"В БД уже есть пользователи с префиксом {self.prefix!r}: укажите другой --prefix")
+
+    def users(self, password_hash: str) -> tuple[list[int], list[int]]:
+        count = self.scale.auth_users
+        # Сотрудник и пользователь входа делят id (employees сопоставляет их по id текущего пользователя),
+        # поэтому диапазон начинается после максимума обеих таблиц.
+        start = max(self._max_id(AuthUser.__table__), self._max_id(Employee.__table__)) + 1
+        self._next_ids[AuthUser.__table__.name] = self._next_ids[Employee.__table__.name] = start + count
+        user_ids = list(range(start, start + count))
+        self.writer.write(
+            AuthUser.__table__,
+            ("id", "username", "hashed_password"),
+            ((user_id, f"{self.prefix}_{user_id:07d}", password_hash) for user_id in user_ids),
+        )
+        with self.engine.connect() as connection:
+            role_id = connection.scalar(select(AuthRole.id).where(AuthRole.name == DEFAULT_ROLE_NAME))
+        if role_id is not None:
+            self.writer.write(UserRole.__table__, ("user_id", "role_id"), ((user_id, role_id) for user_id in user_ids))
+
+        employee_ids = user_ids[: self.scale.employees]
+        created_at = _at(self.anchor, -365)
+        rng = _rng(self.seed, "employees")
+        self.writer.write(
+            Employee.__table__,
+            ("id", "full_name", "login", "password_hash", "phone", "is_active", "is_archived", "created_at", "updated_at"),
+            (
+                (
+                    user_id,
+                    f"Сотрудник {user_id}",
+                    f"{self.prefix}_{user_id:07d}",
+                    password_hash,
+                    f"+7900{rng.randrange(10**7):07d}",
+                    True,
+                    rng.random() < 0.03,
+                    created_at,
+                    created_at,
+                )
+                for user_id in employee_ids
+            ),
+        )
+        return user_ids, employee_ids
+
+    def org_structure(self, employee_ids: list[int]) -> None:
+        rng = _rng(self.seed, "org_structure")
+        created_at = _at(self.anchor, -365)
+        org_start = self._allocate(Organization.__table__, self.scale.organizations)
+        org_ids = list(range(org_start, org_start + self.scale.organizations))
+        self.writer.write(
+            Organization.__table__,
+            ("id", "name", "code", "is_active", "is_archived", "created_at", "updated_at"),
+            ((org_id, f"Организация {org_id}", f"{self.prefix}-org-{org_id}", True, False, created_at, created_at) for org_id in org_ids),
+        )
+
+        groups: list[tuple] = []
+        positions: list[tuple] = []
+        org_positions: dict[int, list[int]] = defaultdict(list)
+        per_org = sum(self.scale.group_fanout**level for level in range(1, self.scale.group_depth + 1))
+        group_id = self._allocate(Group.__table__, per_org * len(org_ids))
+        position_id = self._allocate(Position.__table__, per_org * len(org_ids) * self.scale.positions_per_group)
+        for org_id in org_ids:
+            # Обход в ширину: родительская группа и её должности всегда пишутся раньше дочерних.
+            level: list[tuple[int | None, str, int | None]] = [(None, "", None)]
+            for _ in range(self.scale.group_depth):
+                next_level = []
+                for parent_id, path, manager_position_id in level:
+                    for index in range(1, self.scale.group_fanout + 1):
+                        group_path = f"{path}.{index}" if path else str(index)
+                        head_user_id = rng.choice(employee_ids) if employee_ids else None
+                        groups.append((group_id, org_id, parent_id, f"Группа {group_path}", head_user_id, index, True, False, created_at, created_at))
+                        first_position = position_id
+                        for slot in range(self.scale.positions_per_group):
+                            manager = manager_position_id if slot == 0 else first_position
+                            positions.append((position_id, org_id, group_id, f"Должность {group_path}/{slot + 1}", manager, slot, True, False, created_at, created_at))
+                            org_positions[org_id].append(position_id)
+                            position_id += 1
+                        next_level.append((group_id, group_path, first_position))
+                        group_id += 1
+                level = next_level
+
+        self.writer.write(
+            Group.__table__,
+            ("id", "organization_id", "parent_group_id", "name", "head_user_id", "sort_order", "is_active", "is_archived", "created_at", "updated_at"),
+            groups,
+        )
+        self.writer.write(
+            Position.__table__,
+            ("id", "organization_id", "group_id", "name", "manager_position_id", "sort_order", "is_active", "is_archived", "created_at", "updated_at"),
+            positions,
+        )
+
+        memberships = []
+        assignments = []
+        for index, user_id in enumerate(employee_ids):
+            org_id = org_ids[index % len(org_ids)]
+            memberships.append((user_id, org_id, True, created_at))
+            assignments.append((user_id, rng.choice(org_positions[org_id]), created_at))
+        self.writer.write(UserOrganization.__table__, ("user_id", "organization_id", "is_active", "created_at"), memberships)
+        self.writer.write(UserPosition.__table__, ("user_id", "position_id", "created_at"), assignments)
+
+    def counterparties(self, user_ids: list[int]) -> list[int]:
+        rng = _rng(self.seed, "counterparties")
+        created_at = _at(self.anchor, -365)
+        folders: list[tuple] = []
+        leaves: list[int] = []
+        total_folders = sum(self.scale.folder_fanout**level for level in range(1, self.scale.folder_depth + 1))
+        folder_id = self._allocate(CounterpartyFolder.__table__, total_folders)
+        level: list[tuple[int | None, str]] = [(None, "")]
+        for depth in range(1, self.scale.folder_depth + 1):
+            next_level = []
+            for parent_id, path in level:
+                for index in range(1, self.scale.folder_fanout + 1):
+                    folder_path = f"{path}.{index}" if path else str(index)
+                    folders.append((folder_id, parent_id, f"Папка {folder_path}", index, created_at, created_at))
+                    if depth == self.scale.folder_depth:
+                        leaves.append(folder_id)
+                    next_level.append((folder_id, folder_path))
+                    folder_id += 1
+            level = next_level
+        self.writer.write(
+            CounterpartyFolder.__table__,
+            ("id", "parent_id", "name", "sort_order", "created_at", "updated_at"),
+            folders,
+        )
+
+        count = self.scale.counterparties
+        start = self._allocate(Counterparty.__table__, count)
+        counterparty_ids = list(range(start, start + count))
+
+        def counterparty_rows() -> Iterator[tuple]:
+            for counterparty_id in counterparty_ids:
+                archived = rng.random() < 0.05
+                yield (
+                    counterparty_id,
+                    rng.choice(leaves),
+                    archived,
+                    "archived" if archived else rng.choice(("active", "active", "active", "inactive")),
+                    counterparty_id - start,
+                    f"Контрагент {counterparty_id}",
+                    f"ООО «Поставщик {counterparty_id}»",
+                    rng.choice(CITIES),
+                    rng.choice(PRODUCT_GROUPS),
+                    f"{rng.randrange(10**10):010d}",
+                    f"{rng.randrange(10**9):09d}",
+                    rng.randint(1, 7),
+                    dt_time(rng.randint(9, 17), 0),
+                    rng.randint(1, 7),
+                    created_at,
+                    created_at,
+                )
+
+        self.writer.write(
+            Counterparty.__table__,
+            (
+                "id", "folder_id", "is_archived", "status", "sort_order", "name", "legal_name", "city", "product_group",
+                "inn", "kpp", "order_day_of_week", "order_deadline_time", "delivery_day_of_week", "created_at", "updated_at",
+            ),
+            counterparty_rows(),
+        )
+
+        rules_count = count * self.scale.rules_per_counterparty
+        rule_start = self._allocate(CounterpartyAutoTaskRule.__table__, rules_count)
+        rules: list[tuple] = []
+        rule_assignees: list[tuple] = []
+        rule_verifiers: list[tuple] = []
+        rule_id = rule_start
+        for counterparty_id in counterparty_ids:
+            for slot in range(self.scale.rules_per_counterparty):
+                kind = "MAKE_ORDER" if slot % 2 == 0 else "SEND_ORDER"
+                state = rng.choice(("active", "active", "active", "paused", "stopped"))
+                rules.append((rule_id, counterparty_id, kind, f"{kind} {{counterparty_name}}", rng.randint(1, 7), dt_time(rng.randint(9, 17), 0), 15, state, state == "active", created_at, created_at))
+                rule_assignees.extend((rule_id, user_id) for user_id in self._pick(rng, user_ids, self.scale.max_assignees))
+                rule_verifiers.extend((rule_id, user_id) for user_id in self._pick(rng, user_ids, self.scale.max_verifiers))
+                rule_id += 1
+        self.writer.write(
+            CounterpartyAutoTaskRule.__table__,
+            ("id", "counterparty_id", "task_kind", "title_template", "schedule_weekday", "schedule_due_time", "horizon_days", "state", "is_enabled", "created_at", "updated_at"),
+            rules,
+        )
+        self.writer.write(CounterpartyAutoTaskRuleAssignee.__table__, ("rule_id", "user_id"), rule_assignees)
+        self.writer.write(CounterpartyAutoTaskRuleVerifier.__table__, ("rule_id", "user_id"), rule_verifiers)
+        return counterparty_ids
+
+    def _task_row(self, rng: random.Random, task_id: str, due: date, creator: int, master: tuple | None, counterparty_id: int | None) -> tuple:
+        offset = (due - self.anchor).days
+        status = "active"
+        completed_at = verified_at = None
+        if offset < 0:
+            roll = rng.random()
+            if roll < 0.7:
+                status = "done"
+                completed_at = _at(due, 0, rng.randrange(8 * 3600))
+                verified_at = completed_at + timedelta(hours=rng.randint(1, 48))
+            elif roll < 0.8:
+                status = "done_pending_verify"
+                completed_at = _at(due, 0, rng.randrange(8 * 3600))
+        due_time = dt_time(rng.randint(8, 19), rng.choice((0, 30))) if rng.random() < 0.6 else None
+        source = ("counterparty_auto_task", str(counterparty_id), "counterparties", counterparty_id) if counterparty_id else (None, None, None, None)
+        if master is not None:
+            master_id, title, recurrence_state = master
+            return (
+                task_id, title, None, due, due_time, status, rng.choice(PRIORITIES), creator, _at(due, -30), completed_at, verified_at,
+                *source, False, None, None, None, master_id, recurrence_state, recurrence_state == "paused",
+            )
+        return (
+            task_id, f"Задача {task_id[:8]}", None, due, due_time, status, rng.choice(PRIORITIES), creator, _at(due, -rng.randint(1, 30)),
+            completed_at, verified_at, *source, False, None, None, None, None, "active", False,
+        )
+
+    def tasks(self, user_ids: list[int], counterparty_ids: list[int]) -> None:
+        columns = (
+            "id", "title", "description", "due_date", "due_time", "status", "priority", "created_by_user_id", "created_at",
+            "completed_at", "verified_at", "source_type", "source_id", "source_module", "source_counterparty_id",
+            "is_recurring", "recurrence_type", "recurrence_interval", "recurrence_end_date", "recurrence_master_task_id",
+            "recurrence_state", "is_hidden",
+        )
+        rng = _rng(self.seed, "tasks")
+        chunk_tasks: list[tuple] = []
+        chunk_assignees: list[tuple] = []
+        chunk_verifiers: list[tuple] = []
+
+        def flush() -> None:
+            # Задачи, исполнители и проверяющие пишутся одной порцией: связи не опережают свои задачи.
+            self.writer.write(Task.__table__, columns, chunk_tasks)
+            self.writer.write(TaskAssignee.__table__, ("task_id", "user_id"), chunk_assignees)
+            self.writer.write(TaskVerifier.__table__, ("task_id", "user_id"), chunk_verifiers)
+            chunk_tasks.clear()
+            chunk_assignees.clear()
+            chunk_verifiers.clear()
+
+        def add(task: tuple, assignees: list[int], verifiers: list[int]) -> None:
+            chunk_tasks.append(task)
+            chunk_assignees.extend((task[0], user_id) for user_id in assignees)
+            chunk_verifiers.extend((task[0], user_id) for user_id in verifiers)
+            if len(chunk_tasks) >= self.writer.batch_size:
+                flush()
+
+        for _ in range(self.scale.task_masters):
+            master_id = _uuid(rng)
+            recurrence_type = rng.choice(RECURRENCE_TYPES)
+            children = self.scale.children_per_master
+            # Серия начинается в прошлом, чтобы у неё были и закрытые, и будущие экземпляры.
+            first_due = self.anchor - timedelta(days=rng.randint(0, 60))
+            creator = rng.choice(user_ids)
+            assignees = self._pick(rng, user_ids, self.scale.max_assignees) or [creator]
+            verifiers = self._pick(rng, user_ids, self.scale.max_verifiers) if rng.random() < 0.5 else []
+            counterparty_id = rng.choice(counterparty_ids) if counterparty_ids and rng.random() < 0.2 else None
+            recurrence_state = rng.choice(("active", "active", "active", "paused"))
+            title = f"Повторяющаяся задача {master_id[:8]}"
+            source = ("counterparty_auto_task", str(counterparty_id), "counterparties", counterparty_id) if counterparty_id else (None, None, None, None)
+            add(
+                (
+                    master_id, title, None, first_due, None, "active", None, creator, _at(first_due, -30), None, None,
+                    *source, True, recurrence_type, 1, None, None, recurrence_state, False,
+                ),
+                assignees,
+                verifiers,
+            )
+            due = first_due
+            for _ in range(children):
+                due = _advance_date(due, recurrence_type, 1)
+                add(self._task_row(rng, _uuid(rng), due, creator, (master_id, title, recurrence_state), counterparty_id), assignees, verifiers)
+
+        for _ in range(self.scale.tasks):
+            creator = rng.choice(user_ids)
+            due = self.anchor + timedelta(days=rng.randint(-90, 90))
+            counterparty_id = rng.choice(counterparty_ids) if counterparty_ids and rng.random() < 0.1 else None
+            assignees = self._pick(rng, user_ids, self.scale.max_assignees) or [creator]
+            verifiers = self._pick(rng, user_ids, self.scale.max_verifiers) if rng.random() < 0.4 else []
+            add(self._task_row(rng, _uuid(rng), due, creator, None, counterparty_id), assignees, verifiers)
+        flush()
+
+    def events(self) -> None:
+        rng = _rng(self.seed, "events")
+        summary: dict[date, tuple[int, datetime]] = {}
+        # Агрегат ниже уже учитывает события: они доставлены в момент генерации, dispatcher outbox их не повторяет.
+        dispatched_at = datetime.now(timezone.utc)
+
+        def rows() -> Iterator[tuple]:
+            for _ in range(self.scale.events):
+                event_id = _uuid(rng)
+                occurred_at = _at(self.anchor, -rng.randint(0, 180), rng.randrange(86400))
+                day = occurred_at.date() + timedelta(days=rng.randint(0, 14))
+                task_id = _uuid(rng)
+                event_type = rng.choice(EVENT_TYPES)
+                if event_type in CALENDAR_DAY_SUMMARY.event_types:
+                    count, last = summary.get(day, (0, occurred_at))
+                    summary[day] = (count + 1, max(last, occurred_at))
+                payload = {"task_id": task_id, "date": day.isoformat()}
+                yield (event_id, event_type, "task", task_id, payload, occurred_at, dispatched_at)
+
+        # Секции на всю глубину истории: без них прошлые месяцы легли бы в секцию по умолчанию.
+        months = [month_start(_at(self.anchor, -180).date())]
+        while months[-1] < month_start(_at(self.anchor, 0, 86399).date()):
+            months.append(add_months(months[-1], 1))
+        create_partitions(self.engine, months)
+        self.writer.write(
+            DomainEventRecord.__table__,
+            ("id", "type", "entity", "entity_id", "payload", "occurred_at", "dispatched_at"),
+            rows(),
+        )
+        # Агрегат дня досчитывается к уже накопленному, как это сделал бы обработчик при publish.
+        table = CalendarDaySummary.__table__
+        with self.engine.begin() as connection:
+            connection.execute(calendar_day_upsert(self.engine.dialect.name, summary))
+        self.writer.counts[table.name] += len(summary)
+
+    def finish(self) -> None:
+        """Сдвигает счётчики id в PostgreSQL и версии таблиц для conditional GET."""
+
+        with self.engine.begin() as connection:
+            if self.engine.dialect.name == "postgresql":
+                for name in self._next_ids:
+                    connection.exec_driver_sql(
+                        f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT MAX(id) FROM \"{name}\"))"
+                    )
+            bump_versions(connection, self.writer.counts)
+
+
+@contextmanager
+def _stage(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    yield
+    print(f"{name:<16} {time.perf_counter() - started:>8.1f} с", flush=True)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Детерминированное заполнение БД большим набором данных")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="пресет объёма")
+    parser.add_argument("--seed", type=int, default=42, help="зерно генерации")
+    parser.add_argument(
+        "--anchor",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="дата «сегодня» набора (YYYY-MM-DD); по умолчанию текущая, чтобы календарь и просрочки были живыми",
+    )
+    parser.add_argument("--prefix", default="seed", help="префикс логинов и кодов организаций")
+    parser.add_argument("--password", default="seed-password", help="пароль всех сгенерированных пользователей")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="строк в одной порции записи")
+    for item in fields(Scale):
+        parser.add_argument(f"--{item.name.replace('_', '-')}", type=int, dest=item.name, help="переопределяет пресет")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    scale = SCALES[args.scale]
+    scale = replace(scale, **{item.name: getattr(args, item.name) for item in fields(Scale) if getattr(args, item.name) is not None})
+    if scale.employees > scale.auth_users:
+        raise SystemExit("--employees не может превышать --auth-users: сотрудники делят id с пользователями входа")
+    if scale.auth_users <= 0 or scale.organizations <= 0:
+        raise SystemExit("Нужен хотя бы один пользователь и одна организация")
+
+    engine = get_engine()
+    writer = BulkWriter(engine, args.batch_size)
+    seeder = Seeder(engine, writer, scale, args.seed, args.anchor, args.prefix)
+    seeder.check_clean()
+    # Один хэш на всех: bcrypt на миллионы строк занял бы часы, а логин проверяет тот же cost.
+    password_hash = bcrypt.hashpw(args.password.encode("utf-8"), bcrypt.gensalt(rounds=settings.bcrypt_rounds)).decode("utf-8")
+
+    started = time.perf_counter()
+    with _stage("users"):
+        user_ids, employee_ids = seeder.users(password_hash)
+    with _stage("org_structure"):
+        seeder.org_structure(employee_ids)
+    with _stage("counterparties"):
+        counterparty_ids = seeder.counterparties(user_ids)
+    with _stage("tasks"):
+        seeder.tasks(user_ids, counterparty_ids)
+    with _stage("events"):
+        seeder.events()
+    seeder.finish()
+
+    elapsed = time.perf_counter() - started
+    total = sum(writer.counts.values())
+    print(f"\n{'таблица':<40} {'строк':>12}")
+    for name, count in sorted(writer.counts.items()):
+        print(f"{name:<40} {count:>12}")
+    print(f"{'итого':<40} {total:>12}  ({elapsed:.1f} с, {total / elapsed if elapsed else 0:,.0f} строк/с)")
+    print(f"Логины {args.prefix}_{user_ids[0]:07d}…{args.prefix}_{user_ids[-1]:07d}, пароль {args.password}")
+    print(f"Повтор набора: --seed {args.seed} --anchor {args.anchor}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Профиль холодного старта воркера.
+Файл нужен, чтобы видеть, какие импорты и фазы старта (проверка БД, auth, прогрев) занимают время воркера до готовности.
+Минимальность: python -X importtime в отдельном процессе и запуск lifespan приложения с ожиданием прогрева.
+
+Запуск из каталога backend с тем же окружением, что и у сервера (ENABLED_MODULES учитывается):
+    python -m app.tools.startup_profile [--top 25] [--json profile.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any
+
+TARGET_MODULE = "app.main"
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    """Время импорта модуля в микросекундах: self — без вложенных импортов, cumulative — вместе с ними."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def collect_import_timings() -> list[ImportTiming]:
+    """Импортирует приложение в новом интерпретаторе: в текущем часть модулей уже загружена."""
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET_MODULE}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    timings: list[ImportTiming] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_part, cumulative_part, name = line[len("import time:"):].split("|", 2)
+        if not self_part.strip().isdigit():
+            continue  # строка заголовка
+        timings.append(ImportTiming(name.strip(), int(self_part), int(cumulative_part)))
+    if completed.returncode != 0 or not timings:
+        tail = "\n".join(completed.stderr.splitlines()[-5:])
+        raise SystemExit(f"Импорт {TARGET_MODULE} не удался:\n{tail}")
+    return timings
+
+
+def _by_package(timings: list[ImportTiming]) -> list[tuple[str, int]]:
+    """Сумма self-времени по пакетам верхнего уровня; для app — по модулям платформы и ядру."""
+
+    totals: dict[str, int] = defaultdict(int)
+    for timing in timings:
+        parts = timing.module.split(".")
+        if parts[0] != "app":
+            key = parts[0]
+        elif parts[1:2] == ["modules"]:
+            key = ".".join(parts[:3])
+        else:
+            key = ".".join(parts[:2])
+        totals[key] += timing.self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+async def _run_startup() -> dict[str, Any]:
+    """startup-обработчики и прогрев в этом процессе; длительности фаз из app.core.warmup."""
+
+    from app.main import app
+    from app.core.warmup import startup_phases, wait_for_warmup
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        startup_seconds = time.perf_counter() - started
+        await wait_for_warmup()
+        ready_seconds = time.perf_counter() - started
+        phases = startup_phases()
+    return {
+        "startup_seconds": round(startup_seconds, 4),
+        "ready_seconds": round(ready_seconds, 4),
+        "phases": phases,
+    }
+
+
+def _print_report(timings: list[ImportTiming], startup: dict[str, Any], top: int) -> None:
+    total = next((timing for timing in timings if timing.module == TARGET_MODULE), timings[-1])
+    print(f"Импорт {TARGET_MODULE}: {total.cumulative_us / 1000:.1f} мс (отдельный процесс)")
+
+    print(f"\nМодули по времени импорта с вложенными (топ {top}):")
+    print(f"{'module':<60} {'self_ms':>9} {'cumul_ms':>9}")
+    for timing in sorted(timings, key=lambda item: item.cumulative_us, reverse=True)[:top]:
+        print(f"{timing.module:<60} {timing.self_us / 1000:>9.1f} {timing.cumulative_us / 1000:>9.1f}")
+
+    print(f"\nПакеты по собственному времени импорта (топ {top}):")
+    for package, self_us in _by_package(timings)[:top]:
+        print(f"{package:<60} {self_us / 1000:>9.1f}")
+
+    print("\nФазы старта:")
+    for phase, seconds in startup["phases"].items():
+        print(f"{phase:<60} {seconds * 1000:>9.1f} мс")
+    print(f"{'startup-обработчики всего':<60} {startup['startup_seconds'] * 1000:>9.1f} мс")
+    print(f"{'до готовности (/ready)':<60} {startup['ready_seconds'] * 1000:>9.1f} мс")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Профиль импорта и фаз старта воркера")
+    parser.add_argument("--top", type=int, default=25, help="сколько модулей и пакетов выводить")
+    parser.add_argument("--json", dest="json_path", help="записать профиль в JSON-файл")
+    args = parser.parse_args(argv)
+
+    timings = collect_import_timings()
+    startup = asyncio.run(_run_startup())
+    _print_report(timings, startup, args.top)
+
+    if args.json_path:
+        payload = {
+            "imports": [asdict(timing) for timing in timings],
+            "packages": [{"package": package, "self_us": self_us} for package, self_us in _by_package(timings)],
+            **startup,
+        }
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False, indent=2)
+        print(f"\nПрофиль записан в {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())